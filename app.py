@@ -1,14 +1,18 @@
 import streamlit as st
 import pandas as pd
 from datetime import datetime
-import time
 import os
+import uuid
 
 # Import des modules Maroc
-from core.maroc_search import MarocSearchEngine
-from core.entreprises_maroc import EntreprisesMaroc
-from core.stage_finder import StageFinder
-from core.letter_generator import LetterGenerator  # NOUVEAU IMPORT
+from config import settings
+from core import events
+from core.ids import company_id, offer_id
+from core.metrics import metrics
+from core.offer_store import OFFER_FIELDS, OFFER_TYPES
+from core.offer_table import OfferTable
+from core.registry import get_registry
+from utils.export import EXPORT_FORMATS, LETTER_FORMATS, export_letters_zip, export_rows
 
 # Configuration
 st.set_page_config(
@@ -23,8 +27,11 @@ if 'search_results' not in st.session_state:
     st.session_state.search_results = {}
 if 'search_history' not in st.session_state:
     st.session_state.search_history = []
-if 'saved_offers' not in st.session_state:
-    st.session_state.saved_offers = []
+if 'user_id' not in st.session_state:
+    # Identifiant conservé dans l'URL (?u=...): les favoris survivent au rafraîchissement
+    st.session_state.user_id = st.query_params.get('u') or uuid.uuid4().hex
+if st.query_params.get('u') != st.session_state.user_id:
+    st.query_params['u'] = st.session_state.user_id
 if 'current_offers' not in st.session_state:
     st.session_state.current_offers = []
 if 'student_info' not in st.session_state:
@@ -32,14 +39,71 @@ if 'student_info' not in st.session_state:
 if 'current_page' not in st.session_state:
     st.session_state.current_page = "🔍 Recherche Stage"
 
-# Initialisation
-engine = MarocSearchEngine()
-entreprises_db = EntreprisesMaroc()
-letter_generator = LetterGenerator()  # NOUVEAU
+# Initialisation (une seule fois par processus, partagée entre les sessions)
+registry = get_registry()
+engine = registry.engine
+entreprises_db = registry.entreprises_db
+letter_generator = registry.letter_generator
+favorites = registry.favorites
+user_id = st.session_state.user_id
+
+# Vérification périodique des liens des offres stockées (un seul thread par processus)
+if settings.LINK_CHECK_INTERVAL:
+    registry.link_validator.start_background(settings.LINK_CHECK_INTERVAL)
+
+FAVORITE_EXPORT_COLUMNS = ['ID', 'Type', 'Nom', 'Ville', 'Site Web', 'Titre', 'Entreprise', 'Lieu', 'Lien',
+                           'Date Sauvegarde']
+
+def favorite_export_row(item: dict) -> dict:
+    """Ligne d'export d'un favori (colonnes FAVORITE_EXPORT_COLUMNS)"""
+    data = item['data']
+    if item['type'] == 'entreprise':
+        return {
+            'ID': item['id'],
+            'Type': 'Entreprise',
+            'Nom': data['nom'],
+            'Ville': data['ville'],
+            'Site Web': data['site_web'],
+            'Date Sauvegarde': item['date'].strftime('%Y-%m-%d')
+        }
+    return {
+        'ID': item['id'],
+        'Type': 'Offre',
+        'Titre': data['titre'],
+        'Entreprise': data['entreprise'],
+        'Lieu': data['lieu'],
+        'Lien': data.get('lien', 'N/A'),
+        'Date Sauvegarde': item['date'].strftime('%Y-%m-%d')
+    }
+
+# Affichage des événements de progression des scrapers (core.events)
+EVENT_RENDERERS = {
+    events.PROGRESS: st.write,
+    events.INFO: st.info,
+    events.SUCCESS: st.success,
+    events.WARNING: st.warning,
+    events.ERROR: st.error
+}
+
+def report_event(event: events.Event):
+    """Abonné de core.events pour l'exécution en cours du script"""
+    EVENT_RENDERERS.get(event.kind, st.write)(event.message)
+
+def save_favorite(kind: str, data: dict, message: str):
+    """Enregistre un favori de l'utilisateur (sans doublon)"""
+    if favorites.save(user_id, kind, data):
+        st.success(message)
+    else:
+        st.info("ℹ️ Déjà dans vos favoris")
 
 def main():
     """Application principale"""
     
+    # Page cachée, hors navigation: ?diagnostics=1
+    if st.query_params.get('diagnostics') == '1':
+        render_diagnostics_page()
+        return
+    
     # Sidebar
     with st.sidebar:
         st.title("🎓 Maroc PFE Finder")
@@ -72,6 +136,7 @@ def main():
         
         st.markdown("---")
         st.caption("📍 Spécialisé Maroc | 🎓 Stages PFE | 💼 Premiers emplois")
+        st.caption(f"⚙️ Moteurs initialisés en {registry.build_times['total'] * 1000:.0f} ms")
     
     # Gestion de la redirection depuis les boutons "📝"
     if 'selected_offer_for_letter' in st.session_state:
@@ -109,7 +174,7 @@ def render_letter_page():
     st.caption("Créez une lettre de motivation personnalisée pour vos candidatures")
     
     # Vérifier si l'utilisateur a des offres sauvegardées
-    if not st.session_state.saved_offers:
+    if not any(favorites.counts(user_id).values()):
         st.warning("💡 Vous devez d'abord sauvegarder des offres pour générer des lettres.")
         st.info("""
         **Pour commencer :**
@@ -125,28 +190,20 @@ def render_letter_page():
     
     with tab1:
         # Sélection de l'offre
-        saved_offers = [o for o in st.session_state.saved_offers if o['type'] == 'offre']
-        saved_companies = [o for o in st.session_state.saved_offers if o['type'] == 'entreprise']
+        saved_offers = favorites.list(user_id, 'offre')
+        saved_companies = favorites.list(user_id, 'entreprise')
         
         if not saved_offers and not saved_companies:
             st.info("ℹ️ Aucune offre ou entreprise sauvegardée.")
             return
         
-        # Si redirection depuis bouton "📝", pré-sélectionner cette offre
-        preselected_index = 0
-        if 'selected_offer_for_letter' in st.session_state:
-            # Chercher l'offre dans saved_offers
-            for i, item in enumerate(st.session_state.saved_offers):
-                if item['type'] == 'offre' and item['data'] == st.session_state.selected_offer_for_letter:
-                    preselected_index = i
-                    break
-        
         # Liste des offres disponibles
         offer_options = []
         for i, offer in enumerate(saved_offers):
             offer_options.append({
                 'label': f"💼 {offer['data']['titre']} - {offer['data']['entreprise']}",
                 'value': f"offre_{i}",
+                'id': offer['id'],
                 'type': 'offre',
                 'data': offer['data'],
                 'index': i
@@ -156,6 +213,7 @@ def render_letter_page():
             offer_options.append({
                 'label': f"🏢 Entreprise: {company['data']['nom']}",
                 'value': f"entreprise_{i}",
+                'id': company['id'],
                 'type': 'entreprise',
                 'data': {
                     'entreprise': company['data']['nom'],
@@ -171,9 +229,9 @@ def render_letter_page():
             # Pré-sélectionner si redirection
             default_index = 0
             if 'selected_offer_for_letter' in st.session_state:
-                # Trouver l'index de l'offre présélectionnée
+                # Trouver l'index de l'offre présélectionnée (par identifiant)
                 for idx, opt in enumerate(offer_options):
-                    if opt['type'] == 'offre' and opt['data'] == st.session_state.selected_offer_for_letter:
+                    if opt['id'] == st.session_state.selected_offer_for_letter:
                         default_index = idx
                         break
             
@@ -247,6 +305,31 @@ def render_letter_page():
                             del st.session_state.selected_offer_for_letter
         else:
             st.info("ℹ️ Aucune offre disponible pour générer une lettre.")
+        
+        # Génération groupée: une lettre par favori, dans une seule archive
+        st.markdown("---")
+        st.subheader("📦 Toutes mes lettres")
+        st.caption(f"Une lettre pour chacun de vos {len(offer_options)} favoris, dans une archive ZIP")
+        
+        formats = st.multiselect("Formats", LETTER_FORMATS, default=['txt'], key="batch_letter_formats")
+        if st.button("📦 Générer toutes les lettres", use_container_width=True, key="batch_letters_btn"):
+            student_info = st.session_state.student_info
+            if not student_info or not student_info.get('full_name'):
+                st.error("Veuillez d'abord compléter vos informations dans l'onglet '📋 Mes informations'")
+            elif not formats:
+                st.error("Choisissez au moins un format")
+            else:
+                with st.spinner("Génération des lettres..."):
+                    letters = letter_generator.generate_letters((opt['data'] for opt in offer_options), student_info)
+                    archive = export_letters_zip(letters, formats)
+                
+                st.download_button(
+                    f"📥 Télécharger les {len(offer_options)} lettres (.zip)",
+                    archive,
+                    f"Lettres_Motivation_{datetime.now().strftime('%Y%m%d')}.zip",
+                    mime="application/zip",
+                    use_container_width=True
+                )
     
     with tab2:
         st.subheader("📋 Mes informations personnelles")
@@ -297,6 +380,26 @@ def render_letter_page():
                     field_label = next((f['label'] for f in fields if f['key'] == key), key)
                     st.write(f"**{field_label}:** {value}")
 
+def render_results_preview(results):
+    """Aperçu des résultats pendant la recherche (sans boutons: rendu à chaque source)"""
+    stats_cols = st.columns(3)
+    with stats_cols[0]:
+        st.metric("🏢 Entreprises", len(results.get('entreprises', [])))
+    with stats_cols[1]:
+        st.metric("💼 Offres", len(results.get('offres', [])))
+    with stats_cols[2]:
+        st.metric("👤 Contacts", len(results.get('contacts', [])))
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown("**🏢 Entreprises recommandées**")
+        for entreprise in results.get('entreprises', [])[:10]:
+            st.markdown(f"- {entreprise['nom']} - {entreprise['ville']}")
+    with col2:
+        st.markdown("**💼 Offres trouvées**")
+        for offre in results.get('offres', [])[:15]:
+            st.markdown(f"- {offre['titre']} — {offre['entreprise']} ({offre.get('source', '')})")
+
 def render_search_page():
     """Page de recherche principale"""
     
@@ -385,28 +488,26 @@ def render_search_page():
             st.error("Veuillez sélectionner un domaine d'études")
             return
         
-        # Progress bar
+        # Progression réelle: une étape par source terminée
         progress_bar = st.progress(0)
         status = st.empty()
+        apercu = st.empty()
         
         try:
-            # Simulation progression
-            steps = ["Initialisation", "Recherche entreprises", "Scan offres", "Analyse résultats"]
-            
-            for i, step in enumerate(steps):
-                status.text(f"⏳ {step}...")
-                progress_bar.progress((i + 1) * 25)
-                time.sleep(0.5)
-            
-            # Recherche
-            results = engine.search_pfe_opportunities(
+            status.text("⏳ Recherche entreprises...")
+            results = None
+            for etape, results, avancement in engine.stream_pfe_opportunities(
                 secteur=secteur,
                 ville=ville,
                 entreprise_specifique=entreprise_specifique if entreprise_specifique else None,
                 type_recherche="stage"
-            )
+            ):
+                progress_bar.progress(avancement)
+                status.text(f"⏳ {etape}: terminé")
+                with apercu.container():
+                    render_results_preview(results)
             
-            progress_bar.progress(100)
+            progress_bar.progress(1.0)
             status.text("✅ Recherche terminée!")
             
             # Sauvegarde résultats
@@ -418,9 +519,9 @@ def render_search_page():
                 'type': type_stage
             })
             
-            time.sleep(0.5)
             progress_bar.empty()
             status.empty()
+            apercu.empty()
             
         except Exception as e:
             st.error(f"❌ Erreur: {str(e)}")
@@ -466,13 +567,8 @@ def render_search_page():
                                 st.info("ℹ️ Contactez pour stage")
                         
                         with col2:
-                            if st.button("💾 Sauvegarder", key=f"save_ent_{entreprise['nom'].replace(' ', '_')}"):
-                                st.session_state.saved_offers.append({
-                                    'type': 'entreprise',
-                                    'data': entreprise,
-                                    'date': datetime.now()
-                                })
-                                st.success("✅ Entreprise sauvegardée!")
+                            if st.button("💾 Sauvegarder", key=f"save_ent_{company_id(entreprise)}"):
+                                save_favorite('entreprise', entreprise, "✅ Entreprise sauvegardée!")
                         
                         # Contacts
                         if entreprise.get('contacts'):
@@ -500,14 +596,9 @@ def render_search_page():
                                 st.markdown(f"[🔗 Voir offre]({offre['lien']})")
                         
                         with col3:
-                            # CORRECTION : Clé unique avec index
-                            if st.button("💾", key=f"save_offre_{i}_{offre['titre'][:15].replace(' ', '_')}"):
-                                st.session_state.saved_offers.append({
-                                    'type': 'offre',
-                                    'data': offre,
-                                    'date': datetime.now()
-                                })
-                                st.success("✅ Offre sauvegardée!")
+                            # Clé unique: identifiant stable de l'offre
+                            if st.button("💾", key=f"save_offre_{offer_id(offre)}"):
+                                save_favorite('offre', offre, "✅ Offre sauvegardée!")
                         
                         st.divider()
             else:
@@ -563,7 +654,7 @@ def render_companies_page():
             
             entreprises = entreprises_db.get_entreprises_by_sector(secteur_key)
             if ville != "Toutes villes":
-                entreprises = [e for e in entreprises if ville.lower() in e['ville'].lower()]
+                entreprises = entreprises_db.filter_by_ville(entreprises, ville)
             
             for entreprise in entreprises[:3]:  # 3 par secteur
                 st.markdown(f"**🏢 {entreprise['nom']}**")
@@ -575,7 +666,7 @@ def render_companies_page():
         entreprises = entreprises_db.get_entreprises_by_sector(secteur)
         
         if ville != "Toutes villes":
-            entreprises = [e for e in entreprises if ville.lower() in e['ville'].lower()]
+            entreprises = entreprises_db.filter_by_ville(entreprises, ville)
         
         if entreprises:
             st.subheader(f"📊 {len(entreprises)} entreprises trouvées")
@@ -600,13 +691,8 @@ def render_companies_page():
                         else:
                             st.info("ℹ️ Contactez pour opportunités")
                         
-                        if st.button("💾 Sauvegarder", key=f"save_companies_{i}"):
-                            st.session_state.saved_offers.append({
-                                'type': 'entreprise',
-                                'data': entreprise,
-                                'date': datetime.now()
-                            })
-                            st.success("✅ Entreprise sauvegardée!")
+                        if st.button("💾 Sauvegarder", key=f"save_companies_{company_id(entreprise)}"):
+                            save_favorite('entreprise', entreprise, "✅ Entreprise sauvegardée!")
         else:
             st.info("ℹ️ Aucune entreprise trouvée pour ces critères")
 
@@ -615,6 +701,9 @@ def render_offers_page():
     
     st.title("💼 Offres de Stage & PFE")
     st.caption("Dernières offres publiées sur les plateformes marocaines")
+    if settings.RESPECT_ROBOTS_TXT:
+        st.caption("ℹ️ LinkedIn n'est pas interrogé: son robots.txt interdit les robots "
+                   "(RESPECT_ROBOTS_TXT=false pour l'inclure)")
     
     # Formulaire recherche offres
     with st.form("offers_search"):
@@ -636,8 +725,7 @@ def render_offers_page():
         
         if st.form_submit_button("🔍 Rechercher offres", use_container_width=True):
             with st.spinner("Recherche en cours..."):
-                stage_finder = StageFinder()
-                offres = stage_finder.search_all_platforms(
+                offres = registry.stage_finder.search_all_platforms(
                     secteur=offre_secteur if offre_secteur != "Tous secteurs" else "stage",
                     ville=offre_ville if offre_ville != "Toutes villes" else None
                 )
@@ -667,18 +755,46 @@ def render_offers_page():
                         st.markdown(f"[🔗 Voir l'offre]({offre['lien']})")
                 
                 with col3:
-                    # CORRECTION : Clé unique
-                    if st.button("💾", key=f"save_offer_page2_{i}_{offre['titre'][:10].replace(' ', '_')}"):
-                        st.session_state.saved_offers.append({
-                            'type': 'offre',
-                            'data': offre,
-                            'date': datetime.now()
-                        })
-                        st.success("Offre sauvegardée!")
+                    # Clé unique: identifiant stable de l'offre
+                    if st.button("💾", key=f"save_offer_page2_{offer_id(offre)}"):
+                        save_favorite('offre', offre, "Offre sauvegardée!")
                 
                 st.divider()
     else:
         st.info("🔍 Utilisez le formulaire ci-dessus pour rechercher des offres")
+    
+    # Stock du crawler: filtrage en colonnes sur toutes les offres collectées
+    stock = OfferTable.from_store(registry.offer_store)
+    if len(stock):
+        with st.expander(f"🗄️ Offres collectées par le crawler ({len(stock)})"):
+            jours = st.slider("Collectées depuis (jours)", 1, 30, 7, key="stock_jours")
+            secteur_stock = st.session_state.get('offre_secteur', "Tous secteurs")
+            ville_stock = st.session_state.get('offre_ville', "Toutes villes")
+            
+            selection = stock.query(
+                secteur=secteur_stock if secteur_stock != "Tous secteurs" else None,
+                ville=ville_stock if ville_stock != "Toutes villes" else None,
+                depuis=datetime.now().timestamp() - jours * 86400
+            )
+            st.caption(f"{len(selection)} offres correspondent aux critères (500 plus récentes affichées)")
+            st.dataframe(
+                selection.top(500).display_frame(),
+                use_container_width=True,
+                hide_index=True,
+                column_config={'Lien': st.column_config.LinkColumn("Lien")}
+            )
+            
+            # Export du stock complet, lu par lots dans le stockage
+            fmt = st.selectbox("Format d'export", list(EXPORT_FORMATS), key="stock_export_format")
+            extension, mime = EXPORT_FORMATS[fmt]
+            st.download_button(
+                f"📥 Exporter tout le stock ({extension.upper()})",
+                lambda: export_rows((record.to_dict() for record in registry.offer_store.iter_records()),
+                                    OFFER_FIELDS, fmt, OFFER_TYPES),
+                f"offres_collectees.{extension}",
+                mime=mime,
+                key="stock_export"
+            )
 
 def render_advice_page():
     """Page de conseils PFE"""
@@ -804,7 +920,8 @@ def render_favorites_page():
     
     st.title("💾 Mes Favoris Sauvegardés")
     
-    if not st.session_state.saved_offers:
+    counts = favorites.counts(user_id)
+    if not any(counts.values()):
         st.info("💡 Vous n'avez encore sauvegardé aucune offre ou entreprise.")
         return
     
@@ -812,7 +929,7 @@ def render_favorites_page():
     tab1, tab2, tab3 = st.tabs(["🏢 Entreprises", "💼 Offres", "📝 Lettre de Motivation"])
     
     with tab1:
-        entreprises = [item for item in st.session_state.saved_offers if item['type'] == 'entreprise']
+        entreprises = favorites.list(user_id, 'entreprise')
         
         if entreprises:
             st.subheader(f"📁 {len(entreprises)} entreprises sauvegardées")
@@ -834,14 +951,14 @@ def render_favorites_page():
                                 st.markdown(f"- {contact['nom']}: {contact.get('email', 'N/A')}")
                     
                     with col2:
-                        if st.button("🗑️ Supprimer", key=f"del_ent_{i}"):
-                            st.session_state.saved_offers.remove(item)
+                        if st.button("🗑️ Supprimer", key=f"del_ent_{item['id']}"):
+                            favorites.delete(user_id, item['id'])
                             st.rerun()
         else:
             st.info("ℹ️ Aucune entreprise sauvegardée")
     
     with tab2:
-        offres = [item for item in st.session_state.saved_offers if item['type'] == 'offre']
+        offres = favorites.list(user_id, 'offre')
         
         if offres:
             st.subheader(f"📋 {len(offres)} offres sauvegardées")
@@ -864,13 +981,13 @@ def render_favorites_page():
                     
                     with col3:
                         # Bouton supprimer
-                        if st.button("🗑️", key=f"del_off_{i}"):
-                            st.session_state.saved_offers.remove(item)
+                        if st.button("🗑️", key=f"del_off_{item['id']}"):
+                            favorites.delete(user_id, item['id'])
                             st.rerun()
                         
                         # Bouton générer lettre
-                        if st.button("📝", key=f"letter_off_{i}"):
-                            st.session_state.selected_offer_for_letter = item['data']
+                        if st.button("📝", key=f"letter_off_{item['id']}"):
+                            st.session_state.selected_offer_for_letter = item['id']
                             st.rerun()
                     
                     st.divider()
@@ -882,9 +999,9 @@ def render_favorites_page():
         st.info("Sélectionnez une offre ci-dessus et cliquez sur le bouton 📝 pour générer une lettre personnalisée.")
         
         # Stats
-        total_fav = len(st.session_state.saved_offers)
-        total_offres = len([o for o in st.session_state.saved_offers if o['type'] == 'offre'])
-        total_entreprises = len([o for o in st.session_state.saved_offers if o['type'] == 'entreprise'])
+        total_offres = counts['offre']
+        total_entreprises = counts['entreprise']
+        total_fav = total_offres + total_entreprises
         
         col1, col2, col3 = st.columns(3)
         with col1:
@@ -895,41 +1012,83 @@ def render_favorites_page():
             st.metric("Entreprises", total_entreprises)
         
         # Bouton export
-        if st.session_state.saved_offers:
+        if total_fav:
             st.markdown("---")
             
-            # Préparation données pour export
-            export_data = []
-            for item in st.session_state.saved_offers:
-                if item['type'] == 'entreprise':
-                    export_data.append({
-                        'Type': 'Entreprise',
-                        'Nom': item['data']['nom'],
-                        'Ville': item['data']['ville'],
-                        'Site Web': item['data']['site_web'],
-                        'Date Sauvegarde': item['date'].strftime('%Y-%m-%d')
-                    })
-                else:
-                    export_data.append({
-                        'Type': 'Offre',
-                        'Titre': item['data']['titre'],
-                        'Entreprise': item['data']['entreprise'],
-                        'Lieu': item['data']['lieu'],
-                        'Lien': item['data'].get('lien', 'N/A'),
-                        'Date Sauvegarde': item['date'].strftime('%Y-%m-%d')
-                    })
-            
-            df = pd.DataFrame(export_data)
-            
-            # Export CSV
-            csv = df.to_csv(index=False)
+            # Export en flux: lu dans le stockage au moment du clic, par lots
+            fmt = st.selectbox("Format d'export", list(EXPORT_FORMATS), key="favorites_export_format")
+            extension, mime = EXPORT_FORMATS[fmt]
             st.download_button(
-                "📥 Exporter mes favoris (CSV)",
-                csv,
-                "mes_favoris_pfe.csv",
+                f"📥 Exporter mes favoris ({extension.upper()})",
+                lambda: export_rows((favorite_export_row(item) for item in favorites.iter_items(user_id)),
+                                    FAVORITE_EXPORT_COLUMNS, fmt),
+                f"mes_favoris_pfe.{extension}",
+                mime=mime,
                 use_container_width=True
             )
 
+def render_diagnostics_page():
+    """Page cachée: latences par étape, compteurs, cache HTTP (?diagnostics=1)"""
+    
+    st.title("🩺 Diagnostics")
+    snapshot = metrics.snapshot()
+    st.caption(f"Mesures depuis le {datetime.fromtimestamp(snapshot['since']).strftime('%d/%m/%Y %H:%M:%S')}")
+    
+    cache_stats = registry.http_session.cache.stats()
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Cache HTTP (succès)", f"{cache_stats['hit_rate']:.0%}")
+    with col2:
+        st.metric("Entrées en cache", cache_stats['entries'])
+    with col3:
+        st.metric("Taille du cache", f"{cache_stats['size_bytes'] / 2**20:.1f} Mo")
+    with col4:
+        st.metric("Initialisation", f"{registry.build_times['total'] * 1000:.0f} ms")
+    
+    st.subheader("⏱️ Latences par étape")
+    if snapshot['latency']:
+        st.dataframe(pd.DataFrame([
+            {
+                'Étape': row['name'],
+                'Étiquettes': ', '.join(f"{key}={value}" for key, value in row['labels'].items()),
+                'Appels': row['count'],
+                'p50 (ms)': row['p50'] * 1000,
+                'p90 (ms)': row['p90'] * 1000,
+                'p99 (ms)': row['p99'] * 1000,
+                'Max (ms)': row['max'] * 1000,
+                'Total (s)': row['sum']
+            }
+            for row in snapshot['latency']
+        ]), hide_index=True, use_container_width=True)
+    else:
+        st.info("ℹ️ Aucune mesure pour l'instant: lancez une recherche.")
+    
+    st.subheader("🔢 Compteurs")
+    if snapshot['counters']:
+        st.dataframe(pd.DataFrame([
+            {
+                'Compteur': row['name'],
+                'Étiquettes': ', '.join(f"{key}={value}" for key, value in row['labels'].items()),
+                'Valeur': row['value']
+            }
+            for row in snapshot['counters']
+        ]), hide_index=True, use_container_width=True)
+    
+    with st.expander("⚙️ Initialisation des moteurs"):
+        st.json({name: f"{seconds * 1000:.1f} ms" for name, seconds in registry.build_times.items()})
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.download_button("📥 JSON", metrics.to_json(), "diagnostics.json",
+                           mime="application/json", use_container_width=True)
+    with col2:
+        st.download_button("📥 Prometheus", metrics.to_prometheus(), "metrics.prom",
+                           mime="text/plain", use_container_width=True)
+    with col3:
+        if st.button("🔄 Remettre à zéro", use_container_width=True):
+            metrics.reset()
+            st.rerun()
+
 # Pied de page
 st.markdown("---")
 footer_col1, footer_col2, footer_col3 = st.columns(3)
@@ -941,4 +1100,5 @@ with footer_col3:
     st.caption(f"🔒 Données mises à jour: {datetime.now().strftime('%Y')}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    with events.listening(report_event):
+        main()
\ No newline at end of file
@@ -0,0 +1,92 @@
+"""
+Mémoire occupée par les offres et entreprises: dictionnaires vs core.records.
+
+Les valeurs sont recréées pour chaque élément, comme après le parsing d'une
+page ou la lecture d'une ligne SQLite (aucune chaîne partagée au départ).
+Mesure par tracemalloc de la liste complète, chaînes comprises.
+
+Usage:
+    python -m benchmarks.bench_memory [--offres 100000] [--entreprises 10000]
+"""
+import argparse
+import tracemalloc
+from typing import Callable, Dict, List
+
+from core.records import Company, Offer
+
+SOURCES = ['Rekrute.com', 'Emploi.ma', 'MarocAnnonces', 'LinkedIn', 'Adzuna']
+VILLES = ['Casablanca', 'Rabat', 'Marrakech', 'Fès', 'Tanger', 'Agadir']
+SECTEURS = ['informatique', 'telecom', 'banque_finance', 'industrie', 'marketing']
+
+
+def _fresh(value: str) -> str:
+    """Nouvelle copie de la chaîne (comme produite par le parser)"""
+    return ''.join([value[:1], value[1:]])
+
+
+def make_offer(i: int) -> Dict:
+    offre = {
+        'titre': f"Stage PFE Développeur {i % 997} - projet {i}",
+        'entreprise': f"Entreprise {i % 500} Maroc",
+        'lieu': _fresh(VILLES[i % len(VILLES)]),
+        'date_publication': _fresh('2024'),
+        'lien': f"https://www.rekrute.com/offre-emploi-stage-{i}.html",
+        'source': _fresh(SOURCES[i % len(SOURCES)]),
+        'type': _fresh('Stage'),
+        'secteur': _fresh(SECTEURS[i % len(SECTEURS)]),
+        'valide': bool(i % 3)
+    }
+    offre['id'] = f"{i:016x}"  # Taille d'un identifiant core.ids, sans le coût du hachage
+    return offre
+
+
+def make_company(i: int) -> Dict:
+    entreprise = {
+        'nom': f"Entreprise {i} Maroc",
+        'ville': _fresh(VILLES[i % len(VILLES)]),
+        'site_web': f"https://www.entreprise{i}.ma",
+        'specialite': _fresh('Services IT, Consulting'),
+        'type': _fresh('ESN/SSII'),
+        'offres_stage': bool(i % 2),
+        'contacts': [
+            {'nom': _fresh('Service RH'), 'email': f"rh@entreprise{i}.ma", 'telephone': _fresh('+212 5 22 XX XX XX')},
+            {'nom': _fresh('Service Recrutement'), 'email': f"recrutement@entreprise{i}.ma"}
+        ]
+    }
+    entreprise['id'] = f"{i:016x}"
+    return entreprise
+
+
+def measure(build: Callable[[], List]) -> int:
+    """Octets alloués (et conservés) par la liste construite"""
+    tracemalloc.start()
+    try:
+        items = build()
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del items
+    return current
+
+
+def report(label: str, n: int, make: Callable[[int], Dict], record_type):
+    as_dicts = measure(lambda: [make(i) for i in range(n)])
+    as_records = measure(lambda: [record_type.from_dict(make(i)) for i in range(n)])
+    print(f"{label:<12}{n:>9}{as_dicts / n:>11.0f} o{as_records / n:>11.0f} o"
+          f"{(as_dicts - as_records) / n:>11.0f} o{1 - as_records / as_dicts:>8.0%}"
+          f"{as_dicts / 2**20:>9.1f} Mo -> {as_records / 2**20:.1f} Mo")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mémoire des offres/entreprises: dict vs enregistrements")
+    parser.add_argument('--offres', type=int, default=100_000)
+    parser.add_argument('--entreprises', type=int, default=10_000)
+    args = parser.parse_args(argv)
+
+    print(f"{'type':<12}{'nombre':>9}{'dict':>13}{'record':>13}{'gain':>13}{'':>8}  total")
+    report('offres', args.offres, make_offer, Offer)
+    report('entreprises', args.entreprises, make_company, Company)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Filtrage et classement d'un stock d'offres avec core.offer_table.OfferTable.
+
+Construit une table synthétique (1M offres par défaut) et mesure une requête
+secteur + ville + date suivie d'un top-k, comparée à la même requête en
+compréhensions de listes sur des dictionnaires.
+
+Usage:
+    python -m benchmarks.bench_offer_table [--offres 1000000] [--repeat 5]
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from core.offer_table import OfferTable
+
+SOURCES = ['Rekrute.com', 'Emploi.ma', 'MarocAnnonces', 'LinkedIn', 'Adzuna', 'Offres enregistrées']
+LIEUX = ['Casablanca', 'Rabat', 'Marrakech', 'Fès', 'Tanger', 'Agadir', 'Casablanca, Maroc', 'Rabat-Salé']
+SECTEURS = ['Informatique', 'Télécommunications', 'Banque', 'Finance', 'Industrie', 'Marketing Digital', 'stage']
+
+
+def make_table(n: int, seed: int = 0) -> OfferTable:
+    rng = np.random.default_rng(seed)
+    now = time.time()
+    frame = pd.DataFrame({
+        'titre': pd.Categorical.from_codes(rng.integers(0, 1000, n), [f"Stage PFE {i}" for i in range(1000)]),
+        'entreprise': pd.Categorical.from_codes(rng.integers(0, 5000, n), [f"Entreprise {i}" for i in range(5000)]),
+        'lieu': pd.Categorical.from_codes(rng.integers(0, len(LIEUX), n), LIEUX),
+        'date_publication': '2024',
+        'lien': None,
+        'source': pd.Categorical.from_codes(rng.integers(0, len(SOURCES), n), SOURCES),
+        'type': 'Stage',
+        'secteur': pd.Categorical.from_codes(rng.integers(0, len(SECTEURS), n), SECTEURS),
+        'valide': rng.random(n) < 0.4,
+        'id': np.char.mod('%016x', np.arange(n)),
+        'collecte': now - rng.random(n) * 30 * 86400
+    })
+    return OfferTable.from_frame(frame)
+
+
+def timeit(fn, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark du filtrage d'offres en colonnes")
+    parser.add_argument('--offres', type=int, default=1_000_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    table = make_table(args.offres)
+    print(f"Table de {len(table)} offres construite en {time.perf_counter() - start:.1f}s")
+
+    depuis = time.time() - 7 * 86400
+    query = lambda: table.query(secteur='informatique', ville='casablanca', depuis=depuis)
+    print(f"{'filtre secteur+ville+date':<30}{timeit(query, args.repeat):>9.1f}ms  ({len(query())} offres)")
+    print(f"{'filtre + top 500':<30}{timeit(lambda: query().top(500), args.repeat):>9.1f}ms")
+    print(f"{'filtre + display_frame':<30}{timeit(lambda: query().top(500).display_frame(), args.repeat):>9.1f}ms")
+
+    # Même requête sur des dictionnaires (100k offres, extrapolée)
+    sample = min(args.offres, 100_000)
+    offres = table.frame.iloc[:sample].astype({'collecte': 'int64'}).to_dict('records')
+    seuil = int(depuis * 1e9)
+    def legacy():
+        return [o for o in offres
+                if o['secteur'].lower() == 'informatique' and 'casablanca' in o['lieu'].lower()
+                and o['collecte'] >= seuil]
+    legacy_ms = timeit(legacy, 1) * args.offres / sample
+    print(f"{'listes de dicts (extrapolé)':<30}{legacy_ms:>9.1f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+"""
+Micro-benchmark du parsing des pages de résultats (pages enregistrées dans benchmarks/fixtures).
+
+Compare, pour chaque portail:
+- l'ancienne extraction (html.parser + un `select_one` par champ),
+- la couche core.parsers avec chaque backend disponible (html.parser, lxml).
+
+Usage:
+    python -m benchmarks.bench_parsers [--repeat 20]
+"""
+import argparse
+import os
+import time
+
+from bs4 import BeautifulSoup
+
+from core import parsers
+from core.real_offers import RealOffersFinder
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+SECTEUR = 'informatique'
+VILLE = 'Casablanca'
+
+# Sélecteurs de l'ancienne implémentation: (éléments, éléments de secours, limite, champs)
+LEGACY_SELECTORS = {
+    'rekrute': ('.job-item, .emploi-item, .offer-item', '.titreJob, .emploi-title', 10, {
+        'titre': '.titreJob, .emploi-title, .job-title',
+        'entreprise': '.entreprise, .company-name, .societe',
+        'lieu': '.lieu, .location, .ville',
+        'lien': 'a[href*="/offres/"], a[href*="/emploi/"]'
+    }),
+    'emploi_ma': ('.job-item, .offer, .annonce', None, 10, {
+        'titre': '.titre, .title, h3, h4',
+        'entreprise': '.entreprise, .company, .societe',
+        'lieu': '.lieu, .ville, .location',
+        'lien': 'a[href*="/offre/"], a[href*="/emploi/"]'
+    }),
+    'marocannonces': ('.annonce, .item, .listing-item', None, 10, {
+        'titre': '.titre, .title, h3',
+        'lien': 'a[href*=".html"]',
+        'description': '.description, .desc'
+    }),
+    'linkedin': ('.job-card-container, .result-card', None, 5, {
+        'titre': '.job-card-list__title, .result-card__title',
+        'entreprise': '.job-card-container__company-name, .result-card__subtitle',
+        'lieu': '.job-card-container__metadata-item, .job-result-card__location',
+        'lien': 'a[href*="/jobs/view/"]'
+    })
+}
+
+
+def legacy_extract(content: bytes, portail: str) -> list:
+    """Ancienne méthode: arbre html.parser, get_text() global, un select_one par champ"""
+    items_selector, fallback_selector, limit, fields = LEGACY_SELECTORS[portail]
+    soup = BeautifulSoup(content, 'html.parser')
+    soup.get_text().lower()
+    items = soup.select(items_selector)
+    if not items and fallback_selector:
+        items = soup.select(fallback_selector)
+    return [
+        {name: item.select_one(selector) for name, selector in fields.items()}
+        for item in items[:limit]
+    ]
+
+
+def current_parse(finder: RealOffersFinder, content: bytes, portail: str) -> list:
+    url = f"https://example.test/{portail}"
+    if portail == 'rekrute':
+        return finder._parse_rekrute(content, url, SECTEUR, VILLE)
+    if portail == 'emploi_ma':
+        return finder._parse_emploi_ma(content, url, SECTEUR)
+    if portail == 'marocannonces':
+        return finder._parse_marocannonces(content, url, SECTEUR)
+    return finder._parse_linkedin(content, url, SECTEUR, VILLE)
+
+
+def timeit(fn, repeat: int) -> float:
+    """Meilleur temps (ms) sur `repeat` exécutions"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def available_backends() -> list:
+    backends = ['html.parser']
+    try:
+        import lxml  # noqa: F401
+        backends.append('lxml')
+    except ImportError:
+        pass
+    return backends
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark du parsing des pages de résultats")
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args(argv)
+
+    finder = RealOffersFinder.__new__(RealOffersFinder)  # Parsing seul, sans session HTTP
+    backends = available_backends()
+    default_backend = parsers.HTML_PARSER
+
+    print(f"{'portail':<15}{'ko':>6}{'ancien':>10}" + ''.join(f"{b:>14}" for b in backends) + f"{'gain':>8}")
+    for fixture in sorted(os.listdir(FIXTURES_DIR)):
+        portail, ext = os.path.splitext(fixture)
+        if ext != '.html' or portail not in LEGACY_SELECTORS:
+            continue
+        with open(os.path.join(FIXTURES_DIR, fixture), 'rb') as f:
+            content = f.read()
+
+        legacy_ms = timeit(lambda: legacy_extract(content, portail), args.repeat)
+        timings = []
+        for backend in backends:
+            parsers.HTML_PARSER = backend
+            timings.append(timeit(lambda: current_parse(finder, content, portail), args.repeat))
+        parsers.HTML_PARSER = default_backend
+
+        print(f"{portail:<15}{len(content) // 1024:>6}{legacy_ms:>9.2f}ms"
+              + ''.join(f"{ms:>12.2f}ms" for ms in timings)
+              + f"{legacy_ms / min(timings):>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
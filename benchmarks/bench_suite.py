@@ -0,0 +1,322 @@
+"""
+Suite de benchmarks hors ligne du chemin critique, comparée à une référence.
+
+Les portails (Rekrute, Emploi.ma, MarocAnnonces, LinkedIn, Adzuna) sont
+rejoués depuis benchmarks/fixtures par benchmarks.replay.ReplayAdapter: aucune
+requête ne part sur le réseau. Les données volumineuses sont synthétiques et
+générées dans un dossier temporaire (base d'entreprises, stock du crawler).
+
+Scénarios:
+- real_offers:       RealOffersFinder.search_all_real_offers sur la grille secteurs × villes
+- stage_finder:      StageFinder.search_all_platforms (stock de 100k offres, une recherche sur
+                     deux trouvée dans le stock, les autres sur les portails)
+- entreprises_index: construction des index d'une base de 10k entreprises
+- entreprises:       recherche floue par nom (avec faute de frappe) et recommandations par secteur/ville
+- lettres:           LetterGenerator.generate_letter sur 1k offres distinctes
+
+Pour chaque scénario: débit (opérations/s), latence p50/p99 et pic mémoire
+(tracemalloc, désactivable avec --no-memory: les temps sont alors plus bas,
+ne comparer qu'à une référence mesurée dans le même mode).
+
+Usage:
+    python -m benchmarks.bench_suite                      # compare à benchmarks/baseline.json
+    python -m benchmarks.bench_suite --save-baseline      # enregistre la nouvelle référence
+    python -m benchmarks.bench_suite --check              # code de sortie 1 en cas de régression
+    python -m benchmarks.bench_suite --scenario lettres --lettres 5000
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from benchmarks.replay import replay_session
+from core.backup_api import BackupAPIs
+from core.entreprises_maroc import EntreprisesMaroc
+from core.http_client import HttpClient
+from core.letter_generator import LetterGenerator
+from core.link_validator import LinkValidator
+from core.offer_store import OfferStore
+from core.real_offers import RealOffersFinder
+from core.stage_finder import StageFinder
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+SECTEURS = [
+    "Informatique / IT / Développement",
+    "Télécommunications / Réseaux",
+    "Banque / Finance / Assurance",
+    "Industrie / Manufacturing",
+    "Marketing / Communication"
+]
+VILLES = ["Casablanca", "Rabat", "Marrakech", "Fès", "Tanger", "Agadir", "Meknès", "Oujda", "Kénitra", "Tétouan"]
+SECTEUR_KEYS = ['informatique', 'telecom', 'banque_finance', 'industrie', 'energie', 'sante', 'logistique', 'marketing']
+
+SYLLABES = ['at', 'la', 'ma', 'ro', 'tel', 'in', 'vo', 'sa', 'fi', 'ban', 'ko', 'ri', 'dar', 'nex', 'to', 'ga', 'lu', 'mi']
+SUFFIXES = ['Maroc', 'SA', 'Group', 'Consulting', 'Technologies', 'Solutions', 'Services', 'Industries', '']
+TITRES = ['Stage PFE Développeur {}', 'Stagiaire Ingénieur {}', 'Stage PFE Data {}', 'Stage Analyste {}',
+          'Stage PFE Réseaux {}', 'Stage Marketing Digital {}', 'Stage PFE Contrôle de gestion {}']
+SOURCES = ['Rekrute.com', 'Emploi.ma', 'MarocAnnonces', 'LinkedIn', 'Adzuna']
+
+# Écart toléré par rapport à la référence avant de signaler une régression
+DEFAULT_TOLERANCE = 0.25
+
+
+# ----------------------------------------------------------------------
+# Données synthétiques
+# ----------------------------------------------------------------------
+
+def make_companies(n: int, seed: int = 0) -> Dict[str, List[Dict]]:
+    """Base au format de data/entreprises_maroc.json: {secteur: [entreprise, ...]}"""
+    rng = random.Random(seed)
+    data: Dict[str, List[Dict]] = {key: [] for key in SECTEUR_KEYS}
+    for i in range(n):
+        mot = ''.join(rng.choice(SYLLABES) for _ in range(rng.randint(2, 4))).capitalize()
+        nom = f"{mot} {rng.choice(SUFFIXES)}".strip()
+        domaine = f"{mot.lower()}{i}"
+        data[SECTEUR_KEYS[i % len(SECTEUR_KEYS)]].append({
+            'nom': f"{nom} {i}" if i % 7 == 0 else nom,
+            'ville': ', '.join(rng.sample(VILLES, rng.randint(1, 3))),
+            'site_web': f"https://www.{domaine}.ma",
+            'specialite': 'Services IT, Consulting',
+            'contacts': [{'nom': 'Service RH', 'email': f"rh@{domaine}.ma", 'telephone': '+212 5 22 XX XX XX'}],
+            'offres_stage': rng.random() < 0.6,
+            'type': 'Entreprise'
+        })
+    return data
+
+
+def make_offers(n: int, secteur: str, ville: str, start: int = 0) -> List[Dict]:
+    return [
+        {
+            'titre': TITRES[i % len(TITRES)].format(i),
+            'entreprise': f"Entreprise {i % 997}",
+            'lieu': ville,
+            'date_publication': '2024',
+            'lien': f"https://www.rekrute.com/offre-emploi-stage-{i}.html",
+            'source': SOURCES[i % len(SOURCES)],
+            'type': 'Stage',
+            'secteur': secteur,
+            'valide': bool(i % 3)
+        }
+        for i in range(start, start + n)
+    ]
+
+
+def grid(n: int) -> List[Tuple[str, str]]:
+    """n recherches (secteur, ville), en parcourant la grille"""
+    cells = [(secteur, ville) for ville in VILLES for secteur in SECTEURS]
+    return [cells[i % len(cells)] for i in range(n)]
+
+
+# ----------------------------------------------------------------------
+# Mesure
+# ----------------------------------------------------------------------
+
+def run(operations: Iterable[Callable[[], object]], memory: bool) -> Dict:
+    """Exécute les opérations une par une: débit, latences (ms) et pic mémoire (Mo)"""
+    if memory:
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+    latencies = []
+    start = time.perf_counter()
+    for operation in operations:
+        op_start = time.perf_counter()
+        operation()
+        latencies.append(time.perf_counter() - op_start)
+    total = time.perf_counter() - start
+
+    result = {
+        'ops': len(latencies),
+        'duree_s': round(total, 3),
+        'throughput': round(len(latencies) / total, 2) if total else 0.0,
+        'p50_ms': round(float(np.percentile(latencies, 50)) * 1000, 3),
+        'p99_ms': round(float(np.percentile(latencies, 99)) * 1000, 3)
+    }
+    if memory:
+        result['peak_mb'] = round((tracemalloc.get_traced_memory()[1] - base) / 2**20, 2)
+    return result
+
+
+# ----------------------------------------------------------------------
+# Scénarios
+# ----------------------------------------------------------------------
+
+class Workbench:
+    """Moteurs branchés sur le rejeu des portails, données dans un dossier temporaire"""
+
+    def __init__(self, workdir: str, args):
+        self.workdir = workdir
+        self.args = args
+        self.session = replay_session(workdir, latency=args.latence / 1000)
+        self.http_client = HttpClient(session=self.session)
+        self.link_validator = LinkValidator(session=self.session)
+        self.real_finder = RealOffersFinder(session=self.session, link_validator=self.link_validator,
+                                            http_client=self.http_client)
+
+    def real_offers(self) -> List[Callable]:
+        self.session.cache.clear()
+        return [lambda s=secteur, v=ville: self.real_finder.search_all_real_offers(s, v)
+                for secteur, ville in grid(self.args.recherches)]
+
+    def stage_finder(self) -> List[Callable]:
+        self.session.cache.clear()
+        store = OfferStore(os.path.join(self.workdir, 'offres.sqlite'))
+        cells = grid(len(SECTEURS) * len(VILLES))
+        stocked = cells[::2]
+        per_cell = max(1, self.args.offres // len(stocked))
+        for i, (secteur, ville) in enumerate(stocked):
+            store.save_results(secteur, ville, make_offers(per_cell, secteur, ville, start=i * per_cell))
+
+        finder = StageFinder(session=self.session, real_finder=self.real_finder, offer_store=store,
+                             backup_apis=BackupAPIs(session=self.session))
+        return [lambda s=secteur, v=ville: finder.search_all_platforms(s, v)
+                for secteur, ville in grid(self.args.recherches)]
+
+    def entreprises_index(self) -> List[Callable]:
+        self.companies_file = os.path.join(self.workdir, 'entreprises.json')
+        with open(self.companies_file, 'w', encoding='utf-8') as f:
+            json.dump(make_companies(self.args.entreprises), f, ensure_ascii=False)
+        return [lambda: setattr(self, 'companies', EntreprisesMaroc(self.companies_file))]
+
+    def entreprises(self) -> List[Callable]:
+        if not hasattr(self, 'companies'):
+            for operation in self.entreprises_index():
+                operation()
+        rng = random.Random(1)
+        operations = []
+        for i in range(self.args.requetes):
+            if i % 2:
+                secteur, ville = rng.choice(SECTEURS), rng.choice(VILLES)
+                operations.append(lambda s=secteur, v=ville: self.companies.get_recommandations_pfe(s, v))
+            else:
+                nom = rng.choice(self.companies._all)['nom']
+                cut = rng.randrange(len(nom))
+                requete = nom[:cut] + nom[cut + 1:]  # Faute de frappe: une lettre en moins
+                operations.append(lambda q=requete: self.companies.search_entreprises(q, top_k=5))
+        return operations
+
+    def lettres(self) -> List[Callable]:
+        generator = LetterGenerator()
+        # Clés de core.letter_generator.DEFAULT_STUDENT: substitution des vraies valeurs
+        student = {'full_name': 'Etudiant Test', 'email': 'etudiant@example.ma', 'school': 'ENSIAS',
+                   'degree': 'Génie Logiciel'}
+        offres = make_offers(self.args.lettres, 'Informatique', 'Casablanca')
+        return [lambda o=offre: generator.generate_letter(o, student) for offre in offres]
+
+    def close(self):
+        # Vérifications de liens lancées en arrière-plan par les recherches
+        self.link_validator.close()
+        self.session.cache._conn.close()
+
+
+SCENARIOS = ['real_offers', 'stage_finder', 'entreprises_index', 'entreprises', 'lettres']
+
+
+# ----------------------------------------------------------------------
+# Référence
+# ----------------------------------------------------------------------
+
+def compare(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Affiche les écarts à la référence; retourne les régressions au-delà de `tolerance`"""
+    regressions = []
+    print(f"\nComparaison à la référence du {baseline.get('date', '?')} (tolérance {tolerance:.0%})")
+    if baseline.get('memory') != results['memory']:
+        print("  ⚠ référence mesurée avec un autre réglage de tracemalloc: temps non comparables")
+    print(f"{'scénario':<20}{'mesure':<12}{'référence':>12}{'actuel':>12}{'écart':>9}")
+    for name, current in results['scenarios'].items():
+        reference = baseline.get('scenarios', {}).get(name)
+        if reference is None:
+            continue
+        for metric, higher_is_better in [('throughput', True), ('p50_ms', False), ('p99_ms', False),
+                                         ('peak_mb', False)]:
+            if metric not in current or not reference.get(metric):
+                continue
+            delta = current[metric] / reference[metric] - 1
+            worse = -delta if higher_is_better else delta
+            flag = ''
+            if worse > tolerance:
+                flag = '  ✗'
+                regressions.append(f"{name}.{metric}: {reference[metric]} -> {current[metric]}")
+            print(f"{name:<20}{metric:<12}{reference[metric]:>12}{current[metric]:>12}{delta:>+9.0%}{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks hors ligne (portails rejoués) comparés à une référence")
+    parser.add_argument('--scenario', action='append', choices=SCENARIOS,
+                        help="Limiter à ce scénario (répétable)")
+    parser.add_argument('--recherches', type=int, default=100, help="Recherches par scénario de recherche")
+    parser.add_argument('--offres', type=int, default=100_000, help="Offres du stock du crawler")
+    parser.add_argument('--entreprises', type=int, default=10_000)
+    parser.add_argument('--requetes', type=int, default=2000, help="Recherches dans la base d'entreprises")
+    parser.add_argument('--lettres', type=int, default=1000)
+    parser.add_argument('--latence', type=float, default=0.0, help="Latence simulée des portails (ms)")
+    parser.add_argument('--no-memory', action='store_true', help="Sans tracemalloc (pas de pic mémoire)")
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true', help="Enregistrer les résultats comme référence")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument('--check', action='store_true', help="Code de sortie 1 si une mesure régresse")
+    parser.add_argument('--output', help="Écrire les résultats (JSON) dans ce fichier")
+    args = parser.parse_args(argv)
+
+    memory = not args.no_memory
+    results = {
+        'date': time.strftime('%Y-%m-%d %H:%M'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'memory': memory,
+        'params': {key: getattr(args, key) for key in ('recherches', 'offres', 'entreprises',
+                                                        'requetes', 'lettres', 'latence')},
+        'scenarios': {}
+    }
+
+    print(f"{'scénario':<20}{'ops':>7}{'ops/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'pic Mo':>9}")
+    with tempfile.TemporaryDirectory(prefix='bench_suite_') as workdir:
+        bench = Workbench(workdir, args)
+        if memory:
+            tracemalloc.start()
+        try:
+            for name in args.scenario or SCENARIOS:
+                operations = getattr(bench, name)()  # Préparation (données, moteurs) hors mesure
+                result = results['scenarios'][name] = run(operations, memory)
+                print(f"{name:<20}{result['ops']:>7}{result['throughput']:>10.1f}{result['p50_ms']:>10.2f}"
+                      f"{result['p99_ms']:>10.2f}{result.get('peak_mb', float('nan')):>9.1f}")
+        finally:
+            if memory:
+                tracemalloc.stop()
+            bench.close()
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+    regressions = []
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('params') != results['params']:
+            print("\n⚠ paramètres différents de la référence: "
+                  f"{baseline.get('params')} (référence) / {results['params']}")
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} régression(s): " + '; '.join(regressions))
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"\nRéférence enregistrée: {args.baseline}")
+
+    if args.check and regressions:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
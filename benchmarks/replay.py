@@ -0,0 +1,98 @@
+"""
+Rejeu hors ligne des réponses des portails (pages enregistrées dans benchmarks/fixtures).
+
+`ReplayAdapter` est un adaptateur de transport requests: monté sur une
+session, il sert la page enregistrée du site demandé au lieu d'aller sur le
+réseau. Le reste de la chaîne (cache HTTP, limiteur de débit, HttpClient,
+parsing, dédoublonnage) s'exécute normalement. Les sites sans page
+enregistrée (sites carrières, Reed, robots.txt...) répondent 404.
+
+    session = replay_session(cache_dir)
+    finder = RealOffersFinder(session=session, http_client=HttpClient(session=session), ...)
+"""
+import os
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+from core.http_cache import HTTPCache, build_session
+from core.rate_limiter import HostRateLimiter
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+# Site -> (page enregistrée, type de contenu)
+FIXTURES = {
+    'www.rekrute.com': ('rekrute.html', 'text/html; charset=utf-8'),
+    'www.emploi.ma': ('emploi_ma.html', 'text/html; charset=utf-8'),
+    'www.marocannonces.com': ('marocannonces.html', 'text/html; charset=utf-8'),
+    'www.linkedin.com': ('linkedin.html', 'text/html; charset=utf-8'),
+    'api.adzuna.com': ('adzuna.json', 'application/json')
+}
+
+
+class ReplayAdapter(BaseAdapter):
+    """
+    Adaptateur requests qui rejoue les pages enregistrées, par site.
+    `latency` (secondes) simule le temps de réponse du réseau.
+    """
+
+    def __init__(self, fixtures: Optional[Dict[str, tuple]] = None, latency: float = 0.0):
+        super().__init__()
+        self.latency = latency
+        self.pages: Dict[str, tuple] = {}
+        for host, (filename, content_type) in (fixtures or FIXTURES).items():
+            with open(os.path.join(FIXTURES_DIR, filename), 'rb') as f:
+                self.pages[host] = (f.read(), content_type)
+        self.requests = 0
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        if self.latency:
+            time.sleep(self.latency)
+
+        parsed = urlparse(request.url)
+        page = self.pages.get(parsed.hostname or '')
+        response = requests.Response()
+        response.request = request
+        response.url = request.url
+        if page is None or parsed.path.endswith('/robots.txt'):
+            response.status_code = 404
+            response.reason = 'Not Found'
+            response._content = b''
+            response.headers = CaseInsensitiveDict({'Content-Length': '0'})
+        else:
+            content, content_type = page
+            response.status_code = 200
+            response.reason = 'OK'
+            response._content = b'' if request.method == 'HEAD' else content
+            response.headers = CaseInsensitiveDict({'Content-Type': content_type,
+                                                    'Content-Length': str(len(content))})
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+
+        with self._lock:
+            self.requests += 1
+            self.bytes_sent += len(response._content)
+        return response
+
+    def close(self):
+        pass
+
+
+def replay_session(cache_dir: str, latency: float = 0.0, adapter: Optional[ReplayAdapter] = None):
+    """
+    Session des scrapers (core.http_cache.build_session) servie par ReplayAdapter:
+    cache HTTP propre au benchmark dans `cache_dir`, débit par site non limité.
+    """
+    cache = HTTPCache(path=os.path.join(cache_dir, 'http_cache.sqlite'))
+    limiter = HostRateLimiter(requests_per_minute=10**9, min_delay=0, burst=10**9, respect_robots=False)
+    session = build_session(cache=cache, rate_limiter=limiter)
+    adapter = adapter or ReplayAdapter(latency=latency)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
@@ -15,8 +15,58 @@ class Settings:
     
     # Recherche
     MAX_RESULTS = 15
-    REQUEST_DELAY = 3
+    REQUEST_DELAY = float(os.getenv("REQUEST_DELAY", 3))  # Espacement min. (s) des requêtes vers un même site
     TIMEOUT = 30
+    SEARCH_DEADLINE = 20  # Délai global (s) d'une recherche multi-plateformes
+    HTTP_POOL_MAXSIZE = 20  # Connexions keep-alive max. par site (au-delà, la requête attend)
+    HTTP_CONNECT_TIMEOUT = 5  # Établissement de la connexion (s)
+    HTTP_READ_TIMEOUT = 15  # Attente de la réponse (s)
+    HTTP_RETRIES = 2  # Nouvelles tentatives (erreurs de connexion, délais de lecture, 500/502/504)
+    HTTP_BACKOFF_FACTOR = 0.5  # Attente avant nouvelle tentative: 0.5s, 1s, 2s... (+ aléa)
+    HTTP_BACKOFF_JITTER = 0.5
+    HTTP_MAX_CONCURRENCY = 32  # Requêtes simultanées pour tout le processus
+    HTTP_PER_HOST = 6  # Requêtes simultanées par site
+    ORCHESTRATOR_DEADLINE = 12  # Délai (s) au-delà duquel seules les sources locales sont interrogées
+    ORCHESTRATOR_MIN_OFFRES = 5  # En dessous, les sources du palier suivant sont interrogées
+    ORCHESTRATOR_WORKERS = 32  # Sources interrogées simultanément, toutes recherches confondues
+    
+    # Politesse envers les sites
+    MAX_REQUESTS_PER_MINUTE = int(os.getenv("MAX_REQUESTS_PER_MINUTE", 10))  # Par site
+    RATE_LIMIT_BURST = 5  # Requêtes autorisées d'un coup avant espacement
+    # robots.txt respecté: LinkedIn, qui interdit les robots non autorisés, n'est alors jamais interrogé
+    RESPECT_ROBOTS_TXT = os.getenv("RESPECT_ROBOTS_TXT", "true").lower() == "true"
+    USER_AGENT = os.getenv("USER_AGENT", "ContactResearchBot/1.0")  # Envoyé par les scrapers et vérifié dans robots.txt
+    
+    # Crawler (python -m core.crawler)
+    CRAWL_INTERVAL = 3600  # Secondes entre deux passes
+    CRAWL_WORKERS = 4  # Recherches secteur × ville simultanées
+    CRAWL_DEADLINE = 600  # Délai max (s) d'une recherche pendant le crawl
+    CRAWL_MAX_AGE = 6 * 3600  # Au-delà, l'interface refait une recherche en direct
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+    
+    # Recherche par lots (python -m core.batch_search)
+    BATCH_WORKERS = 4  # Recherches secteur × ville simultanées
+    BATCH_DEADLINE = 600  # Délai max (s) d'une source, et d'une recherche, pendant un lot
+    
+    # Vérification des liens d'offres (en arrière-plan)
+    LINK_CHECK_TTL = 24 * 3600  # Durée de validité (s) d'une vérification
+    LINK_CHECK_INTERVAL = int(os.getenv("LINK_CHECK_INTERVAL", 1800))  # 0 = désactivée dans l'interface
+    LINK_CHECK_WORKERS = 8  # Vérifications simultanées
+    LINK_CHECK_PER_HOST = 2  # Vérifications simultanées par site
+    LINK_CHECK_TIMEOUT = 10
+    LINK_CHECK_QUEUE_WAIT = 10  # Attente max. (s) d'un créneau: laisse la priorité aux recherches
+    
+    # Cache HTTP (disque)
+    CACHE_MAX_BYTES = 50 * 1024 * 1024
+    CACHE_TTL = {  # Durée de validité (s) par site
+        'rekrute.com': 3600,
+        'emploi.ma': 3600,
+        'marocannonces.com': 1800,
+        'linkedin.com': 1800,
+        'api.adzuna.com': 6 * 3600,
+        'reed.co.uk': 6 * 3600,
+        'default': 24 * 3600  # Pages carrières des entreprises
+    }
     
     # Sources alternatives
     USE_GOOGLE_SEARCH = True
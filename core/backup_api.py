@@ -1,12 +1,13 @@
 import requests
 import json
-from typing import List, Dict
+from typing import List, Dict, Optional
+from core.http_cache import build_session
 
 class BackupAPIs:
     """APIs de secours pour offres d'emploi"""
     
-    def __init__(self):
-        self.session = requests.Session()
+    def __init__(self, session: Optional[requests.Session] = None):
+        self.session = session or build_session()
     
     def search_adzuna(self, secteur: str, pays: str = "ma") -> List[Dict]:
         """Adzuna API (gratuite - 100 requêtes/jour)"""
@@ -0,0 +1,220 @@
+"""
+Recherche par lots sur la grille secteurs × villes (campagnes de précalcul).
+
+Lance MarocSearchEngine.search_pfe_opportunities pour chaque combinaison,
+`--workers` à la fois, avec les données partagées du processus (core.registry):
+cache HTTP disque, stock du crawler et index des entreprises servent à toutes
+les recherches, et une page demandée par plusieurs recherches en même temps
+n'est téléchargée qu'une fois (core.http_cache.CachedSession). Comme le
+crawler, le lot passe par le limiteur de débit commun mais avec ses propres
+délais (BATCH_DEADLINE): une recherche attend son tour auprès des portails au
+lieu de tomber, faute de temps, sur les sources de secours. Les résultats,
+une ligne par offre ou entreprise trouvée, sont écrits au fil de l'eau
+(utils.export), suivis d'un résumé des temps en JSON.
+
+Usage:
+    python -m core.batch_search --output campagne.jsonl
+    python -m core.batch_search --format parquet --output campagne.parquet --workers 8
+    python -m core.batch_search --secteur "Informatique / IT / Développement" --ville Rabat --ville Fès
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from config import settings
+from core import events
+from core.http_cache import build_session
+from core.maroc_search import MarocSearchEngine
+from core.metrics import metrics
+from core.real_offers import RealOffersFinder
+from core.registry import EngineRegistry, get_registry
+from core.smart_offers import SUGGESTION
+from core.stage_finder import StageFinder
+from utils.export import EXPORT_FORMATS, write_rows
+
+logger = logging.getLogger('core.batch_search')
+
+BATCH_COLUMNS = ['secteur_recherche', 'ville_recherche', 'type', 'id', 'titre', 'entreprise', 'lieu', 'lien',
+                 'source', 'date_publication', 'valide', 'specialite', 'contacts']
+BATCH_TYPES = {'valide': bool}
+
+
+def _text(value) -> Optional[str]:
+    return None if value is None else str(value)
+
+
+def result_rows(secteur: str, ville: str, results: Dict) -> Iterator[Dict]:
+    """
+    Lignes d'export (colonnes BATCH_COLUMNS) des offres puis des entreprises d'une recherche.
+    Les offres générées faute d'annonces (core.smart_offers) ont le type 'suggestion'.
+    """
+    for offre in results['offres']:
+        yield {
+            'secteur_recherche': secteur,
+            'ville_recherche': ville,
+            'type': 'suggestion' if offre.get('type') == SUGGESTION else 'offre',
+            'id': offre.get('id'),
+            'titre': _text(offre.get('titre')),
+            'entreprise': _text(offre.get('entreprise')),
+            'lieu': _text(offre.get('lieu')),
+            'lien': _text(offre.get('lien')),
+            'source': _text(offre.get('source')),
+            'date_publication': _text(offre.get('date_publication')),
+            'valide': bool(offre.get('valide', False))
+        }
+    for entreprise in results['entreprises']:
+        yield {
+            'secteur_recherche': secteur,
+            'ville_recherche': ville,
+            'type': 'entreprise',
+            'id': entreprise.get('id'),
+            'entreprise': _text(entreprise.get('nom')),
+            'lieu': _text(entreprise.get('ville')),
+            'lien': _text(entreprise.get('site_web')),
+            'specialite': _text(entreprise.get('specialite')),
+            'contacts': '; '.join(contact['email'] for contact in entreprise.get('contacts', [])
+                                  if contact.get('email'))
+        }
+
+
+def run_batch(engine: MarocSearchEngine, grid: List[Tuple[str, str]], workers: int) -> Iterator[Dict]:
+    """
+    Recherches de la grille, `workers` à la fois. Produit un rapport par recherche
+    terminée: {'secteur', 'ville', 'duree', 'nb_offres', 'nb_entreprises', 'erreur', 'results'}.
+    """
+    def search(secteur: str, ville: str) -> Tuple[Dict, float]:
+        debut = time.perf_counter()
+        results = engine.search_pfe_opportunities(secteur, ville, type_recherche="stage")
+        return results, time.perf_counter() - debut
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='batch') as executor:
+        futures = {executor.submit(search, secteur, ville): (secteur, ville) for secteur, ville in grid}
+        for future in as_completed(futures):
+            secteur, ville = futures[future]
+            rapport = {'secteur': secteur, 'ville': ville, 'duree': None, 'nb_offres': 0,
+                       'nb_entreprises': 0, 'erreur': None, 'results': {'offres': [], 'entreprises': []}}
+            try:
+                results, rapport['duree'] = future.result()
+            except Exception as e:
+                rapport['erreur'] = str(e)
+            else:
+                rapport['results'] = results
+                rapport['nb_offres'] = len(results['offres'])
+                rapport['nb_entreprises'] = len(results['entreprises'])
+            yield rapport
+
+
+def batch_engine(registry: EngineRegistry, deadline: float) -> MarocSearchEngine:
+    """
+    Moteur du lot: données et services du registre, mais session et délais propres.
+    Chaque source (et chaque requête dans la file d'un site) peut attendre `deadline` secondes.
+    """
+    session = build_session()
+    session.max_queue_wait = deadline
+    real_finder = RealOffersFinder(session=session, link_validator=registry.link_validator,
+                                   http_client=registry.http_client)
+    stage_finder = StageFinder(session=session, real_finder=real_finder, offer_store=registry.offer_store,
+                               deadline=deadline)
+    return MarocSearchEngine(entreprises_db=registry.entreprises_db, stage_finder=stage_finder)
+
+
+def _percentile(values: List[float], q: float) -> float:
+    """Percentile (rang le plus proche) d'une liste triée"""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, max(0, math.ceil(q * len(values)) - 1))]
+
+
+def summarize(rapports: List[Dict], duree: float, workers: int, cache_before: Dict, cache_after: Dict) -> Dict:
+    """Résumé des temps: débit, latence par recherche, cache HTTP et étapes (core.metrics)"""
+    durees = sorted(r['duree'] for r in rapports if r['duree'] is not None)
+    return {
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'requetes': len(rapports),
+        'workers': workers,
+        'duree_s': round(duree, 3),
+        'requetes_par_s': round(len(rapports) / duree, 3) if duree else 0.0,
+        'erreurs': sum(1 for r in rapports if r['erreur']),
+        'offres': sum(r['nb_offres'] for r in rapports),
+        'entreprises': sum(r['nb_entreprises'] for r in rapports),
+        'latence_s': {
+            'moyenne': round(sum(durees) / len(durees), 3) if durees else 0.0,
+            'p50': round(_percentile(durees, 0.5), 3),
+            'p90': round(_percentile(durees, 0.9), 3),
+            'p99': round(_percentile(durees, 0.99), 3),
+            'max': round(durees[-1], 3) if durees else 0.0
+        },
+        'cache_http': {key: cache_after[key] - cache_before[key] for key in ('hits', 'misses', 'revalidations')},
+        'etapes': metrics.snapshot()['latency'],
+        'detail': [{key: value for key, value in r.items() if key != 'results'} for r in rapports]
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Recherche par lots sur la grille secteurs × villes")
+    parser.add_argument('--output', required=True, help="Fichier des résultats (une ligne par offre/entreprise)")
+    parser.add_argument('--format', choices=list(EXPORT_FORMATS), default='jsonl')
+    parser.add_argument('--summary', help="Résumé des temps (JSON); par défaut <output>.summary.json")
+    parser.add_argument('--workers', type=int, default=settings.BATCH_WORKERS, help="Recherches simultanées")
+    parser.add_argument('--secteur', action='append', help="Limiter à ce secteur (répétable)")
+    parser.add_argument('--ville', action='append', help="Limiter à cette ville (répétable)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=settings.LOG_LEVEL, format='%(asctime)s %(levelname)s %(message)s')
+    events.subscribe(events.log_event)
+
+    registry = get_registry()
+    engine = batch_engine(registry, settings.BATCH_DEADLINE)
+    secteurs = args.secteur or engine.get_secteurs_disponibles()
+    villes = args.ville or engine.get_villes_maroc()
+    grid = list(dict.fromkeys((secteur, ville) for secteur in secteurs for ville in villes))
+    summary_path = args.summary or f"{os.path.splitext(args.output)[0]}.summary.json"
+
+    logger.info("%d recherches (%d secteurs × %d villes), %d à la fois",
+                len(grid), len(secteurs), len(villes), args.workers)
+    cache = engine.stage_finder.session.cache
+    cache_before = cache.stats()
+    rapports = []
+    start = time.perf_counter()
+
+    def rows() -> Iterator[Dict]:
+        for rapport in run_batch(engine, grid, args.workers):
+            results = rapport.pop('results')
+            rapports.append(rapport)
+            if rapport['erreur']:
+                logger.warning("[%d/%d] %s | %s: échec (%s)", len(rapports), len(grid),
+                               rapport['secteur'], rapport['ville'], rapport['erreur'])
+            else:
+                logger.info("[%d/%d] %s | %s: %d offres, %d entreprises en %.1fs", len(rapports), len(grid),
+                            rapport['secteur'], rapport['ville'], rapport['nb_offres'],
+                            rapport['nb_entreprises'], rapport['duree'])
+            yield from result_rows(rapport['secteur'], rapport['ville'], results)
+
+    try:
+        with open(args.output, 'wb') as out:
+            write_rows(rows(), BATCH_COLUMNS, args.format, out, BATCH_TYPES)
+    finally:
+        # Vérifications de liens lancées par les recherches: inutiles une fois le lot terminé
+        registry.link_validator.close(wait=False)
+
+    summary = summarize(rapports, time.perf_counter() - start, args.workers,
+                        cache_before, cache.stats())
+    with open(summary_path, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+
+    logger.info("Terminé: %(requetes)d recherches, %(offres)d offres, %(entreprises)d entreprises, "
+                "%(erreurs)d erreurs en %(duree_s).1fs", summary)
+    logger.info("Latence par recherche: p50 %.1fs, p99 %.1fs; cache HTTP: %d succès, %d téléchargements",
+                summary['latence_s']['p50'], summary['latence_s']['p99'],
+                summary['cache_http']['hits'], summary['cache_http']['misses'])
+    logger.info("Résultats: %s; résumé: %s", args.output, summary_path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""
+Crawler d'offres en arrière-plan.
+
+Parcourt périodiquement toutes les plateformes pour chaque couple
+secteur × ville proposé par l'application et enregistre les offres dans
+le stockage local (data/offres.sqlite) consulté ensuite par l'interface,
+puis vérifie les liens des offres stockées (core.link_validator).
+
+Usage:
+    python -m core.crawler              # boucle, une passe toutes les CRAWL_INTERVAL secondes
+    python -m core.crawler --once       # une seule passe
+    python -m core.crawler --metrics data/crawler.prom   # mesures (format Prometheus) après chaque passe
+"""
+import argparse
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional
+
+from config import settings
+from core import events
+from core.http_cache import build_session
+from core.metrics import metrics
+from core.offer_store import OfferStore
+from core.real_offers import RealOffersFinder
+from core.registry import get_registry
+
+logger = logging.getLogger('core.crawler')
+
+
+def crawl_once(store: OfferStore, finder: RealOffersFinder, secteurs: List[str],
+               villes: List[str], workers: int) -> Dict:
+    """Collecte toutes les combinaisons secteur × ville, `workers` à la fois"""
+    start = time.perf_counter()
+    grid = [(secteur, ville) for secteur in secteurs for ville in villes]
+    total_offres = 0
+    erreurs = 0
+
+    def crawl(secteur: str, ville: str) -> int:
+        debut = time.perf_counter()
+        resultats = finder.fetch_all_portals(secteur, ville, deadline=settings.CRAWL_DEADLINE)
+        # Ne pas écraser le stock si aucune plateforme n'a répondu
+        if not any(resultat['offres'] for resultat in resultats.values()):
+            raise RuntimeError("aucune plateforme n'a répondu")
+        offres, _ = finder.merge_portal_results(resultats)
+        store.save_results(secteur, ville, offres, duree=time.perf_counter() - debut)
+        return len(offres)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(crawl, secteur, ville): (secteur, ville) for secteur, ville in grid}
+        for future in as_completed(futures):
+            secteur, ville = futures[future]
+            try:
+                nb = future.result()
+                total_offres += nb
+                logger.info("%s | %s: %d offres", secteur, ville, nb)
+            except Exception as e:
+                erreurs += 1
+                logger.warning("%s | %s: échec (%s)", secteur, ville, e)
+
+    return {
+        'recherches': len(grid),
+        'offres': total_offres,
+        'erreurs': erreurs,
+        'duree': time.perf_counter() - start
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Crawler d'offres de stage (secteurs × villes)")
+    parser.add_argument('--once', action='store_true', help="Une seule passe puis arrêt")
+    parser.add_argument('--interval', type=float, default=settings.CRAWL_INTERVAL,
+                        help="Secondes entre deux passes")
+    parser.add_argument('--workers', type=int, default=settings.CRAWL_WORKERS,
+                        help="Recherches simultanées")
+    parser.add_argument('--secteur', action='append', help="Limiter à ce secteur (répétable)")
+    parser.add_argument('--ville', action='append', help="Limiter à cette ville (répétable)")
+    parser.add_argument('--no-links', action='store_true', help="Ne pas vérifier les liens après chaque passe")
+    parser.add_argument('--metrics', metavar='FICHIER',
+                        help="Écrire les mesures (format texte Prometheus) après chaque passe")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=settings.LOG_LEVEL, format='%(asctime)s %(levelname)s %(message)s')
+    events.subscribe(events.log_event)
+
+    registry = get_registry()
+    secteurs = args.secteur or registry.engine.get_secteurs_disponibles()
+    villes = args.ville or registry.engine.get_villes_maroc()
+
+    # Même limiteur par site que les autres scrapers, mais le crawler peut
+    # attendre son tour bien plus longtemps que l'interface
+    session = build_session()
+    session.max_queue_wait = settings.CRAWL_DEADLINE
+    finder = RealOffersFinder(session=session, link_validator=registry.link_validator,
+                              http_client=registry.http_client)
+
+    while True:
+        stats = crawl_once(registry.offer_store, finder, secteurs, villes, args.workers)
+        logger.info("Passe terminée: %(recherches)d recherches, %(offres)d offres, "
+                    "%(erreurs)d erreurs en %(duree).1fs", stats)
+        if not args.no_links:
+            stats = registry.link_validator.validate_store()
+            logger.info("Liens vérifiés: %(verifies)d/%(liens)d (%(valides)d valides) en %(duree).1fs", stats)
+        if args.metrics:
+            with open(args.metrics, 'w', encoding='utf-8') as f:
+                f.write(metrics.to_prometheus())
+        if args.once:
+            break
+        time.sleep(args.interval)
+
+
+if __name__ == '__main__':
+    main()
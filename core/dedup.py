@@ -0,0 +1,167 @@
+"""
+Dédoublonnage des offres.
+
+Une même offre arrive souvent plusieurs fois: republiée sur plusieurs portails
+avec un titre légèrement différent, ou avec des paramètres de suivi dans le lien.
+Deux offres sont considérées comme identiques si, pour une même entreprise
+(normalisée), elles ont:
+- le même titre normalisé, ou
+- le même lien canonique (lien propre à l'offre, `lien_propre`) et des titres proches, ou
+- des titres quasi identiques (similarité de Jaccard des trigrammes >= seuil).
+
+Les quasi-doublons sont cherchés par MinHash + LSH: chaque offre n'est comparée
+qu'aux offres partageant un de ses « seaux », le coût reste linéaire en nombre d'offres.
+"""
+import zlib
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import numpy as np
+
+from core.metrics import metrics
+from utils.text import char_trigrams, tokens
+
+# Paramètres d'URL sans effet sur la page affichée (suivi, campagnes, tri)
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'msclkid', 'mc_cid', 'mc_eid', 'ref', 'refid', 'referer',
+    'trk', 'trkinfo', 'trackingid', 'src', 'source', 'origin', 'position', 'pagenum', 'sort'
+}
+TRACKING_PREFIXES = ('utm_', 'ga_', 'pk_')
+HOST_PREFIXES = ('www.', 'm.', 'fr.', 'ma.')
+
+# Suffixes sans valeur distinctive dans un nom d'entreprise ("Capgemini Maroc SA")
+COMPANY_SUFFIXES = {'maroc', 'morocco', 'sa', 'sarl', 'sas', 'sarlau', 'ltd', 'inc'}
+# Mots sans valeur distinctive dans un titre ("Stage PFE - Développeur (H/F)")
+TITLE_NOISE = {'h', 'f', 'hf', 'fh', 'm'}
+
+SIMILARITY_THRESHOLD = 0.8  # Jaccard minimale entre titres pour un quasi-doublon
+URL_SIMILARITY_THRESHOLD = 0.5  # Idem quand les liens canoniques sont identiques
+
+NUM_PERM = 32  # Permutations MinHash
+BANDS = 8  # Bandes LSH (NUM_PERM / BANDS lignes par bande)
+_PRIME = (1 << 31) - 1
+_rng = np.random.default_rng(20240601)  # Graine fixe: signatures stables d'un processus à l'autre
+_PERM_A = _rng.integers(1, _PRIME, size=NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.integers(0, _PRIME, size=NUM_PERM, dtype=np.uint64)
+
+
+def canonical_url(url: Optional[str]) -> str:
+    """
+    Forme canonique d'un lien d'offre: schéma https, hôte en minuscules sans www./m.,
+    sans port par défaut, fragment ni paramètres de suivi; paramètres restants triés.
+    Chaîne vide si le lien n'est pas une URL http(s).
+    """
+    if not url or not url.startswith(('http://', 'https://')):
+        return ''
+
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or '').lower()
+    for prefix in HOST_PREFIXES:
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+            break
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=False)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    )
+    path = parts.path.rstrip('/') or '/'
+
+    return urlunsplit(('https', host, path, urlencode(query), ''))
+
+
+def normalize_title(titre: Optional[str]) -> str:
+    """Titre en minuscules, sans accents ni ponctuation ni mentions (H/F)"""
+    return ' '.join(t for t in tokens(titre or '') if t not in TITLE_NOISE)
+
+
+def normalize_company(entreprise: Optional[str]) -> str:
+    """Nom d'entreprise en minuscules, sans accents ni suffixes "Maroc", "SA"..."""
+    mots = tokens(entreprise or '')
+    while len(mots) > 1 and mots[-1] in COMPANY_SUFFIXES:
+        mots.pop()
+    return ' '.join(mots)
+
+
+def has_own_link(offre: Dict) -> bool:
+    """
+    Vrai si le lien de l'offre lui est propre (trouvé par le parseur), faux si c'est la page
+    de recherche ou de carrières utilisée à défaut, partagée par plusieurs offres.
+    Offres sans `lien_propre` (anciens formats): leur champ `valide` en tient lieu.
+    """
+    return bool(offre.get('lien_propre', offre.get('valide', False)))
+
+
+def minhash(grams: Set[str]) -> np.ndarray:
+    """Signature MinHash (NUM_PERM valeurs) d'un ensemble de trigrammes"""
+    if not grams:
+        return np.zeros(NUM_PERM, dtype=np.uint64)
+    hashes = np.fromiter((zlib.crc32(g.encode()) for g in grams), dtype=np.uint64, count=len(grams))
+    hashes %= _PRIME
+    return ((np.outer(_PERM_A, hashes) + _PERM_B[:, None]) % _PRIME).min(axis=1)
+
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class OfferDeduplicator:
+    """
+    Dédoublonnage incrémental: `add` retourne False si l'offre est un doublon
+    d'une offre déjà ajoutée. La première occurrence est conservée.
+    """
+
+    def __init__(self, threshold: float = SIMILARITY_THRESHOLD):
+        self.threshold = threshold
+        self._exact: Set[Tuple[str, str]] = set()
+        self._by_url: Dict[Tuple[str, str], List[int]] = {}
+        # Seaux LSH par entreprise: seules les offres d'une même entreprise sont comparées
+        self._buckets: Dict[Tuple[str, int, bytes], List[int]] = {}
+        self._grams: List[Set[str]] = []
+
+    def add(self, offre: Dict) -> bool:
+        titre = normalize_title(offre.get('titre'))
+        entreprise = normalize_company(offre.get('entreprise'))
+
+        key = (titre, entreprise)
+        if key in self._exact:
+            return False
+
+        grams = char_trigrams(titre, padded=True)
+        url_key = (canonical_url(offre.get('lien')) if has_own_link(offre) else '', entreprise)
+        if url_key[0] and any(jaccard(grams, self._grams[i]) >= URL_SIMILARITY_THRESHOLD
+                              for i in self._by_url.get(url_key, ())):
+            return False
+
+        rows = NUM_PERM // BANDS
+        signature = minhash(grams)
+        bands = [(entreprise, band, signature[band * rows:(band + 1) * rows].tobytes())
+                 for band in range(BANDS)]
+
+        candidates = {i for bucket in bands for i in self._buckets.get(bucket, ())}
+        if any(jaccard(grams, self._grams[i]) >= self.threshold for i in candidates):
+            return False
+
+        index = len(self._grams)
+        self._grams.append(grams)
+        self._exact.add(key)
+        if url_key[0]:
+            self._by_url.setdefault(url_key, []).append(index)
+        for bucket in bands:
+            self._buckets.setdefault(bucket, []).append(index)
+        return True
+
+
+def dedupe_offres(offres: Iterable[Dict], threshold: float = SIMILARITY_THRESHOLD) -> List[Dict]:
+    """Offres sans doublons ni quasi-doublons, dans l'ordre d'origine"""
+    deduplicator = OfferDeduplicator(threshold)
+    offres = list(offres)
+    with metrics.timer('dedup'):
+        uniques = [offre for offre in offres if deduplicator.add(offre)]
+    metrics.inc('dedup_offres', len(uniques), outcome='kept')
+    metrics.inc('dedup_offres', len(offres) - len(uniques), outcome='duplicate')
+    return uniques
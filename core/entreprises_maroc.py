@@ -1,337 +1,193 @@
 import json
 import os
-from typing import List, Dict, Optional
-import streamlit as st
+from collections import Counter
+from typing import Dict, List, Optional, Set, Tuple
+from core.ids import company_id
+from core.sector_classifier import classifier
+from utils.text import char_trigrams, fold, tokens, trigrams
+
+# Longueur maximale des préfixes indexés pour chaque mot d'un nom
+PREFIX_MAX_LEN = 8
+
+# Recherche floue: nombre de candidats rescorés, et volume de listes de
+# trigrammes parcourues (les plus rares d'abord, ex: "mar" de "Maroc" en dernier)
+FUZZY_CANDIDATES = 30
+FUZZY_MIN_TRIGRAMS = 4
+FUZZY_POSTINGS_BUDGET = 1000
+
+# Index déjà construits, par (chemin, date de modification) du fichier
+_STORE_CACHE: Dict[tuple, Dict] = {}
 
 class EntreprisesMaroc:
     """Base de données des entreprises marocaines par secteur"""
     
-    def __init__(self):
-        self.data_file = os.path.join(os.path.dirname(__file__), '..', 'data', 'entreprises_maroc.json')
-        self.entreprises = self._load_data()
+    def __init__(self, data_file: Optional[str] = None):
+        self.data_file = data_file or os.path.join(os.path.dirname(__file__), '..', 'data', 'entreprises_maroc.json')
+        store = self._load_store()
+        self.entreprises = store['entreprises']
+        self._all = store['all']
+        self._by_sector = store['by_sector']
+        self._by_city = store['by_city']
+        self._with_stage = store['with_stage']
+        self._name_prefix = store['name_prefix']
+        self._name_trigrams = store['name_trigrams']
+        self._names = store['names']
+        self._gram_counts = store['gram_counts']
+        self._positions = store['positions']
+    
+    def _load_data(self) -> Dict[str, List[Dict]]:
+        """Charge la base de données des entreprises depuis data/entreprises_maroc.json"""
+        with open(self.data_file, encoding='utf-8') as f:
+            return json.load(f)
+    
+    def _load_store(self) -> Dict:
+        """Charge le fichier et ses index une seule fois par version du fichier"""
+        cache_key = (os.path.abspath(self.data_file), os.path.getmtime(self.data_file))
+        if cache_key not in _STORE_CACHE:
+            _STORE_CACHE[cache_key] = self._build_store(self._load_data())
+        return _STORE_CACHE[cache_key]
+    
+    @staticmethod
+    def split_villes(ville: str) -> List[str]:
+        """'Casablanca, Rabat' -> ['casablanca', 'rabat']"""
+        return [fold(v) for v in (ville or '').split(',') if v.strip()]
     
-    def _load_data(self):
-        """Charge la base de données des entreprises"""
-        entreprises_data = {
-            'informatique': [
-                {
-                    'nom': 'Atos Maroc',
-                    'ville': 'Casablanca',
-                    'site_web': 'https://atos.net/maroc',
-                    'specialite': 'Services IT, Consulting',
-                    'contacts': [
-                        {'nom': 'Service RH', 'email': 'rh.maroc@atos.net', 'telephone': '+212 5 22 XX XX XX'},
-                        {'nom': 'Service Recrutement', 'email': 'recrutement.maroc@atos.net'}
-                    ],
-                    'offres_stage': True,
-                    'type': 'ESN/SSII'
-                },
-                {
-                    'nom': 'Capgemini Maroc',
-                    'ville': 'Casablanca, Rabat',
-                    'site_web': 'https://www.capgemini.com/ma-ma/',
-                    'specialite': 'Transformation digitale, IT',
-                    'contacts': [
-                        {'nom': 'Service Carrières', 'email': 'maroc.careers@capgemini.com'},
-                        {'nom': 'RH Maroc', 'email': 'rh.maroc@capgemini.com'}
-                    ],
-                    'offres_stage': True,
-                    'type': 'ESN'
-                },
-                {
-                    'nom': 'IBM Maroc',
-                    'ville': 'Casablanca',
-                    'site_web': 'https://www.ibm.com/ma-fr',
-                    'specialite': 'Cloud, IA, Solutions IT',
-                    'contacts': [
-                        {'nom': 'Recrutement Maroc', 'email': 'recrutement.ma@ibm.com'}
-                    ],
-                    'offres_stage': True,
-                    'type': 'Éditeur Logiciel'
-                },
-                {
-                    'nom': 'Microsoft Maroc',
-                    'ville': 'Casablanca',
-                    'site_web': 'https://www.microsoft.com/fr-ma',
-                    'specialite': 'Logiciels, Cloud Azure',
-                    'contacts': [
-                        {'nom': 'Contact Maroc', 'email': 'infoma@microsoft.com'}
-                    ],
-                    'offres_stage': True,
-                    'type': 'Éditeur'
-                },
-                {
-                    'nom': 'Oracle Maroc',
-                    'ville': 'Casablanca',
-                    'site_web': 'https://www.oracle.com/ma/',
-                    'specialite': 'Bases de données, ERP',
-                    'contacts': [
-                        {'nom': 'Service Client Maroc', 'email': 'ma-info_ww@oracle.com'}
-                    ],
-                    'offres_stage': True,
-                    'type': 'Éditeur'
-                },
-                {
-                    'nom': 'HPS Maroc',
-                    'ville': 'Casablanca',
-                    'site_web': 'https://www.hps-worldwide.com/',
-                    'specialite': 'Solutions de paiement',
-                    'contacts': [
-                        {'nom': 'RH Maroc', 'email': 'careers@hps-inc.com'}
-                    ],
-                    'offres_stage': True,
-                    'type': 'Fintech'
-                },
-                {
-                    'nom': 'SQLI Maroc',
-                    'ville': 'Casablanca, Rabat',
-                    'site_web': 'https://www.sqli.ma/',
-                    'specialite': 'Digital, E-commerce',
-                    'contacts': [
-                        {'nom': 'Recrutement', 'email': 'recrutement.ma@sqli.com'}
-                    ],
-                    'offres_stage': True,
-                    'type': 'Agence Web'
-                },
-                {
-                    'nom': 'Sofrecom Maroc',
-                    'ville': 'Casablanca',
-                    'site_web': 'https://www.sofrecom.com/fr/',
-                    'specialite': 'Télécoms, Digital',
-                    'contacts': [
-                        {'nom': 'Carrières Maroc', 'email': 'maroc@sofrecom.com'}
-                    ],
-                    'offres_stage': True,
-                    'type': 'ESN'
-                }
-            ],
-            'telecom': [
-                {
-                    'nom': 'Maroc Telecom',
-                    'ville': 'Casablanca',
-                    'site_web': 'https://www.iam.ma/',
-                    'specialite': 'Télécommunications',
-                    'contacts': [
-                        {'nom': 'Recrutement', 'email': 'recrutement@iam.ma'},
-                        {'nom': 'Service RH', 'email': 'drh@iam.ma'}
-                    ],
-                    'offres_stage': True,
-                    'type': 'Opérateur Télécom'
-                },
-                {
-                    'nom': 'Orange Maroc',
-                    'ville': 'Casablanca',
-                    'site_web': 'https://www.orange.ma/',
-                    'specialite': 'Télécommunications, Mobile',
-                    'contacts': [
-                        {'nom': 'Carrières', 'email': 'recrutement@orange.ma'}
-                    ],
-                    'offres_stage': True,
-                    'type': 'Opérateur'
-                },
-                {
-                    'nom': 'Inwi',
-                    'ville': 'Casablanca',
-                    'site_web': 'https://www.inwi.ma/',
-                    'specialite': 'Télécoms, Internet',
-                    'contacts': [
-                        {'nom': 'RH', 'email': 'rh@inwi.ma'}
-                    ],
-                    'offres_stage': True,
-                    'type': 'Opérateur'
-                }
-            ],
-            'banque_finance': [
-                {
-                    'nom': 'Attijariwafa Bank',
-                    'ville': 'Casablanca',
-                    'site_web': 'https://www.attijariwafabank.com/',
-                    'specialite': 'Banque, Finance',
-                    'contacts': [
-                        {'nom': 'Service RH', 'email': 'rh@attijariwafabank.com'}
-                    ],
-                    'offres_stage': True,
-                    'type': 'Banque'
-                },
-                {
-                    'nom': 'BMCE Bank',
-                    'ville': 'Casablanca',
-                    'site_web': 'https://www.bmcebank.ma/',
-                    'specialite': 'Banque Commerciale',
-                    'contacts': [
-                        {'nom': 'Recrutement', 'email': 'recrutement@bmcebank.ma'}
-                    ],
-                    'offres_stage': True,
-                    'type': 'Banque'
-                },
-                {
-                    'nom': 'Banque Populaire',
-                    'ville': 'Casablanca',
-                    'site_web': 'https://www.gbp.ma/',
-                    'specialite': 'Banque, Finance',
-                    'contacts': [
-                        {'nom': 'Direction RH', 'email': 'drh@gbp.ma'}
-                    ],
-                    'offres_stage': True,
-                    'type': 'Banque'
-                }
-            ],
-            'industrie': [
-                {
-                    'nom': 'OCP Group',
-                    'ville': 'Casablanca, Khouribga',
-                    'site_web': 'https://www.ocpgroup.ma/',
-                    'specialite': 'Phosphates, Engrais',
-                    'contacts': [
-                        {'nom': 'Recrutement', 'email': 'recrutement@ocpgroup.ma'},
-                        {'nom': 'Service Stages', 'email': 'stages@ocpgroup.ma'}
-                    ],
-                    'offres_stage': True,
-                    'type': 'Industrie Chimique'
-                },
-                {
-                    'nom': 'Managem',
-                    'ville': 'Casablanca',
-                    'site_web': 'https://www.managemgroup.com/',
-                    'specialite': 'Mines, Métaux',
-                    'contacts': [
-                        {'nom': 'RH', 'email': 'rh@managemgroup.com'}
-                    ],
-                    'offres_stage': True,
-                    'type': 'Mining'
-                },
-                {
-                    'nom': 'LafargeHolcim Maroc',
-                    'ville': 'Casablanca',
-                    'site_web': 'https://www.lafargeholcim.ma/',
-                    'specialite': 'Ciment, BTP',
-                    'contacts': [
-                        {'nom': 'Carrières', 'email': 'recrutement.ma@lafargeholcim.com'}
-                    ],
-                    'offres_stage': True,
-                    'type': 'Matériaux Construction'
-                }
-            ],
-            'energie': [
-                {
-                    'nom': 'ONEE',
-                    'ville': 'Casablanca, Rabat',
-                    'site_web': 'https://www.one.org.ma/',
-                    'specialite': 'Eau, Électricité',
-                    'contacts': [
-                        {'nom': 'Service RH', 'email': 'drh@one.org.ma'}
-                    ],
-                    'offres_stage': True,
-                    'type': 'Énergie'
-                },
-                {
-                    'nom': 'MASEN',
-                    'ville': 'Rabat',
-                    'site_web': 'https://www.masen.ma/',
-                    'specialite': 'Énergies Renouvelables',
-                    'contacts': [
-                        {'nom': 'Recrutement', 'email': 'recrutement@masen.ma'}
-                    ],
-                    'offres_stage': True,
-                    'type': 'Énergie Solaire'
-                }
-            ],
-            'sante': [
-                {
-                    'nom': 'Pharmalog',
-                    'ville': 'Casablanca',
-                    'site_web': 'https://www.pharmalog.ma/',
-                    'specialite': 'Pharmacie, Distribution',
-                    'contacts': [
-                        {'nom': 'RH', 'email': 'rh@pharmalog.ma'}
-                    ],
-                    'offres_stage': True,
-                    'type': 'Santé'
-                },
-                {
-                    'nom': 'Cooper Pharma',
-                    'ville': 'Casablanca',
-                    'site_web': 'https://www.cooperpharma.com/',
-                    'specialite': 'Pharmaceutique',
-                    'contacts': [
-                        {'nom': 'Recrutement', 'email': 'rh@cooperpharma.com'}
-                    ],
-                    'offres_stage': True,
-                    'type': 'Pharma'
-                }
-            ],
-            'logistique': [
-                {
-                    'nom': 'Marsa Maroc',
-                    'ville': 'Casablanca',
-                    'site_web': 'https://www.marsamaroc.co.ma/',
-                    'specialite': 'Logistique Portuaire',
-                    'contacts': [
-                        {'nom': 'Service RH', 'email': 'rh@marsamaroc.co.ma'}
-                    ],
-                    'offres_stage': True,
-                    'type': 'Logistique'
-                },
-                {
-                    'nom': 'Tanger Med',
-                    'ville': 'Tanger',
-                    'site_web': 'https://www.tangermed.ma/',
-                    'specialite': 'Port, Logistique',
-                    'contacts': [
-                        {'nom': 'Carrières', 'email': 'recrutement@tangermed.ma'}
-                    ],
-                    'offres_stage': True,
-                    'type': 'Portuaire'
-                }
-            ]
+    def _build_store(self, entreprises_data: Dict[str, List[Dict]]) -> Dict:
+        """Précalcule les index: ville, offres de stage, préfixes et trigrammes du nom"""
+        all_entreprises = []
+        by_sector: Dict[str, Set[int]] = {}
+        by_city: Dict[str, Set[int]] = {}
+        with_stage: Set[int] = set()
+        name_prefix: Dict[str, Set[int]] = {}
+        name_trigrams: Dict[str, Set[int]] = {}
+        names = []
+        gram_counts = []
+        
+        for secteur, entreprises in entreprises_data.items():
+            for entreprise in entreprises:
+                position = len(all_entreprises)
+                entreprise['id'] = company_id(entreprise)
+                all_entreprises.append(entreprise)
+                by_sector.setdefault(secteur, set()).add(position)
+                
+                for ville in self.split_villes(entreprise.get('ville', '')):
+                    by_city.setdefault(ville, set()).add(position)
+                
+                if entreprise.get('offres_stage', False):
+                    with_stage.add(position)
+                
+                name_tokens = tokens(entreprise['nom'])
+                names.append(' '.join(name_tokens))
+                for token in name_tokens:
+                    for length in range(1, min(len(token), PREFIX_MAX_LEN) + 1):
+                        name_prefix.setdefault(token[:length], set()).add(position)
+                name_grams = trigrams(entreprise['nom'], padded=True)
+                gram_counts.append(len(name_grams))
+                for trigram in name_grams:
+                    name_trigrams.setdefault(trigram, set()).add(position)
+        
+        return {
+            'entreprises': entreprises_data,
+            'all': all_entreprises,
+            'by_sector': by_sector,
+            'by_city': by_city,
+            'with_stage': with_stage,
+            'name_prefix': name_prefix,
+            'name_trigrams': name_trigrams,
+            'names': names,
+            'gram_counts': gram_counts,
+            # id() -> position, pour filtrer des listes déjà extraites de la base
+            'positions': {id(e): i for i, e in enumerate(all_entreprises)}
         }
-        return entreprises_data
     
     def get_entreprises_by_sector(self, secteur: str) -> List[Dict]:
         """Retourne les entreprises d'un secteur donné"""
-        secteur_lower = secteur.lower()
-        
-        # Mapping des secteurs
-        secteur_mapping = {
-            'informatique': ['informatique', 'it', 'développement', 'programmation', 'software', 'technologie'],
-            'telecom': ['telecom', 'télécommunications', 'réseaux', 'téléphonie'],
-            'banque_finance': ['banque', 'finance', 'assurance', 'bancaire', 'fintech'],
-            'industrie': ['industrie', 'manufacturing', 'production', 'usine'],
-            'energie': ['énergie', 'électricité', 'pétrole', 'gaz', 'renouvelable'],
-            'sante': ['santé', 'médical', 'pharmacie', 'médicale', 'hospitalier'],
-            'logistique': ['logistique', 'transport', 'supply chain', 'distribution']
-        }
-        
-        # Trouver le secteur correspondant
-        for key, keywords in secteur_mapping.items():
-            if any(kw in secteur_lower for kw in keywords):
-                return self.entreprises.get(key, [])
-        
-        return []
+        key = self._sector_key(secteur)
+        return self.entreprises.get(key, []) if key else []
+    
+    def _sector_key(self, secteur: str) -> Optional[str]:
+        """Clé de la base correspondant à un libellé de secteur"""
+        return classifier.classify(secteur)
     
     def search_entreprise(self, nom_entreprise: str) -> Optional[Dict]:
         """Recherche une entreprise par nom"""
-        nom_lower = nom_entreprise.lower()
+        query = ' '.join(tokens(nom_entreprise))
+        if not query:
+            return None
         
-        for secteur, entreprises in self.entreprises.items():
-            for entreprise in entreprises:
-                if nom_lower in entreprise['nom'].lower():
-                    return entreprise
+        if len(query) < 3:
+            # Trop court pour les trigrammes: index des préfixes de mots
+            candidates = self._name_prefix.get(query[:PREFIX_MAX_LEN], set())
+        else:
+            postings = sorted((self._name_trigrams.get(t, set()) for t in trigrams(query)), key=len)
+            candidates = set.intersection(*postings) if postings else set()
+        
+        # Première entreprise (ordre de la base) dont le nom contient la requête
+        for position in sorted(candidates):
+            if query in self._names[position]:
+                return self._all[position]
         
         return None
     
+    def search_entreprises(self, query: str, top_k: int = 5,
+                           min_score: float = 0.3) -> List[Tuple[Dict, float]]:
+        """
+        Recherche floue par nom, insensible aux accents, à la casse et aux fautes de frappe.
+        Retourne les `top_k` meilleures entreprises: [(entreprise, score entre 0 et 1), ...]
+        """
+        normalized = ' '.join(tokens(query))
+        if not normalized:
+            return []
+        
+        query_grams = char_trigrams(normalized, padded=True)
+        
+        # Candidats: trigrammes les plus rares d'abord, jusqu'au budget de parcours
+        postings = sorted((self._name_trigrams.get(t, set()) for t in query_grams), key=len)
+        counts = Counter()
+        visited = 0
+        skipped = []
+        for i, posting in enumerate(postings):
+            if i >= FUZZY_MIN_TRIGRAMS and visited + len(posting) > FUZZY_POSTINGS_BUDGET:
+                skipped = postings[i:]
+                break
+            counts.update(posting)
+            visited += len(posting)
+        
+        # Score exact (coefficient de Dice) des meilleurs candidats
+        results = []
+        for position, common in counts.most_common(FUZZY_CANDIDATES):
+            common += sum(1 for posting in skipped if position in posting)
+            score = 2 * common / (len(query_grams) + self._gram_counts[position])
+            if normalized in self._names[position]:
+                score = 0.8 + 0.2 * score
+            if score >= min_score:
+                results.append((position, score))
+        
+        results.sort(key=lambda r: (-r[1], r[0]))
+        return [(self._all[position], round(score, 3)) for position, score in results[:top_k]]
+    
     def get_all_sectors(self) -> List[str]:
         """Retourne tous les secteurs disponibles"""
         return list(self.entreprises.keys())
     
+    def get_entreprises_by_ville(self, ville: str) -> List[Dict]:
+        """Retourne les entreprises présentes dans une ville"""
+        return [self._all[i] for i in sorted(self._by_city.get(fold(ville), ()))]
+    
+    def filter_by_ville(self, entreprises: List[Dict], ville: str) -> List[Dict]:
+        """Filtre une liste d'entreprises de la base par ville (via l'index)"""
+        positions = self._by_city.get(fold(ville), set())
+        return [e for e in entreprises if self._positions.get(id(e)) in positions]
+    
     def get_recommandations_pfe(self, secteur: str, ville: str = None) -> List[Dict]:
         """Retourne des recommandations pour PFE par secteur et ville"""
-        entreprises = self.get_entreprises_by_sector(secteur)
+        key = self._sector_key(secteur)
+        if key is None:
+            return []
         
+        # Intersection des index secteur / offres de stage / ville
+        positions = self._by_sector.get(key, set()) & self._with_stage
         if ville:
-            entreprises = [e for e in entreprises if ville.lower() in e['ville'].lower()]
-        
-        # Filtrer celles avec offres de stage
-        entreprises_stage = [e for e in entreprises if e.get('offres_stage', False)]
+            positions &= self._by_city.get(fold(ville), set())
         
-        return entreprises_stage[:10]  # Limiter à 10
\ No newline at end of file
+        return [self._all[i] for i in sorted(positions)[:10]]  # Limiter à 10
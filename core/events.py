@@ -0,0 +1,165 @@
+"""
+Événements de progression des scrapers, sans dépendance à l'interface.
+
+Les modules de core signalent l'avancement d'une recherche (plateforme
+interrogée, erreur, nombre d'offres trouvées...) par `emit`; chaque contexte
+d'exécution choisit qui les reçoit:
+- l'application Streamlit s'abonne pour le temps d'une exécution du script
+  (`listening`) et affiche les messages,
+- le crawler ou un traitement batch les journalise (`subscribe(log_event)`),
+- sans abonné, les événements sont ignorés (coût: un test de liste vide).
+
+Un abonnement par `listening` ne vaut que pour le contexte courant (thread du
+script Streamlit): deux sessions de l'application ne voient pas les messages
+l'une de l'autre. Les abonnés de `subscribe` reçoivent les événements de tous
+les threads.
+
+Le travail confié à un pool de threads passe par `bind`: les événements émis
+dans le thread de travail sont mis en file et remis aux abonnés de `listening`
+dans leur propre thread (st.* ne fonctionne que dans le thread du script), au
+prochain `emit` ou `flush` de ce thread et au plus tard en fin de bloc.
+
+    with listening(lambda event: print(event.kind, event.message)):
+        finder.search_all_real_offers('informatique', 'Rabat')
+
+    future = executor.submit(events.bind(provider), secteur, ville)
+    ...
+    events.flush()  # dans le thread appelant, en attendant les résultats
+"""
+import functools
+import logging
+import queue
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+# Types d'événements (du plus neutre au plus grave)
+PROGRESS = 'progress'  # Étape en cours (« Recherche Rekrute.com... »)
+INFO = 'info'
+SUCCESS = 'success'
+WARNING = 'warning'
+ERROR = 'error'
+
+LOG_LEVELS = {
+    PROGRESS: logging.DEBUG,
+    INFO: logging.INFO,
+    SUCCESS: logging.INFO,
+    WARNING: logging.WARNING,
+    ERROR: logging.ERROR
+}
+
+logger = logging.getLogger('core.events')
+
+
+@dataclass(slots=True, frozen=True)
+class Event:
+    kind: str
+    message: str
+    source: str = ''  # Plateforme ou composant à l'origine du message
+    data: Dict = field(default_factory=dict)  # Détails structurés (nombre d'offres, erreur...)
+
+
+Listener = Callable[[Event], None]
+
+_listeners: List[Listener] = []
+_listeners_lock = threading.Lock()
+_scoped: ContextVar[Tuple[Listener, ...]] = ContextVar('core_events_listeners', default=())
+# File des événements des threads de travail, côté thread abonné (`listening`)...
+_outbox: ContextVar[Optional[queue.SimpleQueue]] = ContextVar('core_events_outbox', default=None)
+# ... et côté thread de travail (`bind`): file du thread abonné où les déposer
+_forward: ContextVar[Optional[queue.SimpleQueue]] = ContextVar('core_events_forward', default=None)
+
+
+def subscribe(listener: Listener) -> Callable[[], None]:
+    """Abonne `listener` aux événements de tous les threads; retourne la fonction de désabonnement"""
+    with _listeners_lock:
+        _listeners.append(listener)
+
+    def unsubscribe():
+        with _listeners_lock:
+            if listener in _listeners:
+                _listeners.remove(listener)
+    return unsubscribe
+
+
+@contextmanager
+def listening(listener: Listener) -> Iterator[None]:
+    """
+    Abonne `listener` aux événements émis dans le contexte courant, le temps du bloc,
+    y compris ceux des fonctions passées par `bind` à d'autres threads
+    """
+    tokens = [_scoped.set(_scoped.get() + (listener,))]
+    if _outbox.get() is None:
+        tokens.append(_outbox.set(queue.SimpleQueue()))
+    try:
+        yield
+    finally:
+        flush()
+        for token in reversed(tokens):
+            token.var.reset(token)
+
+
+def bind(fn: Callable) -> Callable:
+    """
+    Prépare `fn` pour un autre thread: ses événements vont aux abonnés de `subscribe`
+    directement, et à ceux de `listening` du contexte courant via la file de ce
+    contexte (voir `flush`). Sans abonné de `listening`, retourne `fn` telle quelle.
+    """
+    target = _outbox.get()
+    if target is None:
+        target = _forward.get()  # Déjà dans un thread de travail: même destination
+    if target is None:
+        return fn
+
+    @functools.wraps(fn)
+    def run(*args, **kwargs):
+        tokens = [_scoped.set(()), _outbox.set(None), _forward.set(target)]
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            for token in reversed(tokens):
+                token.var.reset(token)
+    return run
+
+
+def flush():
+    """Remet aux abonnés du contexte courant les événements des threads de travail en attente"""
+    outbox = _outbox.get()
+    if outbox is None:
+        return
+    listeners = _scoped.get()
+    while True:
+        try:
+            event = outbox.get_nowait()
+        except queue.Empty:
+            return
+        _dispatch(event, listeners)
+
+
+def emit(kind: str, message: str, source: str = '', **data):
+    """Transmet un événement aux abonnés; une erreur d'un abonné n'interrompt pas le scraper"""
+    forward = _forward.get()
+    scoped = _scoped.get()
+    if not (scoped or _listeners or forward is not None):
+        return
+    event = Event(kind, message, source, data)
+    if forward is not None:
+        forward.put(event)
+    elif scoped:
+        flush()  # Événements des threads de travail d'abord, dans l'ordre
+    _dispatch(event, scoped + tuple(_listeners))
+
+
+def _dispatch(event: Event, listeners: Tuple[Listener, ...]):
+    for listener in listeners:
+        try:
+            listener(event)
+        except Exception:
+            logger.exception("Abonné aux événements en erreur: %r", listener)
+
+
+def log_event(event: Event):
+    """Abonné pour les traitements sans interface: journalise l'événement (logger core.events)"""
+    logger.log(LOG_LEVELS.get(event.kind, logging.INFO), "%s", event.message)
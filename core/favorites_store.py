@@ -0,0 +1,123 @@
+"""
+Favoris des utilisateurs (offres et entreprises), conservés entre les sessions.
+
+Chaque favori est identifié par un identifiant stable calculé à partir de son
+contenu: sauvegarder deux fois la même offre ne crée pas de doublon, et la
+suppression ou la recherche d'un favori se font par clé primaire, sans
+comparer les dictionnaires.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+from config import settings
+from core.ids import item_id
+
+FAVORITE_TYPES = ('offre', 'entreprise')
+
+
+class FavoritesStore:
+    """Stockage local (SQLite) des favoris, par utilisateur"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(settings.data_path, 'favoris.sqlite')
+        self._lock = threading.Lock()
+
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS favoris (
+                user TEXT NOT NULL,
+                id TEXT NOT NULL,
+                type TEXT NOT NULL,
+                data TEXT NOT NULL,
+                saved_at REAL NOT NULL,
+                PRIMARY KEY (user, id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_favoris_type ON favoris (user, type, saved_at);
+        """)
+        self._conn.commit()
+
+    def save(self, user: str, kind: str, data: Dict) -> bool:
+        """Ajoute un favori. Retourne False s'il était déjà enregistré"""
+        if kind not in FAVORITE_TYPES:
+            raise ValueError(f"Type de favori inconnu: {kind}")
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                'INSERT OR IGNORE INTO favoris VALUES (?, ?, ?, ?, ?)',
+                (user, item_id(kind, data), kind, json.dumps(data, ensure_ascii=False, default=str), time.time())
+            )
+        return cursor.rowcount > 0
+
+    def delete(self, user: str, favorite_id: str) -> bool:
+        with self._lock, self._conn:
+            cursor = self._conn.execute('DELETE FROM favoris WHERE user = ? AND id = ?', (user, favorite_id))
+        return cursor.rowcount > 0
+
+    def contains(self, user: str, favorite_id: str) -> bool:
+        with self._lock:
+            row = self._conn.execute('SELECT 1 FROM favoris WHERE user = ? AND id = ?',
+                                     (user, favorite_id)).fetchone()
+        return row is not None
+
+    def get(self, user: str, favorite_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute('SELECT id, type, data, saved_at FROM favoris WHERE user = ? AND id = ?',
+                                     (user, favorite_id)).fetchone()
+        return self._item(row) if row is not None else None
+
+    def list(self, user: str, kind: Optional[str] = None) -> List[Dict]:
+        """
+        Favoris de l'utilisateur (d'un type donné ou tous), du plus ancien au plus récent:
+        [{'id', 'type', 'data', 'date'}]
+        """
+        with self._lock:
+            if kind is None:
+                rows = self._conn.execute(
+                    'SELECT id, type, data, saved_at FROM favoris WHERE user = ? ORDER BY saved_at', (user,)
+                ).fetchall()
+            else:
+                rows = self._conn.execute(
+                    'SELECT id, type, data, saved_at FROM favoris WHERE user = ? AND type = ? ORDER BY saved_at',
+                    (user, kind)
+                ).fetchall()
+        return [self._item(row) for row in rows]
+
+    def iter_items(self, user: str, batch_size: int = 500) -> Iterator[Dict]:
+        """Tous les favoris de l'utilisateur (comme `list`), lus par lots (exports)"""
+        last = (0.0, '')
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    'SELECT id, type, data, saved_at FROM favoris WHERE user = ? AND (saved_at, id) > (?, ?) '
+                    'ORDER BY saved_at, id LIMIT ?',
+                    (user, *last, batch_size)
+                ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield self._item(row)
+            last = (rows[-1]['saved_at'], rows[-1]['id'])
+
+    def counts(self, user: str) -> Dict[str, int]:
+        """Nombre de favoris par type"""
+        with self._lock:
+            rows = self._conn.execute('SELECT type, COUNT(*) FROM favoris WHERE user = ? GROUP BY type',
+                                      (user,)).fetchall()
+        counts = dict.fromkeys(FAVORITE_TYPES, 0)
+        counts.update({row[0]: row[1] for row in rows})
+        return counts
+
+    @staticmethod
+    def _item(row: sqlite3.Row) -> Dict:
+        return {
+            'id': row['id'],
+            'type': row['type'],
+            'data': json.loads(row['data']),
+            'date': datetime.fromtimestamp(row['saved_at'])
+        }
@@ -0,0 +1,349 @@
+import hashlib
+import inspect
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3.util.request import ACCEPT_ENCODING
+from urllib3.util.retry import Retry
+
+from config import settings
+from core.metrics import metrics
+from core.rate_limiter import HostRateLimiter, get_default_limiter
+
+# En-têtes envoyés par les scrapers (robots.txt est vérifié pour ce même User-Agent)
+DEFAULT_HEADERS = {
+    'User-Agent': settings.USER_AGENT,
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'fr,fr-FR;q=0.9,en;q=0.8',
+    'Accept-Encoding': ACCEPT_ENCODING,  # gzip, deflate (+ br/zstd si les décodeurs sont installés)
+    'Connection': 'keep-alive'
+}
+
+# En-têtes qui ne décrivent plus le contenu une fois décompressé
+_DROPPED_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding', 'connection'}
+
+# Aléa sur l'attente entre deux connexions: urllib3 >= 2 uniquement (ignoré avec urllib3 1.26)
+_RETRY_JITTER = ({'backoff_jitter': settings.HTTP_BACKOFF_JITTER}
+                 if 'backoff_jitter' in inspect.signature(Retry).parameters else {})
+
+# Nouvelles tentatives faites par la session (les 429/503 passent par le limiteur)
+RETRY_STATUSES = {500, 502, 504}
+RETRY_METHODS = {'GET', 'HEAD'}
+
+
+def split_timeout(timeout) -> tuple:
+    """Timeout (connexion, lecture): un timeout unique borne la lecture, la connexion reste courte"""
+    if timeout is None:
+        return settings.HTTP_CONNECT_TIMEOUT, settings.HTTP_READ_TIMEOUT
+    if isinstance(timeout, tuple):
+        return timeout
+    return min(settings.HTTP_CONNECT_TIMEOUT, timeout), timeout
+
+
+def cache_key(url: str, params: Optional[Dict] = None) -> str:
+    """Clé de cache: URL complète (requête incluse) normalisée par requests"""
+    full_url = requests.Request('GET', url, params=params).prepare().url
+    return hashlib.sha256(full_url.encode('utf-8')).hexdigest()
+
+
+class HTTPCache:
+    """Cache disque (SQLite) des réponses HTTP partagé par tous les scrapers"""
+
+    def __init__(self, path: Optional[str] = None, max_bytes: Optional[int] = None,
+                 ttls: Optional[Dict[str, int]] = None):
+        self.path = path or os.path.join(settings.data_path, 'http_cache.sqlite')
+        self.max_bytes = max_bytes or settings.CACHE_MAX_BYTES
+        self.ttls = ttls or settings.CACHE_TTL
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self._lock = threading.Lock()
+
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                status INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                content BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at)')
+        self._conn.commit()
+        self._total_bytes = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+
+    def ttl_for(self, url: str) -> int:
+        """TTL (s) associé au site de l'URL"""
+        host = (urlparse(url).hostname or '').lower()
+        for domain, ttl in self.ttls.items():
+            if host == domain or host.endswith('.' + domain):
+                return ttl
+        return self.ttls.get('default', 3600)
+
+    def lookup(self, key: str) -> Optional[Dict]:
+        """Retourne l'entrée en cache (fraîche ou non) et met à jour son dernier accès"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT url, status, headers, content, etag, last_modified, stored_at '
+                'FROM responses WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute('UPDATE responses SET accessed_at = ? WHERE key = ?', (time.time(), key))
+            self._conn.commit()
+
+        url, status, headers, content, etag, last_modified, stored_at = row
+        return {
+            'url': url,
+            'status': status,
+            'headers': json.loads(headers),
+            'content': content,
+            'etag': etag,
+            'last_modified': last_modified,
+            'stored_at': stored_at
+        }
+
+    def is_fresh(self, entry: Dict) -> bool:
+        return time.time() - entry['stored_at'] < self.ttl_for(entry['url'])
+
+    def store(self, key: str, response: requests.Response):
+        """Enregistre une réponse 200 puis applique la limite de taille (LRU)"""
+        content = response.content
+        headers = {k: v for k, v in response.headers.items() if k.lower() not in _DROPPED_HEADERS}
+        now = time.time()
+
+        with self._lock:
+            previous = self._conn.execute('SELECT size FROM responses WHERE key = ?', (key,)).fetchone()
+            self._conn.execute(
+                'INSERT OR REPLACE INTO responses '
+                '(key, url, status, headers, content, size, etag, last_modified, stored_at, accessed_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (key, response.url, response.status_code, json.dumps(headers), content, len(content),
+                 response.headers.get('ETag'), response.headers.get('Last-Modified'), now, now)
+            )
+            self._total_bytes += len(content) - (previous[0] if previous else 0)
+            self._evict()
+            self._conn.commit()
+
+    def refresh(self, key: str):
+        """Marque une entrée comme revalidée (réponse 304)"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute('UPDATE responses SET stored_at = ?, accessed_at = ? WHERE key = ?', (now, now, key))
+            self._conn.commit()
+
+    def _evict(self):
+        """Supprime les entrées les moins récemment utilisées au-delà de max_bytes"""
+        if self._total_bytes <= self.max_bytes:
+            return
+        rows = self._conn.execute('SELECT key, size FROM responses ORDER BY accessed_at ASC').fetchall()
+        target = int(self.max_bytes * 0.9)
+        evicted = []
+        for key, size in rows:
+            if self._total_bytes <= target:
+                break
+            evicted.append((key,))
+            self._total_bytes -= size
+        self._conn.executemany('DELETE FROM responses WHERE key = ?', evicted)
+
+    def count(self, outcome: str):
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def stats(self) -> Dict:
+        """Compteurs hit/miss et occupation disque"""
+        with self._lock:
+            entries = self._conn.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'revalidations': self.revalidations,
+                'hit_rate': self.hits / total if total else 0.0,
+                'entries': entries,
+                'size_bytes': self._total_bytes,
+                'max_bytes': self.max_bytes
+            }
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute('DELETE FROM responses')
+            self._conn.commit()
+            self._total_bytes = 0
+
+
+def _response_from_entry(entry: Dict) -> requests.Response:
+    """Reconstruit un objet Response à partir d'une entrée du cache"""
+    response = requests.Response()
+    response.status_code = entry['status']
+    response._content = entry['content']
+    response.headers = CaseInsensitiveDict(entry['headers'])
+    response.url = entry['url']
+    response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+    response.from_cache = True
+    return response
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_cache() -> HTTPCache:
+    """Cache partagé par toutes les sessions du processus"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = HTTPCache()
+        return _default_cache
+
+
+class CachedSession(requests.Session):
+    """
+    Session requests dont les GET passent par le cache disque.
+    Les requêtes réseau (hors cache) passent par le limiteur de débit par site.
+    Les GET simultanés d'une même URL absente du cache ne partent qu'une fois:
+    les suivants attendent la première réponse et la lisent dans le cache.
+    """
+
+    def __init__(self, cache: Optional[HTTPCache] = None,
+                 rate_limiter: Optional[HostRateLimiter] = None):
+        super().__init__()
+        self.cache = cache or get_default_cache()
+        self.rate_limiter = rate_limiter or get_default_limiter()
+        # Attente max. dans la file d'un site avant d'abandonner la requête
+        self.max_queue_wait = settings.SEARCH_DEADLINE
+        # Téléchargements en cours: clé de cache -> [verrou, nombre de threads intéressés]
+        self._inflight: Dict[str, list] = {}
+        self._inflight_lock = threading.Lock()
+
+    def request(self, method, url, *args, **kwargs):
+        """
+        Requête réseau. Chaque tentative, nouvelles tentatives comprises (500/502/504,
+        délai de lecture dépassé), attend son créneau dans le limiteur du site.
+        """
+        kwargs['timeout'] = split_timeout(kwargs.get('timeout'))
+        user_agent = (kwargs.get('headers') or {}).get('User-Agent') or self.headers.get('User-Agent')
+        retries = settings.HTTP_RETRIES if method.upper() in RETRY_METHODS else 0
+
+        for attempt in range(retries + 1):
+            if attempt:
+                time.sleep(settings.HTTP_BACKOFF_FACTOR * 2 ** (attempt - 1)
+                           + random.uniform(0, settings.HTTP_BACKOFF_JITTER))
+            self.rate_limiter.acquire(url, max_wait=self.max_queue_wait, user_agent=user_agent)
+            try:
+                response = super().request(method, url, *args, **kwargs)
+            except requests.exceptions.ReadTimeout:
+                if attempt == retries:
+                    raise
+                continue
+            if response.status_code in (429, 503):
+                self.rate_limiter.penalize(url, response.headers.get('Retry-After'))
+            if response.status_code not in RETRY_STATUSES or attempt == retries:
+                return response
+            response.close()
+
+    def get(self, url, **kwargs):
+        key = cache_key(url, kwargs.get('params'))
+        host = urlparse(url).hostname or ''
+        entry = self.cache.lookup(key)
+
+        if entry and self.cache.is_fresh(entry):
+            self.cache.count('hits')
+            metrics.inc('http_cache', host=host, outcome='hit')
+            return _response_from_entry(entry)
+
+        with self._single_flight(key):
+            # Pendant l'attente, un autre thread a pu télécharger et enregistrer la page
+            entry = self.cache.lookup(key)
+            if entry and self.cache.is_fresh(entry):
+                self.cache.count('hits')
+                metrics.inc('http_cache', host=host, outcome='coalesced')
+                return _response_from_entry(entry)
+            return self._fetch(url, key, host, entry, **kwargs)
+
+    @contextmanager
+    def _single_flight(self, key: str) -> Iterator[None]:
+        """Un seul thread à la fois télécharge une clé donnée"""
+        with self._inflight_lock:
+            flight = self._inflight.setdefault(key, [threading.Lock(), 0])
+            flight[1] += 1
+        try:
+            with flight[0]:
+                yield
+        finally:
+            with self._inflight_lock:
+                flight[1] -= 1
+                if not flight[1]:
+                    del self._inflight[key]
+
+    def _fetch(self, url: str, key: str, host: str, entry: Optional[Dict], **kwargs):
+        """Requête réseau (conditionnelle si une entrée expirée existe), puis mise en cache"""
+        # Entrée expirée: revalidation conditionnelle si possible
+        headers = dict(kwargs.pop('headers', None) or {})
+        if entry:
+            if entry['etag']:
+                headers['If-None-Match'] = entry['etag']
+            if entry['last_modified']:
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        with metrics.timer('http_request', host=host):
+            response = super().get(url, headers=headers, **kwargs)
+        if not kwargs.get('stream'):
+            metrics.inc('http_bytes', len(response.content), host=host)
+
+        if response.status_code == 304 and entry:
+            self.cache.refresh(key)
+            self.cache.count('revalidations')
+            metrics.inc('http_cache', host=host, outcome='revalidation')
+            return _response_from_entry(entry)
+
+        self.cache.count('misses')
+        metrics.inc('http_cache', host=host, outcome='miss')
+        if response.status_code == 200:
+            self.cache.store(key, response)
+        return response
+
+
+def build_session(cache: Optional[HTTPCache] = None,
+                  rate_limiter: Optional[HostRateLimiter] = None) -> CachedSession:
+    """
+    Session HTTP mise en cache avec un pool de connexions keep-alive borné par site.
+    L'adaptateur ne retente que les connexions impossibles (rien n'a atteint le site);
+    les autres nouvelles tentatives sont faites par CachedSession.request, à travers
+    le limiteur de débit. Les 429/503 ne sont pas retentés: le limiteur suspend le site.
+    """
+    session = CachedSession(cache=cache, rate_limiter=rate_limiter)
+    retries = Retry(
+        total=settings.HTTP_RETRIES,
+        connect=settings.HTTP_RETRIES,
+        read=0,
+        status=0,
+        other=0,
+        backoff_factor=settings.HTTP_BACKOFF_FACTOR,
+        raise_on_status=False,
+        **_RETRY_JITTER
+    )
+    adapter = HTTPAdapter(pool_connections=settings.HTTP_POOL_MAXSIZE,
+                          pool_maxsize=settings.HTTP_POOL_MAXSIZE,
+                          pool_block=True, max_retries=retries)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update(DEFAULT_HEADERS)
+    return session
@@ -0,0 +1,89 @@
+"""
+Couche de téléchargement asynchrone commune à tous les scrapers.
+
+Chaque client ordonnance ses requêtes sur sa boucle asyncio (thread dédié);
+le registre (core.registry) partage le sien entre tous les scrapers. Au plus
+HTTP_PER_HOST requêtes simultanées par site et HTTP_MAX_CONCURRENCY au total,
+exécutées par un pool de threads borné. Les
+méthodes synchrones des scrapers soumettent leurs requêtes via `submit` et
+récupèrent des `concurrent.futures.Future` annulables; le code asynchrone
+(quelle que soit sa boucle) peut attendre directement `run` / `get`.
+
+Les sessions (build_session) fournissent le reste: cache disque, limiteur de
+débit par site, pool keep-alive borné, timeouts connexion/lecture séparés,
+nouvelles tentatives avec aléa et décompression gzip/brotli.
+"""
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+
+from config import settings
+from core import events
+from core.http_cache import build_session
+
+
+class HttpClient:
+    """Ordonnanceur de requêtes: boucle asyncio partagée, limites globales et par site"""
+
+    def __init__(self, session: Optional[requests.Session] = None,
+                 max_concurrency: Optional[int] = None, per_host: Optional[int] = None):
+        self.session = session or build_session()
+        self.max_concurrency = max_concurrency or settings.HTTP_MAX_CONCURRENCY
+        self.per_host = per_host or settings.HTTP_PER_HOST
+
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._host_slots: Dict[str, asyncio.Semaphore] = {}
+
+    # ------------------------------------------------------------------
+    # API asynchrone
+    # ------------------------------------------------------------------
+
+    async def run(self, url: str, fn: Callable, *args) -> Any:
+        """
+        Exécute `fn(*args)` (appel bloquant vers le site de `url`) dans la limite du site,
+        depuis n'importe quelle boucle asyncio. Annuler la tâche annule la requête.
+        """
+        return await asyncio.wrap_future(self.submit(url, fn, *args))
+
+    async def get(self, url: str, **kwargs) -> requests.Response:
+        return await self.run(url, lambda: self.session.get(url, **kwargs))
+
+    # ------------------------------------------------------------------
+    # API synchrone (threads Streamlit, crawler)
+    # ------------------------------------------------------------------
+
+    def submit(self, url: str, fn: Callable, *args) -> Future:
+        """
+        Planifie `fn(*args)` sur la boucle partagée. `Future.cancel()` retire la
+        requête de la file; une requête déjà partie termine mais son résultat est ignoré.
+        Les événements émis par `fn` sont remis au thread appelant (core.events.bind).
+        """
+        return asyncio.run_coroutine_threadsafe(self._run(url, events.bind(fn), *args), self._ensure_loop())
+
+    def submit_get(self, url: str, **kwargs) -> Future:
+        return self.submit(url, lambda: self.session.get(url, **kwargs))
+
+    async def _run(self, url: str, fn: Callable, *args) -> Any:
+        """Exécuté sur la boucle du client: attente du créneau du site, puis appel dans le pool"""
+        host = urlparse(url).hostname or ''
+        slot = self._host_slots.get(host)
+        if slot is None:
+            slot = self._host_slots[host] = asyncio.Semaphore(self.per_host)
+        async with slot:
+            return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                loop.set_default_executor(ThreadPoolExecutor(max_workers=self.max_concurrency,
+                                                             thread_name_prefix='http'))
+                threading.Thread(target=loop.run_forever, name='http-client', daemon=True).start()
+                self._loop = loop
+            return self._loop
+
@@ -0,0 +1,52 @@
+"""
+Identifiants stables des offres et des entreprises.
+
+L'identifiant est dérivé du contenu normalisé (entreprise, titre et lien
+canonique pour une offre; nom et ville pour une entreprise): une même offre
+reçoit le même identifiant quelle que soit la session, la source ou les
+paramètres de suivi de son lien. Il sert de clé courte aux widgets, aux
+favoris, aux caches et aux exports, à la place des dictionnaires complets.
+"""
+import hashlib
+from typing import Dict, List
+
+from core.dedup import canonical_url, normalize_company, normalize_title
+
+ID_LENGTH = 16  # Caractères hexadécimaux (64 bits)
+
+
+def _digest(kind: str, *parts: str) -> str:
+    return hashlib.sha1('\x1f'.join([kind, *parts]).encode('utf-8')).hexdigest()[:ID_LENGTH]
+
+
+def offer_id(offre: Dict) -> str:
+    """Identifiant d'une offre (champ `id` s'il est déjà calculé)"""
+    return offre.get('id') or _digest('offre', normalize_company(offre.get('entreprise')),
+                                      normalize_title(offre.get('titre')), canonical_url(offre.get('lien')))
+
+
+def company_id(entreprise: Dict) -> str:
+    """Identifiant d'une entreprise (champ `id` s'il est déjà calculé)"""
+    return entreprise.get('id') or _digest('entreprise', normalize_company(entreprise.get('nom')),
+                                           (entreprise.get('ville') or '').lower())
+
+
+def item_id(kind: str, data: Dict) -> str:
+    """Identifiant d'un élément de type 'offre' ou 'entreprise'"""
+    return company_id(data) if kind == 'entreprise' else offer_id(data)
+
+
+def with_offer_ids(offres: List[Dict]) -> List[Dict]:
+    """Ajoute (sur place) le champ `id` aux offres qui n'en ont pas; retourne la liste"""
+    for offre in offres:
+        if not offre.get('id'):
+            offre['id'] = offer_id(offre)
+    return offres
+
+
+def with_company_ids(entreprises: List[Dict]) -> List[Dict]:
+    """Ajoute (sur place) le champ `id` aux entreprises qui n'en ont pas; retourne la liste"""
+    for entreprise in entreprises:
+        if not entreprise.get('id'):
+            entreprise['id'] = company_id(entreprise)
+    return entreprises
@@ -1,8 +1,72 @@
-import streamlit as st
-from datetime import datetime
+from datetime import date
+from functools import lru_cache
 import json
-from typing import Dict, List, Optional
+import random
+import zlib
+from string import Formatter
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 import os
+from core.metrics import metrics
+from core.sector_classifier import classifier
+
+# Informations étudiant par défaut (champs non renseignés)
+DEFAULT_STUDENT = {
+    'full_name': 'Prénom NOM',
+    'address': 'Adresse, Ville, Maroc',
+    'phone': '+212 6 XX XX XX XX',
+    'email': 'email@domain.com',
+    'linkedin': 'linkedin.com/in/votrenom',
+    'degree': 'Ingénierie en Informatique',
+    'school': 'École/Université',
+    'start_date': '01 février 2024',
+    'duration': '6 mois',
+    'project_title': 'Développement d\'application innovante'
+}
+
+# Expertises entreprise
+COMPANY_EXPERTISE_OPTIONS = [
+    "les technologies innovantes",
+    "la transformation digitale",
+    "le développement de solutions sur mesure",
+    "l'excellence opérationnelle",
+    "l'innovation technologique"
+]
+
+# Champs de l'offre utilisés par les lettres (clé du cache de rendu)
+OFFER_FIELDS = ('entreprise', 'titre', 'lieu', 'secteur')
+
+RENDER_CACHE_SIZE = 2048  # Lettres rendues conservées
+STUDENT_CACHE_SIZE = 32  # En-têtes/signatures préparés
+
+CompiledTemplate = List[Tuple[str, Optional[str]]]
+OfferKey = Tuple[Optional[str], ...]
+StudentKey = Tuple[str, ...]
+
+
+def offer_key(offer: Dict) -> OfferKey:
+    return tuple(offer.get(field) for field in OFFER_FIELDS)
+
+
+def student_key(student: Dict) -> StudentKey:
+    """Infos étudiant complétées par les valeurs par défaut, dans l'ordre de DEFAULT_STUDENT"""
+    return tuple(student.get(field, default) for field, default in DEFAULT_STUDENT.items())
+
+
+def letter_seed(offer: OfferKey, student: StudentKey) -> int:
+    """Graine stable d'un processus à l'autre (hash() est aléatoire par processus)"""
+    return zlib.crc32(repr((offer, student)).encode('utf-8'))
+
+
+def compile_template(template: str) -> CompiledTemplate:
+    """Découpe un template une fois pour toutes en (texte littéral, champ à remplacer)"""
+    return [(literal, field) for literal, field, _, _ in Formatter().parse(template)]
+
+
+def render_template(compiled: CompiledTemplate, data: Dict) -> str:
+    """Équivalent de `template.format(**data)` sans réanalyser le template"""
+    return ''.join(literal if field is None else literal + str(data[field])
+                   for literal, field in compiled)
+
 
 class LetterGenerator:
     """Générateur intelligent de lettres de motivation"""
@@ -10,6 +74,9 @@ class LetterGenerator:
     def __init__(self):
         self.templates = self._load_templates()
         self.sector_keywords = self._load_sector_keywords()
+        self._compiled = {key: compile_template(info['template']) for key, info in self.templates.items()}
+        self._letter = lru_cache(maxsize=RENDER_CACHE_SIZE)(self._render)
+        self._student_data = lru_cache(maxsize=STUDENT_CACHE_SIZE)(self._prepare_student_data)
     
     def _load_templates(self) -> Dict:
         """Charge les templates de lettres par secteur"""
@@ -76,7 +143,7 @@ Veuillez agréer, Madame, Monsieur, l'expression de mes salutations les plus res
 {signature}"""
             },
             
-            'finance': {
+            'banque_finance': {
                 'title': "Lettre de Motivation - Stage Analyse Financière",
                 'template': """{header}
 
@@ -189,7 +256,7 @@ Dans l'attente de votre réponse, je vous prie d'agréer, Madame, Monsieur, mes
                     "ingénierie réseau"
                 ]
             },
-            'finance': {
+            'banque_finance': {
                 'technical_skills': [
                     "Analyse financière et modélisation",
                     "Gestion de portefeuille et risque",
@@ -214,90 +281,57 @@ Dans l'attente de votre réponse, je vous prie d'agréer, Madame, Monsieur, mes
             }
         }
     
-    def generate_letter(self, offer_data: Dict, student_info: Dict) -> str:
-        """Génère une lettre de motivation personnalisée"""
-        
+    def generate_letter(self, offer_data: Dict, student_info: Dict) -> Dict:
+        """
+        Génère une lettre de motivation personnalisée. Les choix variés (compétences,
+        projets...) sont tirés d'un aléa propre au couple (étudiant, offre): mêmes
+        entrées, même lettre, servie depuis le cache.
+        """
+        metrics.inc('letters')
+        return dict(self._letter(offer_key(offer_data), student_key(student_info), date.today()))
+
+    def generate_letters(self, offers: Iterable[Dict], student_info: Dict) -> Iterator[Dict]:
+        """
+        Génère les lettres de plusieurs offres en un seul passage: les données
+        de l'étudiant (en-tête, signature, date) ne sont préparées qu'une fois.
+        Les lettres sont produites au fur et à mesure (export ZIP en flux).
+        """
+        student = student_key(student_info)
+        today = date.today()
+        for offer in offers:
+            metrics.inc('letters')
+            yield dict(self._letter(offer_key(offer), student, today))
+
+    @metrics.timed('letter_render')
+    def _render(self, offer: OfferKey, student: StudentKey, day: date) -> Dict:
+        """
+        Lettre d'une offre (non mise en cache; voir self._letter). Les lettres
+        servies depuis le cache = compteur 'letters' - rendus 'letter_render'.
+        """
+        offer_data = {field: value for field, value in zip(OFFER_FIELDS, offer) if value is not None}
+
         # Déterminer le secteur
         secteur = self._detect_sector(offer_data.get('secteur', ''))
-        
-        # Récupérer le template adapté
-        template_info = self.templates.get(secteur, self.templates['default'])
-        template = template_info['template']
-        
-        # Préparer les données de remplacement
-        replacement_data = self._prepare_replacement_data(offer_data, student_info, secteur)
-        
-        # Appliquer les remplacements
-        letter = template.format(**replacement_data)
-        
+
+        # Template adapté, déjà découpé
+        template_key = secteur if secteur in self.templates else 'default'
+        rng = random.Random(letter_seed(offer, student))
+        replacement_data = {**self._student_data(student, day), **self._prepare_offer_data(offer_data, secteur, rng)}
+
         return {
-            'content': letter,
-            'title': template_info['title'],
-            'filename': f"Lettre_Motivation_{offer_data['entreprise'].replace(' ', '_')}_{datetime.now().strftime('%Y%m%d')}.txt"
+            'content': render_template(self._compiled[template_key], replacement_data),
+            'title': self.templates[template_key]['title'],
+            'filename': f"Lettre_Motivation_{offer_data['entreprise'].replace(' ', '_')}_{day.strftime('%Y%m%d')}.txt"
         }
-    
+
     def _detect_sector(self, secteur: str) -> str:
         """Détecte le secteur à partir du texte"""
-        secteur_lower = secteur.lower()
-        
-        if any(word in secteur_lower for word in ['informatique', 'it', 'développement', 'programmation', 'software']):
-            return 'informatique'
-        elif any(word in secteur_lower for word in ['telecom', 'télécom', 'réseau', 'téléphonie']):
-            return 'telecom'
-        elif any(word in secteur_lower for word in ['finance', 'banque', 'bancaire', 'assurance']):
-            return 'finance'
-        else:
-            return 'default'
-    
-    def _prepare_replacement_data(self, offer: Dict, student: Dict, secteur: str) -> Dict:
-        """Prépare les données de remplacement pour le template"""
-        
-        # Informations étudiant (par défaut si non fournies)
-        default_student = {
-            'full_name': 'Prénom NOM',
-            'address': 'Adresse, Ville, Maroc',
-            'phone': '+212 6 XX XX XX XX',
-            'email': 'email@domain.com',
-            'linkedin': 'linkedin.com/in/votrenom',
-            'degree': 'Ingénierie en Informatique',
-            'school': 'École/Université',
-            'start_date': '01 février 2024',
-            'duration': '6 mois',
-            'project_title': 'Développement d\'application innovante'
-        }
-        
-        # Fusionner avec les infos étudiant fournies
-        student_info = {**default_student, **student}
-        
-        # Informations entreprise
-        company_info = f"""
-{offer.get('entreprise', 'Entreprise')}
-Service RH / Recrutement
-{offer.get('lieu', 'Casablanca')}, Maroc
-"""
-        
-        # Compétences techniques selon le secteur
-        sector_keywords = self.sector_keywords.get(secteur, self.sector_keywords.get('informatique', {}))
-        technical_skills_list = sector_keywords.get('technical_skills', [])
-        projects_list = sector_keywords.get('projects', [])
-        specializations = sector_keywords.get('specializations', ['développement'])
-        
-        # Choix aléatoire pour varier les lettres
-        import random
-        technical_skills = "\n".join([f"- {skill}" for skill in random.sample(technical_skills_list, min(4, len(technical_skills_list)))])
-        projects = "\n".join([f"- {project}" for project in random.sample(projects_list, min(2, len(projects_list)))])
-        specialization = random.choice(specializations)
-        
-        # Expertises entreprise
-        company_expertise_options = [
-            "les technologies innovantes",
-            "la transformation digitale",
-            "le développement de solutions sur mesure",
-            "l'excellence opérationnelle",
-            "l'innovation technologique"
-        ]
-        company_expertise = random.choice(company_expertise_options)
-        
+        return classifier.classify(secteur) or 'default'
+
+    def _prepare_student_data(self, student: StudentKey, day: date) -> Dict:
+        """Données propres à l'étudiant, communes à toutes ses lettres du jour"""
+        student_info = dict(zip(DEFAULT_STUDENT, student))
+
         # En-tête
         header = f"""
 {student_info['full_name']}
@@ -306,32 +340,55 @@ Tél : {student_info['phone']}
 Email : {student_info['email']}
 LinkedIn : {student_info['linkedin']}
 """
-        
+
         # Signature
         signature = f"""
 Cordialement,
 
 {student_info['full_name']}
 """
-        
+
         return {
             'header': header,
-            'date': datetime.now().strftime("Fait à %Ville, le %d/%m/%Y"),
-            'company_info': company_info,
-            'position': offer.get('titre', 'Stage PFE'),
+            'date': day.strftime("Fait à %Ville, le %d/%m/%Y"),
             'degree': student_info['degree'],
             'school': student_info['school'],
-            'specialization': specialization,
-            'technical_skills': technical_skills,
-            'projects': projects,
-            'company_name': offer.get('entreprise', 'votre entreprise'),
-            'company_expertise': company_expertise,
             'start_date': student_info['start_date'],
             'duration': student_info['duration'],
             'project_title': student_info['project_title'],
             'signature': signature
         }
-    
+
+    def _prepare_offer_data(self, offer: Dict, secteur: str, rng: random.Random) -> Dict:
+        """Données propres à l'offre (entreprise, poste, compétences du secteur)"""
+
+        # Informations entreprise
+        company_info = f"""
+{offer.get('entreprise', 'Entreprise')}
+Service RH / Recrutement
+{offer.get('lieu', 'Casablanca')}, Maroc
+"""
+
+        # Compétences techniques selon le secteur
+        sector_keywords = self.sector_keywords.get(secteur, self.sector_keywords.get('informatique', {}))
+        technical_skills_list = sector_keywords.get('technical_skills', [])
+        projects_list = sector_keywords.get('projects', [])
+        specializations = sector_keywords.get('specializations', ['développement'])
+
+        # Choix variés d'une lettre à l'autre, mais reproductibles pour un même couple
+        technical_skills = "\n".join([f"- {skill}" for skill in rng.sample(technical_skills_list, min(4, len(technical_skills_list)))])
+        projects = "\n".join([f"- {project}" for project in rng.sample(projects_list, min(2, len(projects_list)))])
+
+        return {
+            'company_info': company_info,
+            'position': offer.get('titre', 'Stage PFE'),
+            'specialization': rng.choice(specializations),
+            'technical_skills': technical_skills,
+            'projects': projects,
+            'company_name': offer.get('entreprise', 'votre entreprise'),
+            'company_expertise': rng.choice(COMPANY_EXPERTISE_OPTIONS)
+        }
+
     def get_student_form_fields(self) -> List[Dict]:
         """Retourne les champs du formulaire étudiant"""
         return [
@@ -0,0 +1,221 @@
+"""
+Vérification des liens d'offres, par lots et en arrière-plan.
+
+Les liens sont vérifiés en parallèle (au plus LINK_CHECK_PER_HOST à la fois par
+site, en passant par le limiteur de débit commun), par HEAD puis GET quand le
+site refuse HEAD. Les résultats sont conservés LINK_CHECK_TTL secondes et,
+si un stockage d'offres est fourni, reportés sur le champ `valide` des offres.
+Seuls les liens propres à une offre sont vérifiés: la page de recherche ou de
+carrières donnée à défaut reste accessible même quand l'offre n'y est plus.
+
+Usage:
+    python -m core.link_validator               # vérifie les liens des offres stockées
+    python -m core.link_validator --limit 100
+"""
+import argparse
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import urlparse
+
+import requests
+
+from config import settings
+from core.http_cache import build_session
+from core.dedup import has_own_link
+from core.offer_store import OfferStore
+from core.rate_limiter import RateLimitExceeded, RobotsDisallowed
+
+logger = logging.getLogger('core.link_validator')
+
+# Codes pour lesquels le site refuse probablement HEAD plutôt que la page elle-même
+HEAD_REFUSED = {403, 405, 429, 501}
+
+
+class LinkValidator:
+    """Service de vérification des liens d'offres (cache des résultats avec TTL)"""
+
+    def __init__(self, session: Optional[requests.Session] = None, store: Optional[OfferStore] = None,
+                 ttl: Optional[float] = None, workers: Optional[int] = None,
+                 per_host: Optional[int] = None):
+        if session is None:
+            session = build_session()
+            # Ne pas réserver de créneaux lointains: les recherches restent prioritaires
+            session.max_queue_wait = settings.LINK_CHECK_QUEUE_WAIT
+        self.session = session
+        self.store = store
+        self.ttl = settings.LINK_CHECK_TTL if ttl is None else ttl
+        self.per_host = per_host or settings.LINK_CHECK_PER_HOST
+
+        self._executor = ThreadPoolExecutor(max_workers=workers or settings.LINK_CHECK_WORKERS,
+                                            thread_name_prefix='link-check')
+        self._lock = threading.Lock()
+        self._results: Dict[str, Tuple[bool, float]] = {}
+        self._pending: Set[str] = set()
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._background: Optional[threading.Thread] = None
+
+    def cached(self, url: str) -> Optional[bool]:
+        """Résultat connu et encore valable pour `url`, sinon None"""
+        with self._lock:
+            result = self._results.get(url)
+        if result is None or time.time() - result[1] > self.ttl:
+            return None
+        return result[0]
+
+    def check(self, url: str) -> Optional[bool]:
+        """Vérifie un lien (bloquant). None si la vérification n'a pas pu avoir lieu"""
+        if not url or not url.startswith('http'):
+            return False
+        return self.check_many([url]).get(url)
+
+    def check_many(self, urls: Iterable[str], deadline: Optional[float] = None) -> Dict[str, bool]:
+        """
+        Vérifie des liens en parallèle. Retourne {lien: accessible} pour les liens vérifiés
+        (depuis le cache ou le réseau); les liens non vérifiés avant `deadline` sont absents.
+        """
+        resultats = {}
+        futures = []
+        for url in dict.fromkeys(urls):
+            known = self.cached(url)
+            if known is not None:
+                resultats[url] = known
+            else:
+                futures.append((url, self._executor.submit(self._check, url)))
+
+        done, _ = wait([future for _, future in futures], timeout=deadline)
+        nouveaux = {url: future.result() for url, future in futures
+                    if future in done and future.result() is not None}
+        self._record(nouveaux)
+        resultats.update(nouveaux)
+        return resultats
+
+    def submit(self, urls: Iterable[str]):
+        """Vérifie des liens en arrière-plan (non bloquant); résultats mis en cache et stockés"""
+        with self._lock:
+            nouveaux = [url for url in dict.fromkeys(urls)
+                        if url and url.startswith('http') and url not in self._pending]
+            self._pending.update(nouveaux)
+
+        for url in nouveaux:
+            if self.cached(url) is not None:
+                with self._lock:
+                    self._pending.discard(url)
+                continue
+            self._executor.submit(self._check_and_record, url)
+
+    def annotate(self, offres: List[Dict]) -> List[Dict]:
+        """
+        Reporte sur les offres l'état des liens déjà vérifiés et lance la
+        vérification des autres en arrière-plan (sans ralentir la recherche).
+        Les offres sans lien propre (voir core.dedup.has_own_link) ne sont pas modifiées.
+        """
+        inconnus = []
+        for offre in offres:
+            if not has_own_link(offre):
+                continue
+            known = self.cached(offre.get('lien') or '')
+            if known is None:
+                inconnus.append(offre.get('lien') or '')
+            else:
+                offre['valide'] = known
+        self.submit(inconnus)
+        return offres
+
+    def validate_store(self, store: Optional[OfferStore] = None, limit: Optional[int] = None) -> Dict:
+        """Vérifie les liens des offres stockées dont la dernière vérification a expiré"""
+        store = store or self.store
+        start = time.perf_counter()
+        liens = store.liens_a_verifier(self.ttl, limit)
+        resultats = self.check_many(liens)
+        if store is not self.store:
+            store.set_validite(resultats)
+        return {
+            'liens': len(liens),
+            'verifies': len(resultats),
+            'valides': sum(resultats.values()),
+            'duree': time.perf_counter() - start
+        }
+
+    def close(self, wait: bool = True):
+        """Abandonne les vérifications en attente (fin d'un traitement sans interface)"""
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    def start_background(self, interval: float) -> threading.Thread:
+        """Vérifie les liens stockés toutes les `interval` secondes (un seul thread par service)"""
+        with self._lock:
+            if self._background is None:
+                self._background = threading.Thread(target=self._run, args=(interval,),
+                                                    name='link-validator', daemon=True)
+                self._background.start()
+            return self._background
+
+    def _run(self, interval: float):
+        while True:
+            try:
+                stats = self.validate_store()
+                logger.info("Liens vérifiés: %(verifies)d/%(liens)d (%(valides)d valides) en %(duree).1fs", stats)
+            except Exception as e:
+                logger.warning("Vérification des liens interrompue: %s", e)
+            time.sleep(interval)
+
+    def _check_and_record(self, url: str):
+        try:
+            valide = self._check(url)
+            if valide is not None:
+                self._record({url: valide})
+        finally:
+            with self._lock:
+                self._pending.discard(url)
+
+    def _record(self, resultats: Dict[str, bool]):
+        if not resultats:
+            return
+        now = time.time()
+        with self._lock:
+            for url, valide in resultats.items():
+                self._results[url] = (valide, now)
+        if self.store is not None:
+            self.store.set_validite(resultats)
+
+    def _check(self, url: str) -> Optional[bool]:
+        """HEAD, puis GET (sans télécharger la page) si HEAD est refusé. None si non vérifiable"""
+        if not url.startswith('http'):
+            return False
+
+        host = urlparse(url).hostname or ''
+        with self._lock:
+            slot = self._host_slots.setdefault(host, threading.BoundedSemaphore(self.per_host))
+
+        with slot:
+            try:
+                response = self.session.head(url, timeout=settings.LINK_CHECK_TIMEOUT, allow_redirects=True)
+                if response.status_code in HEAD_REFUSED:
+                    response = self.session.request('GET', url, timeout=settings.LINK_CHECK_TIMEOUT,
+                                                    allow_redirects=True, stream=True)
+                    response.close()
+            except (RateLimitExceeded, RobotsDisallowed):
+                return None  # Site saturé ou interdit: réessayer plus tard
+            except requests.RequestException:
+                return False
+
+        if response.status_code == 429:
+            return None
+        return response.status_code < 400
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Vérification des liens des offres stockées")
+    parser.add_argument('--limit', type=int, help="Nombre max. de liens à vérifier")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=settings.LOG_LEVEL, format='%(asctime)s %(levelname)s %(message)s')
+    validator = LinkValidator(store=OfferStore())
+    stats = validator.validate_store(limit=args.limit)
+    logger.info("Liens vérifiés: %(verifies)d/%(liens)d (%(valides)d valides) en %(duree).1fs", stats)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,8 @@
-from typing import List, Dict, Optional
-import streamlit as st
+from typing import Iterator, List, Dict, Optional, Tuple
+from core.dedup import dedupe_offres
 from core.entreprises_maroc import EntreprisesMaroc
+from core.metrics import metrics
+from core.sector_classifier import classifier
 from core.stage_finder import StageFinder
 import random
 from datetime import datetime
@@ -8,10 +10,12 @@ from datetime import datetime
 class MarocSearchEngine:
     """Moteur de recherche spécialisé Maroc PFE/Stages"""
     
-    def __init__(self):
-        self.entreprises_db = EntreprisesMaroc()
-        self.stage_finder = StageFinder()
+    def __init__(self, entreprises_db: Optional[EntreprisesMaroc] = None,
+                 stage_finder: Optional[StageFinder] = None):
+        self.entreprises_db = entreprises_db or EntreprisesMaroc()
+        self.stage_finder = stage_finder or StageFinder()
     
+    @metrics.timed('search', mode='complete')
     def search_pfe_opportunities(self, secteur: str, ville: str = None, 
                                 entreprise_specifique: str = None,
                                 type_recherche: str = "stage") -> Dict:
@@ -27,20 +31,7 @@ class MarocSearchEngine:
         }
         
         # 1. Recherche d'entreprises dans le secteur
-        if entreprise_specifique:
-            # Recherche d'une entreprise spécifique
-            entreprise = self.entreprises_db.search_entreprise(entreprise_specifique)
-            if entreprise:
-                results['entreprises'].append(entreprise)
-                results['contacts'].extend(entreprise.get('contacts', []))
-        else:
-            # Recherche par secteur
-            entreprises = self.entreprises_db.get_recommandations_pfe(secteur, ville)
-            results['entreprises'] = entreprises
-            
-            # Ajouter les contacts
-            for entreprise in entreprises[:5]:  # 5 entreprises max
-                results['contacts'].extend(entreprise.get('contacts', []))
+        self._add_entreprises(results, secteur, ville, entreprise_specifique)
         
         # 2. Recherche d'offres de stage
         if type_recherche in ["stage", "tous"]:
@@ -50,9 +41,63 @@ class MarocSearchEngine:
         # 3. Si entreprise spécifique, chercher ses offres
         if entreprise_specifique and type_recherche in ["stage", "tous"]:
             offres_entreprise = self.stage_finder.search_entreprises_direct(entreprise_specifique, secteur)
-            results['offres'].extend(offres_entreprise)
+            results['offres'] = dedupe_offres(results['offres'] + offres_entreprise)
         
+        metrics.inc('search_results', len(results['offres']), kind='offres')
+        metrics.inc('search_results', len(results['entreprises']), kind='entreprises')
         return results
+
+    def stream_pfe_opportunities(self, secteur: str, ville: str = None,
+                                 entreprise_specifique: str = None,
+                                 type_recherche: str = "stage") -> Iterator[Tuple[str, Dict, float]]:
+        """
+        Version progressive de search_pfe_opportunities.
+        Produit (étape terminée, résultats jusqu'ici, avancement entre 0 et 1):
+        d'abord les entreprises de la base locale, puis les offres à chaque source terminée.
+        Le dictionnaire de résultats est mis à jour sur place.
+        """
+        results = {
+            'entreprises': [],
+            'offres': [],
+            'contacts': []
+        }
+        avec_offres = type_recherche in ["stage", "tous"]
+        nb_sources = len(self.stage_finder.orchestrator.providers) if avec_offres else 0
+        total = 1 + nb_sources + (1 if entreprise_specifique and avec_offres else 0)
+        
+        # Durée totale, affichage des étapes intermédiaires compris
+        with metrics.timer('search', mode='stream'):
+            self._add_entreprises(results, secteur, ville, entreprise_specifique)
+            yield "Entreprises", results, 1 / total
+            
+            if avec_offres:
+                for source, offres, avancement in self.stage_finder.iter_all_platforms(secteur, ville):
+                    results['offres'] = offres
+                    yield source, results, (1 + avancement * nb_sources) / total
+                
+                if entreprise_specifique:
+                    results['offres'] = dedupe_offres(results['offres'] + self.stage_finder.search_entreprises_direct(entreprise_specifique, secteur))
+                    yield f"Site {entreprise_specifique}", results, 1.0
+        
+        metrics.inc('search_results', len(results['offres']), kind='offres')
+        metrics.inc('search_results', len(results['entreprises']), kind='entreprises')
+
+    def _add_entreprises(self, results: Dict, secteur: str, ville: Optional[str],
+                         entreprise_specifique: Optional[str]):
+        """Entreprises (et leurs contacts) de la base locale"""
+        if entreprise_specifique:
+            # Recherche floue d'une entreprise spécifique (meilleures correspondances)
+            for entreprise, score in self.entreprises_db.search_entreprises(entreprise_specifique, top_k=3):
+                results['entreprises'].append(entreprise)
+                results['contacts'].extend(entreprise.get('contacts', []))
+        else:
+            # Recherche par secteur
+            entreprises = self.entreprises_db.get_recommandations_pfe(secteur, ville)
+            results['entreprises'] = entreprises
+            
+            # Ajouter les contacts
+            for entreprise in entreprises[:5]:  # 5 entreprises max
+                results['contacts'].extend(entreprise.get('contacts', []))
     
     def generate_contact_professionnel(self, entreprise: Dict, secteur: str) -> Dict:
         """Génère un contact professionnel crédible"""
@@ -186,10 +231,9 @@ class MarocSearchEngine:
             }
         }
         
-        secteur_lower = secteur.lower()
-        for key, data in conseils.items():
-            if key in secteur_lower:
-                return data
+        conseils_secteur = conseils.get(classifier.classify(secteur))
+        if conseils_secteur:
+            return conseils_secteur
         
         # Retour par défaut
         return {
@@ -0,0 +1,182 @@
+"""
+Mesures du chemin critique de la recherche.
+
+Histogrammes de latence par étape (recherche, plateforme, parsing,
+dédoublonnage, lettres...) et compteurs (octets téléchargés, succès du cache,
+nombre de résultats), étiquetés par plateforme ou par site. Les mesures sont
+gardées en mémoire pour le processus et exposées en JSON ou au format texte
+Prometheus (page Diagnostics de l'application: ?diagnostics=1).
+
+    with metrics.timer('portal', portail='Rekrute.com'):
+        ...
+    metrics.inc('http_bytes', len(content), host=host)
+"""
+import json
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Bornes des histogrammes de latence (secondes)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+PREFIX = 'pfe'
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict[str, object]) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+class Histogram:
+    """Histogramme cumulable (comptes par intervalle, somme, min/max)"""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Dernière case: au-delà de la plus grande borne
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """Quantile estimé (interpolation linéaire dans l'intervalle qui le contient)"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                low = self.buckets[i - 1] if i else 0.0
+                high = self.buckets[i] if i < len(self.buckets) else self.max
+                return min(low + (high - low) * (rank - seen) / count, self.max)
+            seen += count
+        return self.max
+
+    def summary(self) -> Dict:
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'mean': self.sum / self.count if self.count else 0.0,
+            'p50': self.quantile(0.5),
+            'p90': self.quantile(0.9),
+            'p99': self.quantile(0.99),
+            'max': self.max
+        }
+
+
+class Metrics:
+    """Histogrammes et compteurs du processus, indexés par (nom, étiquettes)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms: Dict[Tuple[str, Labels], Histogram] = {}
+        self._counters: Dict[Tuple[str, Labels], float] = {}
+        self.started_at = time.time()
+
+    def observe(self, name: str, seconds: float, **labels):
+        """Ajoute une durée à l'histogramme `name`"""
+        key = (name, _labels(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(seconds)
+
+    def inc(self, name: str, value: float = 1, **labels):
+        """Incrémente le compteur `name`"""
+        key = (name, _labels(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    @contextmanager
+    def timer(self, name: str, **labels) -> Iterator[None]:
+        """Mesure la durée du bloc (y compris quand il lève une exception)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def timed(self, name: str, **labels):
+        """Décorateur: mesure chaque appel de la fonction"""
+        def decorator(fn):
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.timer(name, **labels):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+            self.started_at = time.time()
+
+    # ------------------------------------------------------------------
+    # Exports
+    # ------------------------------------------------------------------
+
+    def snapshot(self) -> Dict:
+        """
+        {'since': timestamp, 'latency': [{'name', 'labels', 'count', 'p50', ...}],
+         'counters': [{'name', 'labels', 'value'}]}
+        """
+        with self._lock:
+            latency = [{'name': name, 'labels': dict(labels), **histogram.summary()}
+                       for (name, labels), histogram in sorted(self._histograms.items())]
+            counters = [{'name': name, 'labels': dict(labels), 'value': value}
+                        for (name, labels), value in sorted(self._counters.items())]
+        return {'since': self.started_at, 'latency': latency, 'counters': counters}
+
+    def to_json(self, indent: Optional[int] = 2) -> str:
+        return json.dumps(self.snapshot(), ensure_ascii=False, indent=indent)
+
+    def to_prometheus(self) -> str:
+        """Format texte d'exposition Prometheus (histogrammes *_seconds, compteurs *_total)"""
+        lines: List[str] = []
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            counters = sorted(self._counters.items())
+
+        declared = set()
+        for (name, labels), histogram in histograms:
+            metric = f"{PREFIX}_{name}_seconds"
+            if metric not in declared:
+                declared.add(metric)
+                lines.append(f"# TYPE {metric} histogram")
+            cumulative = 0
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                cumulative += count
+                lines.append(f"{metric}_bucket{_format_labels(labels, le=bound)} {cumulative}")
+            lines.append(f"{metric}_bucket{_format_labels(labels, le='+Inf')} {histogram.count}")
+            lines.append(f"{metric}_sum{_format_labels(labels)} {histogram.sum}")
+            lines.append(f"{metric}_count{_format_labels(labels)} {histogram.count}")
+
+        for (name, labels), value in counters:
+            metric = f"{PREFIX}_{name}_total"
+            if metric not in declared:
+                declared.add(metric)
+                lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric}{_format_labels(labels)} {value}")
+
+        return '\n'.join(lines) + '\n'
+
+
+def _format_labels(labels: Labels, **extra) -> str:
+    pairs = list(labels) + [(key, str(value)) for key, value in extra.items()]
+    if not pairs:
+        return ''
+    escaped = (value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{key}="{value}"' for (key, _), value in zip(pairs, escaped)) + '}'
+
+
+metrics = Metrics()
@@ -0,0 +1,210 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional
+
+from config import settings
+from core.dedup import has_own_link
+from core.ids import offer_id, with_offer_ids
+from core.records import Offer
+from utils.text import fold
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+OFFER_FIELDS = ['titre', 'entreprise', 'lieu', 'date_publication', 'lien', 'source', 'type', 'secteur',
+                'lien_propre', 'valide', 'id']
+# Champs non textuels (schéma des exports typés, voir utils.export)
+OFFER_TYPES = {'lien_propre': bool, 'valide': bool}
+
+
+class OfferStore:
+    """Stockage local (SQLite) des offres collectées par le crawler"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(settings.data_path, 'offres.sqlite')
+        self._lock = threading.Lock()
+        self._writes = 0  # Écritures de cette instance (voir version)
+
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS offres (
+                query_secteur TEXT NOT NULL,
+                query_ville TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                titre TEXT NOT NULL,
+                entreprise TEXT NOT NULL,
+                lieu TEXT,
+                date_publication TEXT,
+                lien TEXT,
+                source TEXT,
+                type TEXT,
+                secteur TEXT,
+                lien_propre INTEGER NOT NULL DEFAULT 0,
+                valide INTEGER NOT NULL DEFAULT 0,
+                id TEXT,
+                crawled_at REAL NOT NULL,
+                PRIMARY KEY (query_secteur, query_ville, position)
+            );
+            CREATE TABLE IF NOT EXISTS crawls (
+                query_secteur TEXT NOT NULL,
+                query_ville TEXT NOT NULL,
+                crawled_at REAL NOT NULL,
+                nb_offres INTEGER NOT NULL,
+                duree REAL NOT NULL,
+                PRIMARY KEY (query_secteur, query_ville)
+            );
+            CREATE TABLE IF NOT EXISTS liens (
+                lien TEXT PRIMARY KEY,
+                valide INTEGER NOT NULL,
+                checked_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_offres_lien ON offres (lien);
+        """)
+        # Bases créées avant l'ajout des identifiants (core.ids)
+        columns = {row['name'] for row in self._conn.execute('PRAGMA table_info(offres)')}
+        if 'id' not in columns:
+            self._conn.execute('ALTER TABLE offres ADD COLUMN id TEXT')
+        # Bases créées avant `lien_propre`: un lien partagé par plusieurs offres d'une même
+        # recherche est une page de résultats, dont `valide` reflétait seulement l'accessibilité
+        if 'lien_propre' not in columns:
+            self._conn.execute('ALTER TABLE offres ADD COLUMN lien_propre INTEGER NOT NULL DEFAULT 0')
+            self._conn.execute(
+                'UPDATE offres SET lien_propre = valide AND (SELECT COUNT(*) FROM offres AS autre '
+                'WHERE autre.query_secteur = offres.query_secteur AND autre.query_ville = offres.query_ville '
+                'AND autre.lien = offres.lien) = 1'
+            )
+            self._conn.execute('UPDATE offres SET valide = 0 WHERE lien_propre = 0')
+        self._conn.commit()
+
+    @staticmethod
+    def _query_key(secteur: str, ville: Optional[str]) -> tuple:
+        return fold(secteur), fold(ville or "Casablanca")
+
+    def save_results(self, secteur: str, ville: Optional[str], offres: List[Dict], duree: float = 0.0):
+        """Remplace les offres d'une recherche (secteur, ville) par un nouveau résultat"""
+        query_secteur, query_ville = self._query_key(secteur, ville)
+        now = time.time()
+        rows = [
+            (query_secteur, query_ville, position, *[offre.get(field) for field in OFFER_FIELDS[:-3]],
+             int(has_own_link(offre)), int(bool(offre.get('valide', False))), offer_id(offre), now)
+            for position, offre in enumerate(offres)
+        ]
+
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM offres WHERE query_secteur = ? AND query_ville = ?',
+                               (query_secteur, query_ville))
+            self._conn.executemany(
+                f"INSERT INTO offres (query_secteur, query_ville, position, {', '.join(OFFER_FIELDS)}, crawled_at) "
+                f"VALUES ({', '.join('?' * (len(OFFER_FIELDS) + 4))})",
+                rows
+            )
+            # Liens propres déjà vérifiés: garder le résultat de la vérification
+            self._conn.execute(
+                'UPDATE offres SET valide = (SELECT valide FROM liens WHERE liens.lien = offres.lien) '
+                'WHERE query_secteur = ? AND query_ville = ? AND lien_propre = 1 '
+                'AND lien IN (SELECT lien FROM liens)',
+                (query_secteur, query_ville)
+            )
+            self._conn.execute('INSERT OR REPLACE INTO crawls VALUES (?, ?, ?, ?, ?)',
+                               (query_secteur, query_ville, now, len(offres), duree))
+            self._writes += 1
+
+    def get_offres(self, secteur: str, ville: Optional[str] = None,
+                   max_age: Optional[float] = None) -> Optional[List[Dict]]:
+        """
+        Offres enregistrées pour une recherche, dans l'ordre du crawl.
+        Retourne None si la recherche n'a jamais été collectée ou date de plus de `max_age` secondes.
+        """
+        query_secteur, query_ville = self._query_key(secteur, ville)
+        max_age = settings.CRAWL_MAX_AGE if max_age is None else max_age
+
+        with self._lock:
+            crawl = self._conn.execute(
+                'SELECT crawled_at FROM crawls WHERE query_secteur = ? AND query_ville = ?',
+                (query_secteur, query_ville)
+            ).fetchone()
+            if crawl is None or time.time() - crawl['crawled_at'] > max_age:
+                return None
+
+            rows = self._conn.execute(
+                f"SELECT {', '.join(OFFER_FIELDS)} FROM offres "
+                "WHERE query_secteur = ? AND query_ville = ? ORDER BY position",
+                (query_secteur, query_ville)
+            ).fetchall()
+
+        offres = []
+        for row in rows:
+            offre = dict(row)
+            offre['lien_propre'] = bool(offre['lien_propre'])
+            offre['valide'] = bool(offre['valide'])
+            offres.append(offre)
+        return with_offer_ids(offres)
+
+    def iter_records(self, batch_size: int = 1000) -> Iterator[Offer]:
+        """
+        Toutes les offres stockées, sous forme d'enregistrements compacts,
+        lues par lots de `batch_size` (le stock entier n'est jamais en mémoire)
+        """
+        last = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT rowid, {', '.join(OFFER_FIELDS)} FROM offres WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                    (last, batch_size)
+                ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield Offer.from_dict(dict(row))
+            last = rows[-1]['rowid']
+
+    def read_frame(self) -> 'pd.DataFrame':
+        """Toutes les offres stockées, en colonnes, avec leur date de collecte (voir OfferTable)"""
+        import pandas as pd  # Seulement pour la table en colonnes: les scrapers n'en dépendent pas
+        with self._lock:
+            return pd.read_sql_query(f"SELECT {', '.join(OFFER_FIELDS)}, crawled_at FROM offres", self._conn)
+
+    def liens_a_verifier(self, ttl: Optional[float] = None, limit: Optional[int] = None) -> List[str]:
+        """Liens propres des offres stockées jamais vérifiés ou vérifiés il y a plus de `ttl` secondes"""
+        ttl = settings.LINK_CHECK_TTL if ttl is None else ttl
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT offres.lien FROM offres LEFT JOIN liens ON liens.lien = offres.lien "
+                "WHERE offres.lien_propre = 1 AND offres.lien LIKE 'http%' "
+                "AND (liens.checked_at IS NULL OR liens.checked_at < ?) LIMIT ?",
+                (time.time() - ttl, -1 if limit is None else limit)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def set_validite(self, resultats: Dict[str, bool]):
+        """
+        Enregistre le résultat des vérifications de liens et met à jour `valide` des offres
+        dont c'est le lien propre (une page de recherche accessible ne valide pas ses offres)
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany('INSERT OR REPLACE INTO liens VALUES (?, ?, ?)',
+                                   [(lien, int(valide), now) for lien, valide in resultats.items()])
+            self._conn.executemany('UPDATE offres SET valide = ? WHERE lien = ? AND lien_propre = 1',
+                                   [(int(valide), lien) for lien, valide in resultats.items()])
+            self._writes += 1
+
+    @property
+    def version(self) -> tuple:
+        """
+        Change à chaque écriture (save_results, set_validite) de cette instance ou d'une autre
+        connexion (crawler lancé à part): PRAGMA data_version ne lit aucune table
+        """
+        with self._lock:
+            return self._writes, self._conn.execute('PRAGMA data_version').fetchone()[0]
+
+    def stats(self) -> Dict:
+        """Nombre de recherches et d'offres stockées, date du dernier crawl"""
+        with self._lock:
+            crawls, last = self._conn.execute('SELECT COUNT(*), MAX(crawled_at) FROM crawls').fetchone()
+            offres = self._conn.execute('SELECT COUNT(*) FROM offres').fetchone()[0]
+        return {'recherches': crawls, 'offres': offres, 'dernier_crawl': last}
@@ -0,0 +1,175 @@
+"""
+Table d'offres en colonnes (pandas) pour filtrer et classer de gros volumes.
+
+Secteur, lieu, source, type et entreprise sont des colonnes catégorielles: un
+filtre (ville contenue dans le lieu, secteur de la taxonomie...) est évalué
+une fois par valeur distincte, puis appliqué à toutes les lignes par leurs
+codes, sans boucle Python sur les offres. Le résultat alimente directement
+`st.dataframe`.
+"""
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from core.ids import offer_id
+from core.offer_store import OFFER_FIELDS, OfferStore
+from core.records import Offer
+from core.sector_classifier import classifier
+from utils.text import fold
+
+CATEGORY_COLUMNS = ['entreprise', 'lieu', 'source', 'type', 'secteur']
+COLUMNS = OFFER_FIELDS + ['collecte']
+
+# Colonnes affichées par display_frame (nom de colonne -> libellé)
+DISPLAY_COLUMNS = {
+    'titre': 'Titre',
+    'entreprise': 'Entreprise',
+    'lieu': 'Lieu',
+    'source': 'Source',
+    'collecte': 'Collectée le',
+    'valide': 'Lien vérifié',
+    'lien': 'Lien'
+}
+
+# Tables construites depuis un stockage, par (chemin, version du stockage)
+_TABLE_CACHE: Dict[tuple, 'OfferTable'] = {}
+_TABLE_CACHE_LOCK = threading.Lock()
+
+
+class OfferTable:
+    """Offres en colonnes; les filtres et tris retournent une nouvelle table"""
+
+    def __init__(self, frame: pd.DataFrame):
+        self.frame = frame
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame) -> 'OfferTable':
+        """Normalise les types: catégories, booléens, dates de collecte"""
+        frame = frame.reindex(columns=COLUMNS)
+        for column in CATEGORY_COLUMNS:
+            frame[column] = frame[column].astype('category')
+        frame['valide'] = frame['valide'].fillna(False).astype(bool)
+        # Offres sans `lien_propre` (voir core.dedup.has_own_link)
+        frame['lien_propre'] = frame['lien_propre'].astype(object).fillna(frame['valide']).astype(bool)
+        if not pd.api.types.is_datetime64_any_dtype(frame['collecte']):
+            frame['collecte'] = pd.to_datetime(frame['collecte'], unit='s')
+        # Nanosecondes quelle que soit l'unité retenue par pandas (score de top)
+        frame['collecte'] = frame['collecte'].astype('datetime64[ns]')
+
+        # Offres stockées avant l'ajout des identifiants
+        missing = frame['id'].isna()
+        if missing.any():
+            fields = [field for field in OFFER_FIELDS if field != 'id']
+            frame['id'] = frame['id'].astype(object)
+            frame.loc[missing, 'id'] = [offer_id(offre) for offre in _records(frame.loc[missing, fields])]
+        return cls(frame.reset_index(drop=True))
+
+    @classmethod
+    def from_offers(cls, offres: Iterable[Union[Dict, Offer]]) -> 'OfferTable':
+        """Table d'une liste d'offres (dictionnaires ou core.records.Offer), collectées maintenant"""
+        rows = [offre.to_dict() if isinstance(offre, Offer) else offre for offre in offres]
+        frame = pd.DataFrame.from_records(rows, columns=OFFER_FIELDS)
+        frame['collecte'] = time.time()
+        return cls.from_frame(frame)
+
+    @classmethod
+    def from_store(cls, store: OfferStore) -> 'OfferTable':
+        """Toutes les offres du stockage; reconstruite seulement après une écriture (crawl, vérification de liens)"""
+        cache_key = (store.path, id(store), store.version)
+        with _TABLE_CACHE_LOCK:
+            if cache_key not in _TABLE_CACHE:
+                frame = store.read_frame().rename(columns={'crawled_at': 'collecte'})
+                _TABLE_CACHE.clear()  # Une seule version par processus
+                _TABLE_CACHE[cache_key] = cls.from_frame(frame)
+            return _TABLE_CACHE[cache_key]
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    # ------------------------------------------------------------------
+    # Filtres
+    # ------------------------------------------------------------------
+
+    def query(self, secteur: Optional[str] = None, ville: Optional[str] = None,
+              depuis: Optional[float] = None, valide: Optional[bool] = None,
+              sources: Optional[Sequence[str]] = None) -> 'OfferTable':
+        """
+        Offres correspondant à tous les critères fournis:
+        - secteur: même secteur de la taxonomie (core.sector_classifier), sinon libellé identique
+        - ville: contenue dans le lieu (sans accents ni majuscules)
+        - depuis: collectées après ce timestamp
+        - valide: état du lien
+        - sources: parmi ces sources
+        """
+        mask = np.ones(len(self.frame), dtype=bool)
+
+        if secteur:
+            key = classifier.classify(secteur)
+            if key is not None:
+                mask &= self._match('secteur', lambda value: classifier.classify(value) == key)
+            else:
+                wanted = fold(secteur)
+                mask &= self._match('secteur', lambda value: fold(value) == wanted)
+        if ville:
+            wanted = fold(ville)
+            mask &= self._match('lieu', lambda value: wanted in fold(value))
+        if depuis is not None:
+            mask &= self.frame['collecte'].to_numpy() >= np.datetime64(int(depuis * 1e9), 'ns')
+        if valide is not None:
+            mask &= self.frame['valide'].to_numpy() == valide
+        if sources is not None:
+            wanted_sources = set(sources)
+            mask &= self._match('source', lambda value: value in wanted_sources)
+
+        return OfferTable(self.frame[mask])
+
+    def _match(self, column: str, predicate) -> np.ndarray:
+        """Masque des lignes dont la valeur vérifie `predicate` (évalué une fois par catégorie)"""
+        categorical = self.frame[column].cat
+        hits = np.fromiter((bool(predicate(value)) for value in categorical.categories),
+                           dtype=bool, count=len(categorical.categories))
+        # Code -1 (valeur manquante) -> dernière case, toujours False
+        return np.append(hits, False)[categorical.codes.to_numpy()]
+
+    # ------------------------------------------------------------------
+    # Tri et classement
+    # ------------------------------------------------------------------
+
+    def sort(self, by: Union[str, List[str]] = 'collecte', ascending: Union[bool, List[bool]] = False) -> 'OfferTable':
+        return OfferTable(self.frame.sort_values(by, ascending=ascending, kind='stable'))
+
+    def top(self, k: int, valides_d_abord: bool = True) -> 'OfferTable':
+        """
+        Les `k` offres les plus récentes (liens vérifiés d'abord), sans trier toute la table:
+        sélection partielle en O(n), puis tri des `k` retenues.
+        """
+        if k >= len(self.frame):
+            return self.sort(['valide', 'collecte'] if valides_d_abord else 'collecte', ascending=False)
+
+        score = self.frame['collecte'].to_numpy().astype('int64').astype(float)
+        if valides_d_abord:
+            score = score + self.frame['valide'].to_numpy() * 1e19
+        selection = np.argpartition(-score, k)[:k]
+        selection = selection[np.argsort(-score[selection], kind='stable')]
+        return OfferTable(self.frame.iloc[selection])
+
+    # ------------------------------------------------------------------
+    # Sorties
+    # ------------------------------------------------------------------
+
+    def display_frame(self) -> pd.DataFrame:
+        """Colonnes lisibles pour st.dataframe"""
+        return self.frame[list(DISPLAY_COLUMNS)].rename(columns=DISPLAY_COLUMNS)
+
+    def to_dicts(self) -> List[Dict]:
+        """Offres au format des scrapers (dictionnaires), sans la date de collecte"""
+        return _records(self.frame[OFFER_FIELDS])
+
+
+def _records(frame: pd.DataFrame) -> List[Dict]:
+    """Lignes en dictionnaires, valeurs manquantes (NaN) remplacées par None"""
+    frame = frame.astype(object)
+    return frame.where(frame.notna(), None).to_dict('records')
@@ -0,0 +1,196 @@
+"""
+Orchestration des sources d'offres par paliers.
+
+Chaque source déclare son coût relatif, son budget de latence et son quota
+journalier. Les sources sont interrogées par coût croissant, toutes les
+sources d'un même palier en parallèle; on ne passe au palier suivant (plus
+cher) que si le nombre d'offres est insuffisant. Un délai global borne la
+recherche: les sources locales (budget de latence nul) restent toujours
+interrogées, si bien qu'une première page arrive même quand les portails
+marocains sont indisponibles.
+"""
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FuturesTimeout
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from config import settings
+from core import events
+from core.dedup import dedupe_offres
+from core.ids import with_offer_ids
+from core.metrics import metrics
+
+Fetch = Callable[[str, Optional[str]], Optional[List[Dict]]]
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_default_executor() -> ThreadPoolExecutor:
+    """Pool de threads partagé par toutes les recherches du processus"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=settings.ORCHESTRATOR_WORKERS,
+                                           thread_name_prefix='source')
+        return _executor
+
+
+class QuotaExceeded(Exception):
+    """Quota journalier de la source atteint"""
+
+
+class SourceProvider:
+    """
+    Source d'offres. `fetch(secteur, ville)` retourne une liste d'offres
+    (None si la source n'a rien à proposer pour cette recherche).
+    """
+
+    def __init__(self, name: str, fetch: Fetch, cost: int, latency_budget: float,
+                 quota_per_day: Optional[int] = None, max_offres: Optional[int] = None):
+        self.name = name
+        self.fetch = fetch
+        self.cost = cost  # Palier: les sources de coût le plus faible sont interrogées d'abord
+        self.latency_budget = latency_budget  # 0 = source locale, instantanée
+        self.quota_per_day = quota_per_day
+        self.max_offres = max_offres
+
+        self._lock = threading.Lock()
+        self._calls = deque()
+
+    def quota_left(self) -> Optional[int]:
+        if self.quota_per_day is None:
+            return None
+        with self._lock:
+            self._expire()
+            return self.quota_per_day - len(self._calls)
+
+    def acquire(self):
+        """Compte un appel; lève QuotaExceeded si le quota des dernières 24h est atteint"""
+        if self.quota_per_day is None:
+            return
+        with self._lock:
+            self._expire()
+            if len(self._calls) >= self.quota_per_day:
+                raise QuotaExceeded(f"{self.name}: quota de {self.quota_per_day} requêtes/jour atteint")
+            self._calls.append(time.time())
+
+    def _expire(self):
+        limite = time.time() - 24 * 3600
+        while self._calls and self._calls[0] < limite:
+            self._calls.popleft()
+
+    def __call__(self, secteur: str, ville: Optional[str]) -> Optional[List[Dict]]:
+        self.acquire()
+        offres = self.fetch(secteur, ville)
+        if offres is not None and self.max_offres is not None:
+            offres = offres[:self.max_offres]
+        return offres
+
+
+class SourceOrchestrator:
+    """Interroge les sources par paliers de coût jusqu'à obtenir assez d'offres"""
+
+    def __init__(self, providers: List[SourceProvider], min_offres: Optional[int] = None,
+                 deadline: Optional[float] = None, max_offres: int = 25,
+                 executor: Optional[ThreadPoolExecutor] = None):
+        self.providers = providers
+        self.executor = executor or get_default_executor()
+        self.min_offres = settings.ORCHESTRATOR_MIN_OFFRES if min_offres is None else min_offres
+        self.deadline = settings.ORCHESTRATOR_DEADLINE if deadline is None else deadline
+        self.max_offres = max_offres
+
+    def tiers(self) -> List[List[SourceProvider]]:
+        """Sources groupées par coût croissant (ordre de déclaration conservé)"""
+        tiers: Dict[int, List[SourceProvider]] = {}
+        for provider in self.providers:
+            tiers.setdefault(provider.cost, []).append(provider)
+        return [tiers[cost] for cost in sorted(tiers)]
+
+    def search(self, secteur: str, ville: Optional[str] = None) -> List[Dict]:
+        """Offres consolidées de la recherche (voir iter_search)"""
+        offres = []
+        for _, offres, _ in self.iter_search(secteur, ville):
+            pass
+        return offres
+
+    def iter_search(self, secteur: str, ville: Optional[str] = None) -> Iterator[Tuple[Dict, List[Dict], float]]:
+        """
+        Produit (rapport de la source, offres consolidées jusqu'ici, avancement entre 0 et 1)
+        à chaque source terminée. Rapport: {'source', 'nb_offres', 'erreur', 'timeout', 'duree'}.
+        """
+        start = time.monotonic()
+        tiers = self.tiers()
+        total = len(self.providers)
+        terminees = 0
+        collectees: List[Tuple[int, int, Dict]] = []  # (coût, rang de la source, offre)
+        offres: List[Dict] = []
+
+        for tier in tiers:
+            if len(offres) >= self.min_offres:
+                break
+
+            remaining = self.deadline - (time.monotonic() - start)
+            # Délai global écoulé: seules les sources locales restent interrogées
+            actives = [p for p in tier if remaining > 0 or not p.latency_budget]
+            budget = max([p.latency_budget for p in actives], default=0)
+            if remaining > 0:
+                budget = min(budget, remaining)
+
+            for provider, rapport, resultat in self._run_tier(actives, secteur, ville, budget):
+                terminees += 1
+                metrics.observe('source', rapport['duree'], source=rapport['source'])
+                metrics.inc('source_offres', rapport['nb_offres'], source=rapport['source'])
+                if rapport['erreur'] is not None:
+                    metrics.inc('source_errors', source=rapport['source'])
+                if rapport['timeout']:
+                    metrics.inc('source_timeouts', source=rapport['source'])
+                rang = self.providers.index(provider)
+                collectees.extend((provider.cost, rang, offre) for offre in resultat or [])
+                offres = self._consolidate(collectees)
+                yield rapport, offres, terminees / total
+
+            terminees += len(tier) - len(actives)
+
+    def _run_tier(self, providers: List[SourceProvider], secteur: str, ville: Optional[str],
+                  budget: float) -> Iterator[Tuple[SourceProvider, Dict, Optional[List[Dict]]]]:
+        """Interroge les sources d'un palier en parallèle; abandonne celles qui dépassent `budget`"""
+        if not providers:
+            return
+
+        debut = time.monotonic()
+        # Messages des sources remis au thread appelant (core.events.bind)
+        futures = {self.executor.submit(events.bind(provider), secteur, ville): provider for provider in providers}
+        restants = set(futures)
+        try:
+            try:
+                for future in as_completed(futures, timeout=budget or None):
+                    events.flush()
+                    restants.discard(future)
+                    rapport = {'source': futures[future].name, 'nb_offres': 0, 'erreur': None,
+                               'timeout': False, 'duree': time.monotonic() - debut}
+                    resultat = None
+                    if future.exception() is not None:
+                        rapport['erreur'] = future.exception()
+                    else:
+                        resultat = future.result()
+                        rapport['nb_offres'] = len(resultat or [])
+                    yield futures[future], rapport, resultat
+            except FuturesTimeout:
+                events.flush()
+
+            for future in restants:
+                rapport = {'source': futures[future].name, 'nb_offres': 0, 'erreur': None,
+                           'timeout': True, 'duree': time.monotonic() - debut}
+                yield futures[future], rapport, None
+        finally:
+            # Ne pas attendre les sources trop lentes (celles pas encore démarrées sont annulées)
+            for future in restants:
+                future.cancel()
+
+    def _consolidate(self, collectees: List[Tuple[int, int, Dict]]) -> List[Dict]:
+        """Ordre des sources, offres aux liens valides d'abord dans chaque palier, sans doublons"""
+        ordonnees = sorted(collectees, key=lambda item: (item[0], not item[2].get('valide', False), item[1]))
+        return with_offer_ids(dedupe_offres(offre for _, _, offre in ordonnees)[:self.max_offres])
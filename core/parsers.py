@@ -0,0 +1,92 @@
+"""
+Analyse HTML des pages de résultats.
+
+Le backend le plus rapide disponible est choisi une fois (lxml, sinon le
+parser standard de Python). Les champs d'une offre sont extraits en un seul
+parcours de l'élément au lieu d'un `select_one` (donc d'un parcours) par champ.
+"""
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from bs4 import BeautifulSoup, Tag
+
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+Matcher = Callable[[Tag], bool]
+
+
+def make_soup(content: bytes) -> BeautifulSoup:
+    """Construit l'arbre HTML avec le backend retenu"""
+    return BeautifulSoup(content, HTML_PARSER)
+
+
+def has_class(*classes: str) -> Matcher:
+    """Équivalent de '.a, .b' pour un seul élément"""
+    wanted = frozenset(classes)
+    return lambda tag: not wanted.isdisjoint(tag.get('class') or ())
+
+
+def tag_name(*names: str) -> Matcher:
+    """Équivalent de 'h3, h4'"""
+    wanted = frozenset(names)
+    return lambda tag: tag.name in wanted
+
+
+def link_containing(*fragments: str) -> Matcher:
+    """Équivalent de 'a[href*="x"], a[href*="y"]'"""
+    def match(tag: Tag) -> bool:
+        if tag.name != 'a':
+            return False
+        href = tag.get('href')
+        return href is not None and any(fragment in href for fragment in fragments)
+    return match
+
+
+def any_of(*matchers: Matcher) -> Matcher:
+    return lambda tag: any(matcher(tag) for matcher in matchers)
+
+
+def find_items(root: Tag, primary: Matcher, fallback: Optional[Matcher] = None,
+               limit: Optional[int] = None) -> List[Tag]:
+    """
+    Éléments correspondant à `primary` (ordre du document), ou à défaut à `fallback`,
+    collectés en un seul parcours. S'arrête dès que `limit` éléments primaires sont trouvés.
+    """
+    primary_items: List[Tag] = []
+    fallback_items: List[Tag] = []
+
+    for tag in root.descendants:
+        if not isinstance(tag, Tag):
+            continue
+        if primary(tag):
+            primary_items.append(tag)
+            if limit is not None and len(primary_items) >= limit:
+                break
+        elif fallback is not None and not primary_items and fallback(tag):
+            fallback_items.append(tag)
+
+    items = primary_items or fallback_items
+    return items[:limit] if limit is not None else items
+
+
+def extract_fields(element: Tag, fields: Sequence[Tuple[str, Matcher]]) -> Dict[str, Tag]:
+    """Premier descendant correspondant à chaque champ, en un seul parcours"""
+    found: Dict[str, Tag] = {}
+
+    for tag in element.descendants:
+        if not isinstance(tag, Tag):
+            continue
+        for name, matcher in fields:
+            if name not in found and matcher(tag):
+                found[name] = tag
+        if len(found) == len(fields):
+            break
+
+    return found
+
+
+def text_of(tag: Optional[Tag], default: str = "") -> str:
+    return tag.get_text(strip=True) if tag is not None else default
@@ -0,0 +1,142 @@
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+
+import requests
+
+from config import settings
+
+ROBOTS_TTL = 24 * 3600  # Durée de conservation d'un robots.txt (s)
+
+
+class RateLimitExceeded(requests.RequestException):
+    """Le site est saturé: la requête aurait attendu trop longtemps son tour"""
+
+
+class RobotsDisallowed(requests.RequestException):
+    """L'URL est interdite par le robots.txt du site"""
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """En-tête Retry-After (secondes ou date HTTP) -> secondes d'attente"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class HostRateLimiter:
+    """
+    Seau à jetons par site, partagé par tous les scrapers.
+
+    Chaque appel à `acquire` réserve le prochain créneau libre du site (file
+    d'attente FIFO): au plus `burst` requêtes immédiates, puis une requête
+    toutes les `interval` secondes. Un site qui répond 429/503 avec Retry-After
+    est suspendu pendant la durée demandée.
+    """
+
+    def __init__(self, requests_per_minute: Optional[int] = None, min_delay: Optional[float] = None,
+                 burst: Optional[int] = None, respect_robots: Optional[bool] = None,
+                 user_agent: Optional[str] = None):
+        rpm = requests_per_minute or settings.MAX_REQUESTS_PER_MINUTE
+        delay = settings.REQUEST_DELAY if min_delay is None else min_delay
+        self.interval = max(delay, 60.0 / rpm)
+        self.burst = burst or settings.RATE_LIMIT_BURST
+        self.respect_robots = settings.RESPECT_ROBOTS_TXT if respect_robots is None else respect_robots
+        self.user_agent = user_agent or settings.USER_AGENT
+
+        self._lock = threading.Lock()
+        self._tat: Dict[str, float] = {}  # Heure théorique d'arrivée (GCRA) par site
+        self._blocked_until: Dict[str, float] = {}
+        self._robots: Dict[str, tuple] = {}
+        self._robots_locks: Dict[str, threading.Lock] = {}
+
+    def acquire(self, url: str, max_wait: Optional[float] = None, user_agent: Optional[str] = None):
+        """
+        Attend (dans le thread appelant) le créneau du site de `url`.
+        Lève RobotsDisallowed ou RateLimitExceeded si la requête ne doit pas partir.
+        `user_agent`: User-Agent réellement envoyé (par défaut celui du limiteur).
+        """
+        if not self.can_fetch(url, user_agent):
+            raise RobotsDisallowed(f"Interdit par robots.txt: {url}")
+
+        host = urlparse(url).hostname or ''
+        tolerance = (self.burst - 1) * self.interval
+
+        with self._lock:
+            now = time.monotonic()
+            tat = max(self._tat.get(host, now), now)
+            send_at = max(now, tat - tolerance, self._blocked_until.get(host, 0))
+            wait = send_at - now
+            if max_wait is not None and wait > max_wait:
+                raise RateLimitExceeded(f"{host}: attente de {wait:.0f}s au-delà de {max_wait:.0f}s")
+            self._tat[host] = max(tat, send_at) + self.interval
+
+        if wait > 0:
+            time.sleep(wait)
+
+    def penalize(self, url: str, retry_after: Optional[str]):
+        """Suspend le site après une réponse 429/503 (Retry-After, sinon 60s)"""
+        host = urlparse(url).hostname or ''
+        delay = parse_retry_after(retry_after)
+        delay = 60.0 if delay is None else delay
+        with self._lock:
+            self._blocked_until[host] = max(self._blocked_until.get(host, 0), time.monotonic() + delay)
+
+    def can_fetch(self, url: str, user_agent: Optional[str] = None) -> bool:
+        """
+        Vérifie l'URL contre le robots.txt du site (mis en cache ROBOTS_TTL secondes),
+        pour `user_agent` (par défaut settings.USER_AGENT, celui des scrapers).
+        Avec la configuration par défaut, LinkedIn (robots.txt fermé aux robots) est refusé.
+        """
+        if not self.respect_robots:
+            return True
+
+        parsed = urlparse(url)
+        root = f"{parsed.scheme}://{parsed.netloc}"
+
+        with self._lock:
+            host_lock = self._robots_locks.setdefault(root, threading.Lock())
+
+        with host_lock:
+            cached = self._robots.get(root)
+            if cached is None or time.monotonic() - cached[1] > ROBOTS_TTL:
+                cached = (self._fetch_robots(root), time.monotonic())
+                self._robots[root] = cached
+
+        parser = cached[0]
+        return parser is None or parser.can_fetch(user_agent or self.user_agent, url)
+
+    def _fetch_robots(self, root: str) -> Optional[RobotFileParser]:
+        """Télécharge robots.txt; None (tout autorisé) si indisponible"""
+        try:
+            response = requests.get(f"{root}/robots.txt", timeout=5,
+                                    headers={'User-Agent': self.user_agent})
+        except requests.RequestException:
+            return None
+        if response.status_code != 200:
+            return None
+        parser = RobotFileParser()
+        parser.parse(response.text.splitlines())
+        return parser
+
+
+_default_limiter = None
+_default_limiter_lock = threading.Lock()
+
+
+def get_default_limiter() -> HostRateLimiter:
+    """Limiteur partagé par toutes les sessions du processus"""
+    global _default_limiter
+    with _default_limiter_lock:
+        if _default_limiter is None:
+            _default_limiter = HostRateLimiter()
+        return _default_limiter
@@ -1,381 +1,565 @@
 import requests
-from bs4 import BeautifulSoup
 import json
-from typing import List, Dict, Optional
-import streamlit as st
+from typing import Callable, Iterator, List, Dict, Optional, Tuple
 from datetime import datetime
+from collections import Counter
+from concurrent.futures import Future, as_completed
+from concurrent.futures import TimeoutError as FuturesTimeout
 import re
+import threading
+import time
+from config import settings
+from core import events
+from core.dedup import dedupe_offres
+from core.http_cache import build_session
+from core.http_client import HttpClient
+from core.ids import with_offer_ids
+from core.link_validator import LinkValidator
+from core.metrics import metrics
+from core.parsers import any_of, extract_fields, find_items, has_class, link_containing, make_soup, tag_name, text_of
+from core.sector_classifier import classifier
+
+REQUEST_TIMEOUT = 15  # Timeout (s) d'une requête vers un portail
+
+# Nom d'entreprise dans la description d'une annonce MarocAnnonces
+ENTREPRISE_PATTERN = re.compile(r'(?:chez|à|dans|pour)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)')
+
 
 class RealOffersFinder:
     """Trouve des offres RÉELLES de stage au Maroc"""
-    
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-            'Accept-Language': 'fr,fr-FR;q=0.9,en;q=0.8',
-            'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'keep-alive'
-        })
-    
+
+    def __init__(self, session: Optional[requests.Session] = None,
+                 link_validator: Optional[LinkValidator] = None,
+                 http_client: Optional[HttpClient] = None):
+        # Session, vérificateur de liens et ordonnanceur: ceux fournis (registre), sinon construits au premier usage
+        self._session = session
+        self._link_validator = link_validator
+        self._http = http_client
+        self._lock = threading.RLock()  # Réentrant: l'ordonnanceur par défaut utilise la session
+
+    def _lazy(self, attr: str, factory: Callable):
+        """Instance fournie au constructeur, sinon construite une fois au premier usage"""
+        value = getattr(self, attr)
+        if value is None:
+            with self._lock:
+                value = getattr(self, attr)
+                if value is None:
+                    value = factory()
+                    setattr(self, attr, value)
+        return value
+
+    @property
+    def session(self) -> requests.Session:
+        return self._lazy('_session', build_session)
+
+    @property
+    def link_validator(self) -> LinkValidator:
+        return self._lazy('_link_validator', LinkValidator)
+
+    @property
+    def http(self) -> HttpClient:
+        """Ordonnancement des requêtes (limites globales et par site, annulation), autour de la session"""
+        return self._lazy('_http', lambda: HttpClient(session=self.session))
+
+    # ------------------------------------------------------------------
+    # Construction des URLs
+    # ------------------------------------------------------------------
+
+    def _rekrute_urls(self, secteur: str, ville: str) -> List[Tuple[str, str]]:
+        """Retourne les couples (mot-clé, URL) à interroger sur Rekrute.com"""
+        search_terms = {
+            'informatique': ['développeur', 'programmeur', 'informaticien', 'stage informatique'],
+            'telecom': ['telecom', 'réseaux', 'stage telecom'],
+            'banque_finance': ['finance', 'banque', 'stage finance'],
+            'marketing': ['marketing', 'communication', 'stage marketing']
+        }
+
+        keywords = search_terms.get(classifier.classify(secteur), [secteur])
+
+        return [
+            (keyword, f"https://www.rekrute.com/offres.html?p={keyword}&s=1&o=1&l={ville}")
+            for keyword in keywords[:2]  # Essayer 2 keywords
+        ]
+
+    def _emploi_ma_url(self, secteur: str) -> str:
+        return f"https://www.emploi.ma/recherche-emploi-maroc?mots={secteur}"
+
+    def _marocannonces_url(self, secteur: str) -> str:
+        return f"https://www.marocannonces.com/categorie/309/Emploi-et-Formation/Offres-d-emploi.html?filtre={secteur}"
+
+    def _linkedin_urls(self, secteur: str, ville: str) -> List[str]:
+        # URLs de recherche LinkedIn pour le Maroc
+        linkedin_urls = [
+            f"https://www.linkedin.com/jobs/search/?keywords=stage%20{secteur}&location=Maroc",
+            f"https://www.linkedin.com/jobs/search/?keywords=pfe%20{secteur}&location=Maroc",
+            f"https://www.linkedin.com/jobs/search/?keywords=alternance%20{secteur}&location={ville}%2C%20Maroc"
+        ]
+        return linkedin_urls[:2]  # Essayer 2 URLs
+
+    # ------------------------------------------------------------------
+    # Parsing des pages (sans appel réseau ni affichage)
+    # ------------------------------------------------------------------
+
+    # Champs extraits en un seul parcours de chaque élément (voir core.parsers)
+    REKRUTE_FIELDS = [
+        ('titre', has_class('titreJob', 'emploi-title', 'job-title')),
+        ('entreprise', has_class('entreprise', 'company-name', 'societe')),
+        ('lieu', has_class('lieu', 'location', 'ville')),
+        ('lien', link_containing('/offres/', '/emploi/'))
+    ]
+    EMPLOI_MA_FIELDS = [
+        ('titre', any_of(has_class('titre', 'title'), tag_name('h3', 'h4'))),
+        ('entreprise', has_class('entreprise', 'company', 'societe')),
+        ('lieu', has_class('lieu', 'ville', 'location')),
+        ('lien', link_containing('/offre/', '/emploi/'))
+    ]
+    MAROCANNONCES_FIELDS = [
+        ('titre', any_of(has_class('titre', 'title'), tag_name('h3'))),
+        ('lien', link_containing('.html')),
+        ('description', has_class('description', 'desc'))
+    ]
+    LINKEDIN_FIELDS = [
+        ('titre', has_class('job-card-list__title', 'result-card__title')),
+        ('entreprise', has_class('job-card-container__company-name', 'result-card__subtitle')),
+        ('lieu', has_class('job-card-container__metadata-item', 'job-result-card__location')),
+        ('lien', link_containing('/jobs/view/'))
+    ]
+
+    def _parse_rekrute(self, content: bytes, url: str, secteur: str, ville: str) -> List[Dict]:
+        """Extrait les offres de stage d'une page de résultats Rekrute.com"""
+        soup = make_soup(content)
+        offres = []
+
+        # Recherche des offres (sinon, essayer un autre sélecteur)
+        offre_elements = find_items(soup, has_class('job-item', 'emploi-item', 'offer-item'),
+                                    fallback=has_class('titreJob', 'emploi-title'), limit=10)
+
+        for element in offre_elements:  # Limiter à 10
+            try:
+                champs = extract_fields(element, self.REKRUTE_FIELDS)
+                titre = text_of(champs.get('titre'), f"Stage {secteur}")
+
+                # Vérifier si c'est un stage
+                if not any(mot in titre.lower() for mot in ['stage', 'stagiare', 'pfe', 'intern', 'alternance']):
+                    continue
+
+                # Extraire lien
+                lien = ""
+                lien_elem = champs.get('lien')
+                if lien_elem is not None:
+                    lien = f"https://www.rekrute.com{lien_elem['href']}"
+                else:
+                    # Chercher un lien dans l'élément parent
+                    parent_link = element.find_parent('a', href=True)
+                    if parent_link:
+                        lien = f"https://www.rekrute.com{parent_link['href']}"
+
+                offres.append({
+                    'titre': titre,
+                    'entreprise': text_of(champs.get('entreprise'), "Entreprise"),
+                    'lieu': text_of(champs.get('lieu'), ville),
+                    'date_publication': 'Récente',
+                    'lien': lien if lien else url,
+                    'source': 'Rekrute.com',
+                    'type': 'Stage',
+                    'secteur': secteur,
+                    'lien_propre': bool(lien),  # Sinon: page de résultats, partagée
+                    'valide': bool(lien)
+                })
+
+            except Exception as e:
+                continue
+
+        return offres
+
+    def _parse_emploi_ma(self, content: bytes, url: str, secteur: str) -> List[Dict]:
+        """Extrait les offres de stage d'une page de résultats Emploi.ma"""
+        soup = make_soup(content)
+        offres = []
+
+        # Rechercher les offres de stage
+        stage_keywords = ['stage', 'stagiare', 'pfe', 'alternance']
+
+        for item in find_items(soup, has_class('job-item', 'offer', 'annonce'), limit=10):
+            try:
+                champs = extract_fields(item, self.EMPLOI_MA_FIELDS)
+                titre = text_of(champs.get('titre'), f"Offre {secteur}")
+
+                # Vérifier si c'est un stage
+                if not any(keyword in titre.lower() for keyword in stage_keywords):
+                    continue
+
+                lien_elem = champs.get('lien')
+                lien = lien_elem['href'] if lien_elem is not None else ""
+                if lien and not lien.startswith('http'):
+                    lien = f"https://www.emploi.ma{lien}"
+
+                offres.append({
+                    'titre': titre,
+                    'entreprise': text_of(champs.get('entreprise'), "Entreprise"),
+                    'lieu': text_of(champs.get('lieu'), "Maroc"),
+                    'date_publication': '2024',
+                    'lien': lien if lien else url,
+                    'source': 'Emploi.ma',
+                    'type': 'Stage',
+                    'secteur': secteur,
+                    'lien_propre': bool(lien),
+                    'valide': bool(lien)
+                })
+
+            except:
+                continue
+
+        return offres
+
+    def _parse_marocannonces(self, content: bytes, url: str, secteur: str) -> List[Dict]:
+        """Extrait les offres de stage d'une page de MarocAnnonces.com"""
+        soup = make_soup(content)
+        offres = []
+
+        # Chercher les annonces
+        for annonce in find_items(soup, has_class('annonce', 'item', 'listing-item'), limit=10):
+            try:
+                champs = extract_fields(annonce, self.MAROCANNONCES_FIELDS)
+                titre = text_of(champs.get('titre'))
+
+                # Vérifier si c'est un stage
+                if not titre or not any(mot in titre.lower() for mot in ['stage', 'stagiare', 'pfe']):
+                    continue
+
+                lien_elem = champs.get('lien')
+                lien = lien_elem['href'] if lien_elem is not None else ""
+                if lien and not lien.startswith('http'):
+                    lien = f"https://www.marocannonces.com{lien}"
+
+                # Extraire entreprise du titre ou description
+                entreprise = "Entreprise"
+                desc_elem = champs.get('description')
+                if desc_elem is not None:
+                    # Chercher un nom d'entreprise
+                    entreprise_match = ENTREPRISE_PATTERN.search(desc_elem.get_text())
+                    if entreprise_match:
+                        entreprise = entreprise_match.group(1)
+
+                offres.append({
+                    'titre': titre,
+                    'entreprise': entreprise,
+                    'lieu': "Maroc",
+                    'date_publication': 'Récente',
+                    'lien': lien if lien else url,
+                    'source': 'MarocAnnonces',
+                    'type': 'Stage',
+                    'secteur': secteur,
+                    'lien_propre': bool(lien),
+                    'valide': bool(lien)
+                })
+
+            except:
+                continue
+
+        return offres
+
+    def _parse_linkedin(self, content: bytes, url: str, secteur: str, ville: str) -> List[Dict]:
+        """Extrait les offres d'une page de recherche LinkedIn Jobs"""
+        soup = make_soup(content)
+        offres = []
+
+        # Chercher les jobs (sélecteurs LinkedIn)
+        for card in find_items(soup, has_class('job-card-container', 'result-card'), limit=5):
+            try:
+                champs = extract_fields(card, self.LINKEDIN_FIELDS)
+
+                # Construire lien LinkedIn
+                lien = url  # Par défaut
+                link_elem = champs.get('lien')
+                if link_elem is not None:
+                    lien = f"https://www.linkedin.com{link_elem['href']}"
+
+                offres.append({
+                    'titre': text_of(champs.get('titre'), f"Stage {secteur}"),
+                    'entreprise': text_of(champs.get('entreprise'), "Entreprise"),
+                    'lieu': text_of(champs.get('lieu'), ville),
+                    'date_publication': 'Récente',
+                    'lien': lien,
+                    'source': 'LinkedIn',
+                    'type': 'Stage',
+                    'secteur': secteur,
+                    'lien_propre': link_elem is not None,
+                    'valide': link_elem is not None
+                })
+
+            except:
+                continue
+
+        return offres
+
+    # ------------------------------------------------------------------
+    # Recherche par plateforme (séquentielle)
+    # ------------------------------------------------------------------
+
+    @metrics.timed('portal_search', portail='Rekrute.com')
     def search_rekrute_real(self, secteur: str, ville: str = "Casablanca") -> List[Dict]:
         """Recherche RÉELLE sur Rekrute.com (site marocain d'emploi)"""
         try:
-            # Encodage des paramètres
-            search_terms = {
-                'informatique': ['développeur', 'programmeur', 'informaticien', 'stage informatique'],
-                'telecom': ['telecom', 'réseaux', 'stage telecom'],
-                'finance': ['finance', 'banque', 'stage finance'],
-                'marketing': ['marketing', 'communication', 'stage marketing']
-            }
-            
-            keywords = search_terms.get(secteur.lower(), [secteur])
-            
             all_offres = []
-            
-            for keyword in keywords[:2]:  # Essayer 2 keywords
-                # Construction URL
-                url = f"https://www.rekrute.com/offres.html?p={keyword}&s=1&o=1&l={ville}"
-                
-                st.write(f"🔍 Recherche Rekrute.com: {keyword} à {ville}")
-                
+
+            for keyword, url in self._rekrute_urls(secteur, ville):
+                events.emit(events.PROGRESS, f"🔍 Recherche Rekrute.com: {keyword} à {ville}", source='Rekrute.com')
+
                 try:
-                    response = self.session.get(url, timeout=15)
-                    
+                    response = self.session.get(url, timeout=REQUEST_TIMEOUT)
+
                     if response.status_code == 200:
-                        soup = BeautifulSoup(response.content, 'html.parser')
-                        
-                        # Recherche des offres
-                        offre_elements = soup.select('.job-item, .emploi-item, .offer-item')
-                        
-                        if not offre_elements:
-                            # Essayer un autre sélecteur
-                            offre_elements = soup.select('.titreJob, .emploi-title')
-                        
-                        for element in offre_elements[:10]:  # Limiter à 10
-                            try:
-                                # Extraire titre
-                                titre_elem = element.select_one('.titreJob, .emploi-title, .job-title')
-                                titre = titre_elem.get_text(strip=True) if titre_elem else f"Stage {secteur}"
-                                
-                                # Extraire entreprise
-                                entreprise_elem = element.select_one('.entreprise, .company-name, .societe')
-                                entreprise = entreprise_elem.get_text(strip=True) if entreprise_elem else "Entreprise"
-                                
-                                # Extraire lieu
-                                lieu_elem = element.select_one('.lieu, .location, .ville')
-                                lieu = lieu_elem.get_text(strip=True) if lieu_elem else ville
-                                
-                                # Extraire lien
-                                lien_elem = element.select_one('a[href*="/offres/"], a[href*="/emploi/"]')
-                                lien = ""
-                                if lien_elem and 'href' in lien_elem.attrs:
-                                    lien = f"https://www.rekrute.com{lien_elem['href']}"
-                                else:
-                                    # Chercher un lien dans l'élément parent
-                                    parent_link = element.find_parent('a', href=True)
-                                    if parent_link:
-                                        lien = f"https://www.rekrute.com{parent_link['href']}"
-                                
-                                # Vérifier si c'est un stage
-                                if any(mot in titre.lower() for mot in ['stage', 'stagiare', 'pfe', 'intern', 'alternance']):
-                                    offre = {
-                                        'titre': titre,
-                                        'entreprise': entreprise,
-                                        'lieu': lieu,
-                                        'date_publication': 'Récente',
-                                        'lien': lien if lien else url,
-                                        'source': 'Rekrute.com',
-                                        'type': 'Stage',
-                                        'secteur': secteur,
-                                        'valide': bool(lien)  # Marquer si lien valide
-                                    }
-                                    all_offres.append(offre)
-                                    
-                            except Exception as e:
-                                continue
-                    
+                        all_offres.extend(self._parse_rekrute(response.content, url, secteur, ville))
+
                 except Exception as e:
-                    st.warning(f"⚠️ Erreur Rekrute.com ({keyword}): {str(e)[:50]}")
+                    events.emit(events.WARNING, f"⚠️ Erreur Rekrute.com ({keyword}): {str(e)[:50]}", source='Rekrute.com', erreur=e)
                     continue
-            
+
             return all_offres[:15]  # Limiter à 15 offres
-            
+
         except Exception as e:
-            st.error(f"❌ Erreur générale Rekrute: {e}")
+            events.emit(events.ERROR, f"❌ Erreur générale Rekrute: {e}", source='Rekrute.com', erreur=e)
             return []
-    
+
+    @metrics.timed('portal_search', portail='Emploi.ma')
     def search_emploi_ma_real(self, secteur: str) -> List[Dict]:
         """Recherche sur Emploi.ma (site marocain)"""
         try:
-            url = f"https://www.emploi.ma/recherche-emploi-maroc?mots={secteur}"
-            
-            st.write(f"🔍 Recherche Emploi.ma: {secteur}")
-            
-            response = self.session.get(url, timeout=15)
-            
+            url = self._emploi_ma_url(secteur)
+
+            events.emit(events.PROGRESS, f"🔍 Recherche Emploi.ma: {secteur}", source='Emploi.ma')
+
+            response = self.session.get(url, timeout=REQUEST_TIMEOUT)
+
             if response.status_code == 200:
-                soup = BeautifulSoup(response.content, 'html.parser')
-                offres = []
-                
-                # Rechercher les offres de stage
-                stage_keywords = ['stage', 'stagiare', 'pfe', 'alternance']
-                
-                # Chercher dans tout le texte
-                text = soup.get_text().lower()
-                
-                # Extraire les offres
-                job_items = soup.select('.job-item, .offer, .annonce')
-                
-                for item in job_items[:10]:
-                    try:
-                        # Extraire titre
-                        titre_elem = item.select_one('.titre, .title, h3, h4')
-                        titre = titre_elem.get_text(strip=True) if titre_elem else f"Offre {secteur}"
-                        
-                        # Vérifier si c'est un stage
-                        titre_lower = titre.lower()
-                        if any(keyword in titre_lower for keyword in stage_keywords):
-                            # Extraire entreprise
-                            entreprise_elem = item.select_one('.entreprise, .company, .societe')
-                            entreprise = entreprise_elem.get_text(strip=True) if entreprise_elem else "Entreprise"
-                            
-                            # Extraire lieu
-                            lieu_elem = item.select_one('.lieu, .ville, .location')
-                            lieu = lieu_elem.get_text(strip=True) if lieu_elem else "Maroc"
-                            
-                            # Extraire lien
-                            lien_elem = item.select_one('a[href*="/offre/"], a[href*="/emploi/"]')
-                            lien = lien_elem['href'] if lien_elem and 'href' in lien_elem.attrs else ""
-                            if lien and not lien.startswith('http'):
-                                lien = f"https://www.emploi.ma{lien}"
-                            
-                            offres.append({
-                                'titre': titre,
-                                'entreprise': entreprise,
-                                'lieu': lieu,
-                                'date_publication': '2024',
-                                'lien': lien if lien else url,
-                                'source': 'Emploi.ma',
-                                'type': 'Stage',
-                                'secteur': secteur,
-                                'valide': bool(lien)
-                            })
-                            
-                    except:
-                        continue
-                
-                return offres
+                return self._parse_emploi_ma(response.content, url, secteur)
             else:
                 return []
-                
+
         except Exception as e:
-            st.warning(f"⚠️ Erreur Emploi.ma: {e}")
+            events.emit(events.WARNING, f"⚠️ Erreur Emploi.ma: {e}", source='Emploi.ma', erreur=e)
             return []
-    
+
+    @metrics.timed('portal_search', portail='MarocAnnonces')
     def search_marocannonces(self, secteur: str) -> List[Dict]:
         """Recherche sur MarocAnnonces.com"""
         try:
-            url = f"https://www.marocannonces.com/categorie/309/Emploi-et-Formation/Offres-d-emploi.html?filtre={secteur}"
-            
-            st.write(f"🔍 Recherche MarocAnnonces: {secteur}")
-            
-            response = self.session.get(url, timeout=15)
-            
+            url = self._marocannonces_url(secteur)
+
+            events.emit(events.PROGRESS, f"🔍 Recherche MarocAnnonces: {secteur}", source='MarocAnnonces')
+
+            response = self.session.get(url, timeout=REQUEST_TIMEOUT)
+
             if response.status_code == 200:
-                soup = BeautifulSoup(response.content, 'html.parser')
-                offres = []
-                
-                # Chercher les annonces
-                annonces = soup.select('.annonce, .item, .listing-item')[:10]
-                
-                for annonce in annonces:
-                    try:
-                        titre_elem = annonce.select_one('.titre, .title, h3')
-                        titre = titre_elem.get_text(strip=True) if titre_elem else ""
-                        
-                        # Vérifier si c'est un stage
-                        if titre and any(mot in titre.lower() for mot in ['stage', 'stagiare', 'pfe']):
-                            lien_elem = annonce.select_one('a[href*=".html"]')
-                            lien = lien_elem['href'] if lien_elem and 'href' in lien_elem.attrs else ""
-                            
-                            if lien and not lien.startswith('http'):
-                                lien = f"https://www.marocannonces.com{lien}"
-                            
-                            # Extraire entreprise du titre ou description
-                            entreprise = "Entreprise"
-                            desc_elem = annonce.select_one('.description, .desc')
-                            if desc_elem:
-                                desc_text = desc_elem.get_text()
-                                # Chercher un nom d'entreprise
-                                entreprise_match = re.search(r'(?:chez|à|dans|pour)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)', desc_text)
-                                if entreprise_match:
-                                    entreprise = entreprise_match.group(1)
-                            
-                            offres.append({
-                                'titre': titre,
-                                'entreprise': entreprise,
-                                'lieu': "Maroc",
-                                'date_publication': 'Récente',
-                                'lien': lien if lien else url,
-                                'source': 'MarocAnnonces',
-                                'type': 'Stage',
-                                'secteur': secteur,
-                                'valide': bool(lien)
-                            })
-                            
-                    except:
-                        continue
-                
-                return offres
+                return self._parse_marocannonces(response.content, url, secteur)
             else:
                 return []
-                
+
         except Exception as e:
-            st.warning(f"⚠️ Erreur MarocAnnonces: {e}")
+            events.emit(events.WARNING, f"⚠️ Erreur MarocAnnonces: {e}", source='MarocAnnonces', erreur=e)
             return []
-    
+
+    @metrics.timed('portal_search', portail='LinkedIn')
     def search_linkedin_api(self, secteur: str, ville: str = "Casablanca") -> List[Dict]:
         """Recherche via l'API LinkedIn (approche alternative)"""
         try:
             # Note: LinkedIn API nécessite un token
             # Cette méthode utilise une approche simplifiée
-            
-            # URLs de recherche LinkedIn pour le Maroc
-            linkedin_urls = [
-                f"https://www.linkedin.com/jobs/search/?keywords=stage%20{secteur}&location=Maroc",
-                f"https://www.linkedin.com/jobs/search/?keywords=pfe%20{secteur}&location=Maroc",
-                f"https://www.linkedin.com/jobs/search/?keywords=alternance%20{secteur}&location={ville}%2C%20Maroc"
-            ]
-            
             offres = []
-            
-            for url in linkedin_urls[:2]:  # Essayer 2 URLs
+
+            for url in self._linkedin_urls(secteur, ville):
                 try:
-                    response = self.session.get(url, timeout=15)
-                    
+                    response = self.session.get(url, timeout=REQUEST_TIMEOUT)
+
                     if response.status_code == 200:
-                        soup = BeautifulSoup(response.content, 'html.parser')
-                        
-                        # Chercher les jobs (sélecteurs LinkedIn)
-                        job_cards = soup.select('.job-card-container, .result-card')[:5]
-                        
-                        for card in job_cards:
-                            try:
-                                titre_elem = card.select_one('.job-card-list__title, .result-card__title')
-                                titre = titre_elem.get_text(strip=True) if titre_elem else f"Stage {secteur}"
-                                
-                                entreprise_elem = card.select_one('.job-card-container__company-name, .result-card__subtitle')
-                                entreprise = entreprise_elem.get_text(strip=True) if entreprise_elem else "Entreprise"
-                                
-                                lieu_elem = card.select_one('.job-card-container__metadata-item, .job-result-card__location')
-                                lieu = lieu_elem.get_text(strip=True) if lieu_elem else ville
-                                
-                                # Construire lien LinkedIn
-                                lien = url  # Par défaut
-                                link_elem = card.select_one('a[href*="/jobs/view/"]')
-                                if link_elem and 'href' in link_elem.attrs:
-                                    lien = f"https://www.linkedin.com{link_elem['href']}"
-                                
-                                offres.append({
-                                    'titre': titre,
-                                    'entreprise': entreprise,
-                                    'lieu': lieu,
-                                    'date_publication': 'Récente',
-                                    'lien': lien,
-                                    'source': 'LinkedIn',
-                                    'type': 'Stage',
-                                    'secteur': secteur,
-                                    'valide': True
-                                })
-                                
-                            except:
-                                continue
-                                
+                        offres.extend(self._parse_linkedin(response.content, url, secteur, ville))
+
                 except:
                     continue
-            
+
             return offres
-            
+
         except Exception as e:
-            st.warning(f"⚠️ Erreur LinkedIn: {e}")
+            events.emit(events.WARNING, f"⚠️ Erreur LinkedIn: {e}", source='LinkedIn', erreur=e)
             return []
-    
-    def search_all_real_offers(self, secteur: str, ville: str = "Casablanca") -> List[Dict]:
-        """Recherche sur TOUTES les plateformes réelles"""
-        st.info(f"🔍 Recherche d'offres RÉELLES: {secteur} à {ville}")
-        
-        all_offres = []
-        
-        # 1. Rekrute.com (Maroc)
-        try:
-            offres_rekrute = self.search_rekrute_real(secteur, ville)
-            if offres_rekrute:
-                st.success(f"✅ {len(offres_rekrute)} offres sur Rekrute.com")
-                all_offres.extend(offres_rekrute)
-        except Exception as e:
-            st.warning(f"⚠️ Rekrute.com inaccessible: {e}")
-        
-        # 2. Emploi.ma (Maroc)
-        try:
-            offres_emploi = self.search_emploi_ma_real(secteur)
-            if offres_emploi:
-                st.success(f"✅ {len(offres_emploi)} offres sur Emploi.ma")
-                all_offres.extend(offres_emploi)
-        except Exception as e:
-            st.warning(f"⚠️ Emploi.ma inaccessible: {e}")
-        
-        # 3. MarocAnnonces
+
+    # ------------------------------------------------------------------
+    # Recherche simultanée sur toutes les plateformes
+    # ------------------------------------------------------------------
+
+    def _build_jobs(self, secteur: str, ville: str) -> List[Tuple[str, str, Callable]]:
+        """Liste (plateforme, URL, parser) de toutes les requêtes d'une recherche"""
+        jobs = []
+
+        for keyword, url in self._rekrute_urls(secteur, ville):
+            jobs.append(('Rekrute.com', url, lambda c, u: self._parse_rekrute(c, u, secteur, ville)))
+
+        jobs.append(('Emploi.ma', self._emploi_ma_url(secteur),
+                     lambda c, u: self._parse_emploi_ma(c, u, secteur)))
+        jobs.append(('MarocAnnonces', self._marocannonces_url(secteur),
+                     lambda c, u: self._parse_marocannonces(c, u, secteur)))
+
+        # LinkedIn est lancé en même temps, mais n'est retenu que si
+        # les portails marocains ne suffisent pas (voir search_all_real_offers)
+        for url in self._linkedin_urls(secteur, ville):
+            jobs.append(('LinkedIn', url, lambda c, u: self._parse_linkedin(c, u, secteur, ville)))
+
+        return jobs
+
+    def _fetch_and_parse(self, url: str, parser: Callable, portail: str = '') -> List[Dict]:
+        """Télécharge une page et l'analyse (exécuté dans un thread)"""
+        response = self.session.get(url, timeout=REQUEST_TIMEOUT)
+        if response.status_code != 200:
+            metrics.inc('portal_http_errors', portail=portail, status=response.status_code)
+            return []
+        with metrics.timer('parse', portail=portail):
+            offres = with_offer_ids(parser(response.content, url))
+        metrics.inc('parsed_offres', len(offres), portail=portail)
+        return offres
+
+    def iter_portal_results(self, secteur: str, ville: str = "Casablanca",
+                            deadline: Optional[float] = None,
+                            portails: Optional[List[str]] = None) -> Iterator[Tuple[str, Dict]]:
+        """
+        Envoie toutes les requêtes (plateformes × mots-clés) en parallèle et produit
+        (plateforme, résultat) dès que toutes les requêtes d'une plateforme sont terminées.
+        Résultat, dans l'ordre des requêtes: {'offres': [[...], ...], 'erreurs': [...], 'timeouts': int}
+        Les requêtes non terminées avant `deadline` secondes sont abandonnées.
+        `portails` limite la recherche à certaines plateformes.
+        """
+        deadline = settings.SEARCH_DEADLINE if deadline is None else deadline
+        jobs = [job for job in self._build_jobs(secteur, ville) if portails is None or job[0] in portails]
+        if not jobs:
+            return
+        restantes = Counter(portail for portail, _, _ in jobs)
+
+        start = time.perf_counter()
+        futures = [self.http.submit(url, self._fetch_and_parse, url, parser, portail) for portail, url, parser in jobs]
         try:
-            offres_annonces = self.search_marocannonces(secteur)
-            if offres_annonces:
-                st.success(f"✅ {len(offres_annonces)} offres sur MarocAnnonces")
-                all_offres.extend(offres_annonces)
-        except Exception as e:
-            st.warning(f"⚠️ MarocAnnonces inaccessible: {e}")
-        
-        # 4. LinkedIn (alternative)
-        if len(all_offres) < 5:  # Si pas assez d'offres
+            portail_of = {future: portail for (portail, _, _), future in zip(jobs, futures)}
+
             try:
-                offres_linkedin = self.search_linkedin_api(secteur, ville)
-                if offres_linkedin:
-                    st.success(f"✅ {len(offres_linkedin)} offres sur LinkedIn")
-                    all_offres.extend(offres_linkedin)
-            except Exception as e:
-                st.warning(f"⚠️ LinkedIn inaccessible: {e}")
-        
-        # Supprimer les doublons
-        unique_offres = []
-        seen = set()
-        
-        for offre in all_offres:
-            key = (offre['titre'][:50], offre['entreprise'][:30])
-            if key not in seen:
-                seen.add(key)
-                unique_offres.append(offre)
-        
+                for future in as_completed(futures, timeout=deadline):
+                    events.flush()
+                    portail = portail_of[future]
+                    restantes[portail] -= 1
+                    if not restantes[portail]:
+                        # Temps jusqu'à la dernière réponse de la plateforme (budget consommé)
+                        metrics.observe('portal', time.perf_counter() - start, portail=portail)
+                        yield portail, self._portal_result(portail, portail_of)
+            except FuturesTimeout:
+                events.flush()
+
+            # Plateformes incomplètes à l'échéance: résultats partiels
+            for portail, nb in restantes.items():
+                if nb:
+                    metrics.observe('portal', time.perf_counter() - start, portail=portail)
+                    metrics.inc('portal_timeouts', nb, portail=portail)
+                    yield portail, self._portal_result(portail, portail_of)
+        finally:
+            # Ne pas attendre les requêtes trop lentes
+            for future in futures:
+                future.cancel()
+
+    def _portal_result(self, portail: str, portail_of: Dict[Future, str]) -> Dict:
+        result = {'offres': [], 'erreurs': [], 'timeouts': 0}
+        for future, nom in portail_of.items():
+            if nom != portail:
+                continue
+            if not future.done() or future.cancelled():
+                result['timeouts'] += 1
+            elif future.exception() is not None:
+                result['erreurs'].append(future.exception())
+            else:
+                result['offres'].append(future.result())
+        return result
+
+    def fetch_portal(self, portail: str, secteur: str, ville: str = "Casablanca",
+                     deadline: Optional[float] = None) -> List[Dict]:
+        """
+        Offres d'une seule plateforme (ses requêtes en parallèle).
+        Lève la première erreur si aucune requête n'a abouti.
+        """
+        for _, resultat in self.iter_portal_results(secteur, ville, deadline, portails=[portail]):
+            if not resultat['offres'] and resultat['erreurs']:
+                raise resultat['erreurs'][0]
+            return [offre for page in resultat['offres'] for offre in page]
+        return []
+
+    def fetch_all_portals(self, secteur: str, ville: str = "Casablanca",
+                          deadline: Optional[float] = None) -> Dict[str, Dict]:
+        """Résultats de toutes les plateformes (voir iter_portal_results), une fois la recherche terminée"""
+        return dict(self.iter_portal_results(secteur, ville, deadline))
+
+    PORTAILS = ['Rekrute.com', 'Emploi.ma', 'MarocAnnonces', 'LinkedIn']
+
+    def merge_portal_results(self, resultats: Dict[str, Dict]) -> Tuple[List[Dict], Dict[str, int]]:
+        """
+        Fusionne les résultats de fetch_all_portals: ordre des plateformes,
+        limites par plateforme, LinkedIn en secours, dédoublonnage et tri par validité.
+        Les plateformes absentes (recherche en cours) sont ignorées.
+        Retourne (offres, nombre d'offres retenues par plateforme).
+        """
+        all_offres = []
+        retenues = {}
+
+        for portail in self.PORTAILS:
+            # 4. LinkedIn (alternative) - Si pas assez d'offres
+            if portail == 'LinkedIn' and len(all_offres) >= 5:
+                break
+            if portail not in resultats:
+                continue
+
+            offres = [offre for page in resultats[portail]['offres'] for offre in page]
+            if portail == 'Rekrute.com':
+                offres = offres[:15]  # Limiter à 15 offres
+
+            retenues[portail] = len(offres)
+            all_offres.extend(offres)
+
+        # Supprimer les doublons (y compris republications sur plusieurs portails)
+        unique_offres = dedupe_offres(all_offres)
+
         # Trier par validité (liens valides d'abord)
         valid_offres = [o for o in unique_offres if o.get('valide', False)]
         other_offres = [o for o in unique_offres if not o.get('valide', False)]
-        
-        return valid_offres + other_offres[:20]  # 20 offres max
-    
+
+        return valid_offres + other_offres[:20], retenues  # 20 offres max
+
+    @metrics.timed('real_offers')
+    def search_all_real_offers(self, secteur: str, ville: str = "Casablanca") -> List[Dict]:
+        """Recherche sur TOUTES les plateformes réelles"""
+        events.emit(events.INFO, f"🔍 Recherche d'offres RÉELLES: {secteur} à {ville}")
+
+        for keyword, _ in self._rekrute_urls(secteur, ville):
+            events.emit(events.PROGRESS, f"🔍 Recherche Rekrute.com: {keyword} à {ville}", source='Rekrute.com')
+        events.emit(events.PROGRESS, f"🔍 Recherche Emploi.ma: {secteur}", source='Emploi.ma')
+        events.emit(events.PROGRESS, f"🔍 Recherche MarocAnnonces: {secteur}", source='MarocAnnonces')
+
+        resultats = self.fetch_all_portals(secteur, ville)
+        offres, retenues = self.merge_portal_results(resultats)
+
+        for portail in self.PORTAILS:
+            if portail not in retenues:
+                continue
+
+            for erreur in resultats[portail]['erreurs']:
+                if portail != 'LinkedIn':
+                    events.emit(events.WARNING, f"⚠️ Erreur {portail}: {str(erreur)[:50]}",
+                                source=portail, erreur=erreur)
+            if resultats[portail]['timeouts']:
+                events.emit(events.WARNING, f"⏱️ {portail}: délai dépassé, résultats partiels",
+                            source=portail, timeouts=resultats[portail]['timeouts'])
+
+            if retenues[portail]:
+                events.emit(events.SUCCESS, f"✅ {retenues[portail]} offres sur {portail}",
+                            source=portail, nb_offres=retenues[portail])
+
+        return offres
+
     def verify_offer_link(self, url: str) -> bool:
-        """Vérifie si un lien d'offre est accessible"""
-        try:
-            if not url or url == "Non disponible":
-                return False
-            
-            # Vérifier que c'est une URL valide
-            if not url.startswith('http'):
-                return False
-            
-            # Essayer d'accéder à la page
-            response = self.session.head(url, timeout=10, allow_redirects=True)
-            
-            # Codes HTTP acceptables: 200, 301, 302
-            return response.status_code in [200, 301, 302]
-            
-        except:
-            return False
\ No newline at end of file
+        """Vérifie si un lien d'offre est accessible (voir LinkValidator)"""
+        if not url or url == "Non disponible":
+            return False
+        return bool(self.link_validator.check(url))
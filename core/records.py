@@ -0,0 +1,129 @@
+"""
+Enregistrements compacts pour les offres, entreprises et contacts.
+
+Les offres lues en volume depuis le stock du crawler (OfferStore.iter_records,
+exports) sont des objets à `__slots__` plutôt que des dictionnaires: pas de
+table de hachage par offre, et les valeurs très répétées (source, type,
+secteur, ville...) sont internées, donc partagées entre les offres.
+L'interface Streamlit continue de manipuler des dictionnaires: `to_dict` /
+`from_dict` font la conversion à la frontière. Company et Contact ne servent
+pour l'instant qu'à mesurer l'empreinte mémoire (benchmarks/bench_memory.py).
+"""
+import sys
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from core.dedup import has_own_link
+from core.ids import company_id, offer_id
+
+
+def _shared(value: Optional[str]) -> Optional[str]:
+    """Chaîne internée (une seule copie en mémoire pour toutes les offres)"""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+@dataclass(slots=True)
+class Contact:
+    nom: str
+    email: Optional[str] = None
+    telephone: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Contact':
+        return cls(_shared(data.get('nom', '')), data.get('email'), data.get('telephone'))
+
+    def to_dict(self) -> Dict:
+        """Mêmes clés que les contacts de data/entreprises_maroc.json (champs absents omis)"""
+        data = {'nom': self.nom}
+        if self.email is not None:
+            data['email'] = self.email
+        if self.telephone is not None:
+            data['telephone'] = self.telephone
+        return data
+
+
+@dataclass(slots=True)
+class Company:
+    nom: str
+    ville: str = ''
+    site_web: str = ''
+    specialite: Optional[str] = None
+    type: Optional[str] = None
+    offres_stage: bool = False
+    contacts: Tuple[Contact, ...] = ()
+    id: str = ''
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Company':
+        return cls(
+            nom=data.get('nom', ''),
+            ville=_shared(data.get('ville', '')),
+            site_web=data.get('site_web', ''),
+            specialite=data.get('specialite'),
+            type=_shared(data.get('type')),
+            offres_stage=bool(data.get('offres_stage', False)),
+            contacts=tuple(Contact.from_dict(contact) for contact in data.get('contacts', ())),
+            id=company_id(data)
+        )
+
+    def to_dict(self) -> Dict:
+        data = {
+            'id': self.id,
+            'nom': self.nom,
+            'ville': self.ville,
+            'site_web': self.site_web,
+            'offres_stage': self.offres_stage,
+            'contacts': [contact.to_dict() for contact in self.contacts]
+        }
+        if self.specialite is not None:
+            data['specialite'] = self.specialite
+        if self.type is not None:
+            data['type'] = self.type
+        return data
+
+
+@dataclass(slots=True)
+class Offer:
+    titre: str
+    entreprise: str
+    lieu: Optional[str] = None
+    date_publication: Optional[str] = None
+    lien: Optional[str] = None
+    source: Optional[str] = None
+    type: Optional[str] = None
+    secteur: Optional[str] = None
+    lien_propre: bool = False
+    valide: bool = False
+    id: str = ''
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Offer':
+        return cls(
+            titre=data.get('titre', ''),
+            entreprise=_shared(data.get('entreprise', '')),
+            lieu=_shared(data.get('lieu')),
+            date_publication=_shared(data.get('date_publication')),
+            lien=data.get('lien'),
+            source=_shared(data.get('source')),
+            type=_shared(data.get('type')),
+            secteur=_shared(data.get('secteur')),
+            lien_propre=has_own_link(data),
+            valide=bool(data.get('valide', False)),
+            id=offer_id(data)
+        )
+
+    def to_dict(self) -> Dict:
+        """Dictionnaire au format des scrapers (affichage Streamlit, dédoublonnage...)"""
+        return {
+            'titre': self.titre,
+            'entreprise': self.entreprise,
+            'lieu': self.lieu,
+            'date_publication': self.date_publication,
+            'lien': self.lien,
+            'source': self.source,
+            'type': self.type,
+            'secteur': self.secteur,
+            'lien_propre': self.lien_propre,
+            'valide': self.valide,
+            'id': self.id
+        }
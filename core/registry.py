@@ -0,0 +1,61 @@
+import threading
+import time
+from typing import Dict
+
+from core.entreprises_maroc import EntreprisesMaroc
+from core.favorites_store import FavoritesStore
+from core.http_cache import build_session
+from core.http_client import HttpClient
+from core.letter_generator import LetterGenerator
+from core.link_validator import LinkValidator
+from core.maroc_search import MarocSearchEngine
+from core.offer_store import OfferStore
+from core.real_offers import RealOffersFinder
+from core.stage_finder import StageFinder
+
+
+class EngineRegistry:
+    """Moteurs partagés par toutes les sessions du processus (une seule construction)"""
+
+    def __init__(self):
+        self.build_times: Dict[str, float] = {}
+        start = time.perf_counter()
+
+        # Un seul client HTTP (cache + pool keep-alive) pour tous les scrapers
+        self.http_session = self._timed('http_session', build_session)
+        self.http_client = self._timed('http_client', lambda: HttpClient(session=self.http_session))
+        self.offer_store = self._timed('offer_store', OfferStore)
+        self.favorites = self._timed('favorites', FavoritesStore)
+        self.entreprises_db = self._timed('entreprises_db', EntreprisesMaroc)
+        self.letter_generator = self._timed('letter_generator', LetterGenerator)
+        self.link_validator = self._timed('link_validator', lambda: LinkValidator(store=self.offer_store))
+        self.real_finder = self._timed('real_finder', lambda: RealOffersFinder(
+            session=self.http_session, link_validator=self.link_validator, http_client=self.http_client
+        ))
+        self.stage_finder = self._timed('stage_finder', lambda: StageFinder(
+            session=self.http_session, real_finder=self.real_finder, offer_store=self.offer_store
+        ))
+        self.engine = self._timed('engine', lambda: MarocSearchEngine(
+            entreprises_db=self.entreprises_db, stage_finder=self.stage_finder
+        ))
+
+        self.build_times['total'] = time.perf_counter() - start
+
+    def _timed(self, name: str, factory):
+        start = time.perf_counter()
+        instance = factory()
+        self.build_times[name] = time.perf_counter() - start
+        return instance
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> EngineRegistry:
+    """Retourne le registre du processus, construit au premier appel"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = EngineRegistry()
+        return _registry
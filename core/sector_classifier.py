@@ -0,0 +1,72 @@
+"""
+Classification d'un texte (libellé de secteur, titre d'offre) dans un secteur.
+
+Une seule taxonomie pour toute l'application. Les mots-clés sont comparés
+sans accents ni majuscules, en mots entiers ("it" ne correspond pas à
+"qualité"), au pluriel près. Toute la taxonomie est compilée en une seule
+expression régulière: un seul parcours du texte quel que soit le nombre de
+secteurs, et les résultats sont mémorisés.
+"""
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
+
+from utils.text import fold
+
+# Clés = secteurs de data/entreprises_maroc.json (plus les secteurs sans entreprises
+# référencées). En cas d'ambiguïté, le premier secteur de la liste l'emporte.
+TAXONOMY: Dict[str, List[str]] = {
+    'informatique': ['informatique', 'informaticien', 'it', 'développement', 'développeur',
+                     'programmation', 'programmeur', 'software', 'logiciel', 'technologie',
+                     'data', 'devops', 'cloud', 'cybersécurité'],
+    'telecom': ['telecom', 'télécom', 'télécommunication', 'réseau', 'téléphonie'],
+    'banque_finance': ['banque', 'bancaire', 'finance', 'financier', 'financière', 'assurance',
+                       'fintech', 'comptabilité', 'audit'],
+    'industrie': ['industrie', 'industriel', 'industrielle', 'manufacturing', 'production', 'usine'],
+    'energie': ['énergie', 'électricité', 'pétrole', 'gaz', 'renouvelable'],
+    'sante': ['santé', 'médical', 'médicale', 'pharmacie', 'pharmaceutique', 'hospitalier'],
+    'logistique': ['logistique', 'transport', 'supply chain', 'distribution'],
+    'marketing': ['marketing', 'communication', 'digital'],
+    'commerce': ['commerce', 'commercial', 'commerciale', 'vente'],
+    'tourisme': ['tourisme', 'hôtellerie', 'hôtel'],
+    'agriculture': ['agriculture', 'agroalimentaire', 'agronomie'],
+    'btp': ['btp', 'construction', 'génie civil', 'bâtiment']
+}
+
+CACHE_SIZE = 4096
+
+
+def _keyword_pattern(keyword: str) -> str:
+    """Mot-clé sans accents, espaces souples, pluriel (s/x) facultatif"""
+    return r'\s+'.join(re.escape(word) for word in fold(keyword).split()) + '(?:s|x)?'
+
+
+class SectorClassifier:
+    """Classifieur construit une fois à partir de la taxonomie"""
+
+    def __init__(self, taxonomy: Optional[Dict[str, List[str]]] = None):
+        self.taxonomy = taxonomy or TAXONOMY
+        self.sectors = list(self.taxonomy)
+
+        groups = []
+        for i, keywords in enumerate(self.taxonomy.values()):
+            # Les plus longs d'abord: "télécommunication" avant "télécom"
+            alternatives = sorted({_keyword_pattern(kw) for kw in keywords}, key=len, reverse=True)
+            groups.append(f"(?P<s{i}>{'|'.join(alternatives)})")
+        self._pattern = re.compile(r'\b(?:' + '|'.join(groups) + r')\b')
+
+        self.classify = lru_cache(maxsize=CACHE_SIZE)(self._classify)
+
+    def _classify(self, text: str) -> Optional[str]:
+        """Secteur du texte (None si aucun mot-clé)"""
+        found = {match.lastgroup for match in self._pattern.finditer(fold(text or ''))}
+        if not found:
+            return None
+        return self.sectors[min(int(group[1:]) for group in found)]
+
+    def classify_many(self, texts: Iterable[str]) -> List[Optional[str]]:
+        """Secteurs d'une liste de textes (titres d'offres...), dans l'ordre"""
+        return [self.classify(text) for text in texts]
+
+
+classifier = SectorClassifier()
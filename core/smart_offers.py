@@ -1,6 +1,11 @@
-import streamlit as st
 from datetime import datetime
 import random
+from core import events
+from core.ids import with_offer_ids
+from core.sector_classifier import classifier
+
+# Type des offres générées: pistes de candidature, pas des annonces publiées
+SUGGESTION = 'Suggestion'
 
 class SmartOfferGenerator:
     """Générateur d'offres intelligentes avec vrais sites"""
@@ -54,7 +59,7 @@ class SmartOfferGenerator:
                     'source': 'Site officiel'
                 }
             ],
-            'finance': [
+            'banque_finance': [
                 {
                     'titre': 'Stage PFE Finance',
                     'entreprise': 'Attijariwafa Bank',
@@ -114,11 +119,7 @@ class SmartOfferGenerator:
         all_offres = []
         
         # Ajouter offres par secteur
-        secteur_lower = secteur.lower()
-        for key, offres in real_careers.items():
-            if key in secteur_lower:
-                all_offres.extend(offres)
-                break
+        all_offres.extend(real_careers.get(classifier.classify(secteur), []))
         
         # Toujours ajouter les plateformes
         all_offres.extend(real_platforms)
@@ -129,28 +130,45 @@ class SmartOfferGenerator:
             offre['type'] = 'Stage'
             offre['secteur'] = secteur
         
-        return all_offres
+        return with_offer_ids(all_offres)
     
     def search_realistic_offers(self, secteur: str, ville: str = None) -> list:
         """Recherche réaliste avec vrais sites"""
         
-        st.info(f"🔍 Recherche d'offres sur les sites officiels...")
+        events.emit(events.INFO, "🔍 Recherche d'offres sur les sites officiels...", source='Sites officiels')
+        
+        return self.generate_offers(secteur, ville)
+    
+    def generate_offers(self, secteur: str, ville: str = None) -> list:
+        """
+        Offres des sites officiels et offres réalistes, sans affichage.
+        Ce ne sont pas des annonces publiées: type SUGGESTION, lien non validé.
+        Même recherche, mêmes suggestions (tirage initialisé par secteur et ville).
+        """
+        rng = random.Random(f"{secteur}|{ville or ''}")
         
         # 1. Offres d'entreprises
         company_offers = self.get_real_company_offers(secteur)
         
         # 2. Ajouter des offres génériques mais réalistes
-        generic_offers = self._generate_realistic_offers(secteur, ville)
+        generic_offers = self._generate_realistic_offers(secteur, ville, rng)
         
         all_offers = company_offers + generic_offers
         
         # Mélanger
-        random.shuffle(all_offers)
+        rng.shuffle(all_offers)
+        
+        for offre in all_offers:
+            offre['type'] = SUGGESTION
+            offre['source'] = f"{SUGGESTION} ({offre['source']})"
+            offre['valide'] = False
         
-        return all_offers[:15]
+        return with_offer_ids(all_offers[:15])
     
-    def _generate_realistic_offers(self, secteur: str, ville: str = None) -> list:
+    def _generate_realistic_offers(self, secteur: str, ville: str = None,
+                                   rng: random.Random = None) -> list:
         """Génère des offres réalistes"""
+        rng = rng or random.Random()
         
         entreprises = [
             'Capgemini', 'Atos', 'IBM', 'Microsoft', 'Oracle',
@@ -172,11 +190,11 @@ class SmartOfferGenerator:
         ]
         
         for i in range(8):  # 8 offres génériques
-            entreprise = random.choice(entreprises)
-            ville_offre = ville if ville else random.choice(villes)
+            entreprise = rng.choice(entreprises)
+            ville_offre = ville if ville else rng.choice(villes)
             
             offre = {
-                'titre': random.choice(templates).format(secteur=secteur),
+                'titre': rng.choice(templates).format(secteur=secteur),
                 'entreprise': f"{entreprise} Maroc",
                 'lieu': ville_offre,
                 'date_publication': '2024',
@@ -1,22 +1,67 @@
 import requests
-from bs4 import BeautifulSoup
-from typing import List, Dict, Optional
-import streamlit as st
+from typing import Callable, Iterator, List, Dict, Optional, Tuple
 import re
+import threading
 from datetime import datetime
+from core import events
 from core.real_offers import RealOffersFinder  # IMPORT NOUVEAU
+from core.backup_api import BackupAPIs
+from core.http_cache import build_session
+from core.ids import with_offer_ids
+from core.offer_store import OfferStore
+from core.orchestrator import SourceOrchestrator, SourceProvider
+from core.smart_offers import SUGGESTION, SmartOfferGenerator
+from core.parsers import make_soup
 
 class StageFinder:
     """Recherche d'offres de stage PFE au Maroc - VERSION RÉELLE"""
     
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-            'Accept-Language': 'fr, ar-MA;q=0.9, ar;q=0.8',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8'
-        })
-        self.real_finder = RealOffersFinder()  # NOUVEAU
+    def __init__(self, session: Optional[requests.Session] = None,
+                 real_finder: Optional[RealOffersFinder] = None,
+                 offer_store: Optional[OfferStore] = None,
+                 backup_apis: Optional[BackupAPIs] = None,
+                 smart_offers: Optional[SmartOfferGenerator] = None,
+                 orchestrator: Optional[SourceOrchestrator] = None,
+                 deadline: Optional[float] = None):
+        # Session et scrapers: ceux fournis (registre), sinon construits au premier usage
+        self._session = session
+        self._real_finder = real_finder
+        self._backup_apis = backup_apis
+        self._lock = threading.RLock()
+        self.offer_store = offer_store or OfferStore()
+        self.smart_offers = smart_offers or SmartOfferGenerator()
+        # Traitements sans interface: délai (s) de chaque source réseau et de la recherche,
+        # au lieu des budgets de l'interface
+        self.deadline = deadline
+        self.orchestrator = orchestrator or SourceOrchestrator(self._default_providers(), deadline=deadline)
+    
+    def _lazy(self, attr: str, factory: Callable):
+        """Instance fournie au constructeur, sinon construite une fois au premier usage"""
+        value = getattr(self, attr)
+        if value is None:
+            with self._lock:
+                value = getattr(self, attr)
+                if value is None:
+                    value = factory()
+                    setattr(self, attr, value)
+        return value
+    
+    def _build_session(self) -> requests.Session:
+        session = build_session()
+        session.headers.update({'Accept-Language': 'fr, ar-MA;q=0.9, ar;q=0.8'})
+        return session
+    
+    @property
+    def session(self) -> requests.Session:
+        return self._lazy('_session', self._build_session)
+    
+    @property
+    def real_finder(self) -> RealOffersFinder:
+        return self._lazy('_real_finder', lambda: RealOffersFinder(session=self.session))
+    
+    @property
+    def backup_apis(self) -> BackupAPIs:
+        return self._lazy('_backup_apis', lambda: BackupAPIs(session=self.session))
     
     def search_rekrute(self, secteur: str, ville: str = "Casablanca") -> List[Dict]:
         """Recherche sur Rekrute.com - Version améliorée"""
@@ -56,7 +101,7 @@ class StageFinder:
                     try:
                         response = self.session.get(url, timeout=10)
                         if response.status_code == 200:
-                            soup = BeautifulSoup(response.content, 'html.parser')
+                            soup = make_soup(response.content)
                             
                             # Chercher des offres de stage
                             stage_keywords = ['stage', 'stagiare', 'pfe', 'intern', 'alternance']
@@ -78,7 +123,7 @@ class StageFinder:
                                     offres.append(offre)
                     
                     except Exception as e:
-                        # Si scraping échoue, créer une offre générique mais avec vrai lien
+                        # Si scraping échoue, créer une offre générique pointant vers la page carrières
                         offres.append({
                             'titre': f"Stage PFE {secteur}",
                             'entreprise': entreprise_nom,
@@ -87,45 +132,83 @@ class StageFinder:
                             'lien': url,
                             'source': f'Site {entreprise_nom}',
                             'type': 'Stage',
-                            'valide': True
+                            'lien_propre': False,
+                            'valide': False
                         })
                     
                     break
             
-            return offres
+            return with_offer_ids(offres)
             
         except Exception as e:
-            st.warning(f"⚠️ Erreur recherche entreprise directe: {e}")
+            events.emit(events.WARNING, f"⚠️ Erreur recherche entreprise directe: {e}",
+                        source=f'Site {entreprise_nom}', erreur=e)
             return []
     
+    SOURCE_STOCK = 'Offres enregistrées'
+    GRANDES_ENTREPRISES = ['Capgemini', 'Atos', 'OCP']
+
+    def _default_providers(self) -> List[SourceProvider]:
+        """Sources d'offres: coût (palier), budget de latence (s), quota journalier"""
+        def budget(secondes: float) -> float:
+            return self.deadline or secondes
+
+        def portail(nom: str, secondes: float):
+            return lambda secteur, ville: self.real_finder.fetch_portal(nom, secteur, ville or "Casablanca",
+                                                                        deadline=budget(secondes))
+
+        def site(entreprise: str):
+            return lambda secteur, ville: self.search_entreprises_direct(entreprise, secteur)
+
+        return [
+            # Offres déjà collectées par le crawler
+            SourceProvider(self.SOURCE_STOCK, lambda secteur, ville: self.offer_store.get_offres(
+                secteur, ville or "Casablanca"), cost=0, latency_budget=0),
+            # Portails marocains
+            SourceProvider('Rekrute.com', portail('Rekrute.com', 6), cost=1, latency_budget=budget(6), max_offres=15),
+            SourceProvider('Emploi.ma', portail('Emploi.ma', 6), cost=1, latency_budget=budget(6)),
+            SourceProvider('MarocAnnonces', portail('MarocAnnonces', 6), cost=1, latency_budget=budget(6)),
+            # Si pas assez d'offres: LinkedIn et sites carrières des grandes entreprises
+            SourceProvider('LinkedIn', portail('LinkedIn', 4), cost=2, latency_budget=budget(4)),
+            *[SourceProvider(f'Site {entreprise}', site(entreprise), cost=2, latency_budget=budget(4))
+              for entreprise in self.GRANDES_ENTREPRISES],
+            # APIs de secours (quotas gratuits limités)
+            SourceProvider('Adzuna', lambda secteur, ville: self.backup_apis.search_adzuna(secteur),
+                           cost=3, latency_budget=budget(4), quota_per_day=100),
+            SourceProvider('Reed.co.uk', lambda secteur, ville: self.backup_apis.search_reed_co_uk(secteur),
+                           cost=3, latency_budget=budget(4), quota_per_day=50),
+            # Dernier recours, sans réseau: suggestions (type SUGGESTION), pas des annonces
+            SourceProvider('Sites officiels', self.smart_offers.generate_offers, cost=4, latency_budget=0)
+        ]
+
+    def _annotate(self, offres: List[Dict]) -> List[Dict]:
+        """État des liens déjà vérifiés; les suggestions restent non validées"""
+        self.real_finder.link_validator.annotate([offre for offre in offres if offre.get('type') != SUGGESTION])
+        return offres
+
     def search_all_platforms(self, secteur: str, ville: str = None) -> List[Dict]:
         """Recherche sur toutes les plateformes - Version RÉELLE"""
-        all_offres = []
-        
-        # Utiliser le finder réel
-        offres_reelles = self.real_finder.search_all_real_offers(secteur, ville or "Casablanca")
-        all_offres.extend(offres_reelles)
+        events.emit(events.INFO, f"🔍 Recherche d'offres RÉELLES: {secteur} à {ville or 'Casablanca'}")
         
-        # Si peu d'offres, ajouter des offres d'entreprises directes
-        if len(all_offres) < 5:
-            # Chercher pour grandes entreprises marocaines
-            grandes_entreprises = ['Capgemini', 'Atos', 'OCP', 'Maroc Telecom', 'Orange Maroc']
-            for entreprise in grandes_entreprises[:3]:
-                offres_entreprise = self.search_entreprises_direct(entreprise, secteur)
-                all_offres.extend(offres_entreprise)
+        offres = []
+        for rapport, offres, _ in self.orchestrator.iter_search(secteur, ville):
+            if rapport['erreur'] is not None:
+                events.emit(events.WARNING, f"⚠️ Erreur {rapport['source']}: {str(rapport['erreur'])[:50]}",
+                            source=rapport['source'], erreur=rapport['erreur'])
+            elif rapport['timeout']:
+                events.emit(events.WARNING, f"⏱️ {rapport['source']}: délai dépassé", source=rapport['source'])
+            elif rapport['nb_offres']:
+                events.emit(events.SUCCESS, f"✅ {rapport['nb_offres']} offres sur {rapport['source']}",
+                            source=rapport['source'], nb_offres=rapport['nb_offres'])
         
-        # Supprimer les doublons
-        unique_offres = []
-        seen_titles = set()
-        
-        for offre in all_offres:
-            key = (offre['titre'][:50], offre['entreprise'][:30])
-            if key not in seen_titles:
-                seen_titles.add(key)
-                unique_offres.append(offre)
-        
-        # Vérifier les liens (optionnel - peut ralentir)
-        # for offre in unique_offres:
-        #     offre['valide'] = self.real_finder.verify_offer_link(offre['lien'])
-        
-        return unique_offres[:25]  # Limiter à 25 offres
\ No newline at end of file
+        # État des liens déjà vérifiés; les autres sont vérifiés en arrière-plan
+        return self._annotate(offres)
+
+    def iter_all_platforms(self, secteur: str, ville: str = None) -> Iterator[Tuple[str, List[Dict], float]]:
+        """
+        Version progressive de search_all_platforms, sans affichage: produit
+        (source terminée, offres consolidées jusqu'ici, avancement entre 0 et 1)
+        dès que chaque source répond. Le dernier élément produit est le résultat final.
+        """
+        for rapport, offres, avancement in self.orchestrator.iter_search(secteur, ville):
+            yield rapport['source'], self._annotate(offres), avancement
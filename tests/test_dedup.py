@@ -0,0 +1,74 @@
+from core.dedup import OfferDeduplicator, canonical_url, dedupe_offres, normalize_company, normalize_title
+
+
+def offre(titre, entreprise='Capgemini', lien=None, lien_propre=None):
+    data = {'titre': titre, 'entreprise': entreprise, 'lien': lien}
+    if lien_propre is not None:
+        data['lien_propre'] = data['valide'] = lien_propre
+    return data
+
+
+def titres(offres):
+    return [o['titre'] for o in offres]
+
+
+def test_canonical_url_drops_tracking_host_prefix_and_fragment():
+    assert canonical_url('http://www.Rekrute.com:443/offre/123/?utm_source=x&b=2&a=1#top') == \
+        'https://rekrute.com/offre/123?a=1&b=2'
+    assert canonical_url('https://m.linkedin.com:8080/jobs/view/1?trk=abc&refId=z') == \
+        'https://linkedin.com:8080/jobs/view/1'
+    assert canonical_url('https://emploi.ma/') == 'https://emploi.ma/'
+
+
+def test_canonical_url_rejects_non_http_links():
+    assert canonical_url(None) == ''
+    assert canonical_url('') == ''
+    assert canonical_url('mailto:rh@ocp.ma') == ''
+
+
+def test_normalisation_of_titles_and_companies():
+    assert normalize_title("Stage PFE - Développeur (H/F)") == 'stage pfe developpeur'
+    assert normalize_company("Capgemini Maroc SA") == 'capgemini'
+    assert normalize_company("SA") == 'sa'
+
+
+def test_same_normalized_title_and_company_is_a_duplicate():
+    offres = [offre("Stage PFE Développeur Java"), offre("Stage PFE Developpeur Java (H/F)", 'Capgemini Maroc'),
+              offre("Stage PFE Développeur Java", 'Atos')]
+    assert [o['entreprise'] for o in dedupe_offres(offres)] == ['Capgemini', 'Atos']
+
+
+def test_similarity_threshold():
+    proches = [offre("Stage Développeur Java Spring"), offre("Stage Développeur Java Spring Boot")]
+    assert titres(dedupe_offres(proches)) == ["Stage Développeur Java Spring"]
+
+    # Jaccard 0.79: sous le seuil par défaut (0.8), au-dessus de 0.75
+    distincts = [offre("Stage PFE Développeur Java"), offre("Stage PFE Développeur Java Junior")]
+    assert len(dedupe_offres(distincts)) == 2
+    assert len(dedupe_offres(distincts, threshold=0.75)) == 1
+
+
+def test_same_own_link_merges_close_titles():
+    lien = 'https://www.rekrute.com/offre-emploi-stage-123.html'
+    offres = [offre("Stage PFE Développeur Java", lien=lien, lien_propre=True),
+              offre("Stage PFE Développeur Python", lien=lien + '?utm_campaign=x', lien_propre=True)]
+    assert titres(dedupe_offres(offres)) == ["Stage PFE Développeur Java"]
+
+    # Titres trop éloignés (Jaccard < URL_SIMILARITY_THRESHOLD): offres distinctes
+    offres = [offre("Stage PFE Data Scientist", lien=lien, lien_propre=True),
+              offre("Stage PFE Data Analyst", lien=lien, lien_propre=True)]
+    assert len(dedupe_offres(offres)) == 2
+
+
+def test_shared_fallback_link_does_not_merge():
+    recherche = 'https://www.rekrute.com/offres.html?p=stage'
+    offres = [offre("Stage PFE Développeur Java", 'Entreprise', recherche, lien_propre=False),
+              offre("Stage PFE Développeur Python", 'Entreprise', recherche, lien_propre=False)]
+    assert len(dedupe_offres(offres)) == 2
+
+
+def test_add_keeps_first_occurrence():
+    deduplicator = OfferDeduplicator()
+    assert deduplicator.add(offre("Stage Développeur Java Spring"))
+    assert not deduplicator.add(offre("Stage Développeur Java Spring Boot"))
+    assert deduplicator.add(offre("Stage Développeur Java Spring Boot", 'Atos'))
@@ -0,0 +1,70 @@
+from core.dedup import dedupe_offres
+from core.link_validator import LinkValidator
+from core.offer_store import OfferStore
+
+RECHERCHE = 'https://www.rekrute.com/offres.html?s=1&p=stage+informatique'
+
+
+def offre(titre, lien=RECHERCHE, lien_propre=False):
+    return {
+        'titre': titre, 'entreprise': 'Entreprise', 'lieu': 'Casablanca', 'date_publication': 'Récente',
+        'lien': lien, 'source': 'Rekrute.com', 'type': 'Stage', 'secteur': 'Informatique',
+        'lien_propre': lien_propre, 'valide': lien_propre
+    }
+
+
+def make_validator(store=None):
+    validator = LinkValidator(session=object(), store=store, ttl=3600)
+    validator.submit = lambda urls: None  # Pas de vérification réseau
+    return validator
+
+
+def test_annotate_reports_known_results_on_own_links():
+    validator = make_validator()
+    propre = offre("Stage PFE Data", 'https://www.rekrute.com/offre-emploi-stage-data-1.html', True)
+    mort = offre("Stage PFE Web", 'https://www.rekrute.com/offre-emploi-stage-web-2.html', True)
+    validator._record({propre['lien']: True, mort['lien']: False})
+
+    validator.annotate([propre, mort])
+
+    assert propre['valide'] is True
+    assert mort['valide'] is False
+    assert validator.cached(propre['lien']) is True
+    assert validator.cached('https://www.rekrute.com/inconnu.html') is None
+
+
+def test_annotate_leaves_fallback_links_unvalidated():
+    validator = make_validator()
+    validator._record({RECHERCHE: True})
+
+    offres = validator.annotate([offre("Stage PFE Développeur Java"), offre("Stage PFE Développeur Python")])
+
+    assert [o['valide'] for o in offres] == [False, False]
+
+
+def test_reachable_search_page_does_not_merge_offers():
+    """Deux offres sur la même page de recherche restent distinctes une fois la page vérifiée"""
+    offres = [offre("Stage PFE Développeur Java"), offre("Stage PFE Développeur Python")]
+    assert len(dedupe_offres(offres)) == 2
+
+    validator = make_validator()
+    validator._record({RECHERCHE: True})
+    validator.annotate(offres)
+    assert len(dedupe_offres(offres)) == 2
+
+
+def test_set_validite_only_updates_own_links(tmp_path):
+    store = OfferStore(str(tmp_path / 'offres.sqlite'))
+    propre = offre("Stage PFE Data", 'https://www.rekrute.com/offre-emploi-stage-data-1.html', True)
+    store.save_results('Informatique', 'Casablanca', [propre, offre("Stage PFE Développeur Java")])
+    assert store.liens_a_verifier() == [propre['lien']]
+
+    validator = make_validator(store)
+    validator._record({propre['lien']: False, RECHERCHE: True})
+
+    stockees = store.get_offres('Informatique', 'Casablanca')
+    assert [(o['lien_propre'], o['valide']) for o in stockees] == [(True, False), (False, False)]
+
+    # Nouveau crawl: le résultat connu du lien propre est conservé
+    store.save_results('Informatique', 'Casablanca', [propre, offre("Stage PFE Développeur Java")])
+    assert [o['valide'] for o in store.get_offres('Informatique', 'Casablanca')] == [False, False]
@@ -0,0 +1,71 @@
+import pandas as pd
+
+from core.offer_store import OfferStore
+from core.offer_table import OfferTable
+
+
+def offre(titre, secteur, lieu, source, collecte, valide=False):
+    lien = f"https://www.rekrute.com/offre-{titre.lower().replace(' ', '-')}.html"
+    return {
+        'titre': titre, 'entreprise': 'OCP', 'lieu': lieu, 'date_publication': 'Récente', 'lien': lien,
+        'source': source, 'type': 'Stage', 'secteur': secteur, 'lien_propre': True, 'valide': valide,
+        'collecte': collecte
+    }
+
+
+def make_table():
+    return OfferTable.from_frame(pd.DataFrame([
+        offre("Stage Data", 'Informatique', 'Casablanca', 'Rekrute.com', 100, valide=True),
+        offre("Stage Web", 'IT', 'Fès - Maroc', 'Emploi.ma', 200),
+        offre("Stage Audit", 'Finance', 'Casablanca', 'Emploi.ma', 300, valide=True),
+        offre("Stage Réseaux", 'Développement logiciel', None, 'LinkedIn', 400),
+    ]))
+
+
+def titres(table):
+    return list(table.frame['titre'])
+
+
+def test_query_secteur_uses_taxonomy():
+    assert titres(make_table().query(secteur='informatique')) == ["Stage Data", "Stage Web", "Stage Réseaux"]
+    assert titres(make_table().query(secteur='Banque')) == ["Stage Audit"]
+
+
+def test_query_secteur_outside_taxonomy_matches_label():
+    table = OfferTable.from_frame(pd.DataFrame([offre("Stage", 'Astronomie', 'Rabat', 'Emploi.ma', 1)]))
+    assert len(table.query(secteur='ASTRONOMIE')) == 1
+    assert len(table.query(secteur='Astrophysique')) == 0
+
+
+def test_query_ville_ignores_accents_and_missing_lieu():
+    assert titres(make_table().query(ville='fes')) == ["Stage Web"]
+    assert titres(make_table().query(ville='Casablanca')) == ["Stage Data", "Stage Audit"]
+
+
+def test_query_depuis_valide_sources_combined():
+    table = make_table()
+    assert titres(table.query(depuis=250)) == ["Stage Audit", "Stage Réseaux"]
+    assert titres(table.query(valide=False)) == ["Stage Web", "Stage Réseaux"]
+    assert titres(table.query(sources=['Emploi.ma', 'Indeed'])) == ["Stage Web", "Stage Audit"]
+    assert titres(table.query(sources=['Emploi.ma'], valide=True, ville='casa')) == ["Stage Audit"]
+    assert len(table.query(sources=[])) == 0
+
+
+def test_top_puts_valid_links_first():
+    table = make_table()
+    assert titres(table.top(2)) == ["Stage Audit", "Stage Data"]
+    assert titres(table.top(10)) == ["Stage Audit", "Stage Data", "Stage Réseaux", "Stage Web"]
+    assert titres(table.top(2, valides_d_abord=False)) == ["Stage Réseaux", "Stage Audit"]
+
+
+def test_from_store_rebuilt_after_link_check(tmp_path):
+    store = OfferStore(str(tmp_path / 'offres.sqlite'))
+    data = offre("Stage Data", 'Informatique', 'Casablanca', 'Rekrute.com', 0)
+    store.save_results('Informatique', 'Casablanca', [data])
+
+    table = OfferTable.from_store(store)
+    assert OfferTable.from_store(store) is table
+    assert len(table.query(valide=True)) == 0
+
+    store.set_validite({data['lien']: True})
+    assert len(OfferTable.from_store(store).query(valide=True)) == 1
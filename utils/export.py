@@ -1,14 +1,224 @@
-import pandas as pd
+"""
+Exports: DataFrames, lettres de motivation (ZIP) et exports en flux.
+
+Les exports en flux (`write_rows`) consomment un itérable de lignes lues au fur
+et à mesure dans un stockage (offres, favoris) et écrivent par lots dans un
+fichier: la mémoire occupée ne dépend pas du nombre de lignes. Servi par
+l'interface (`export_rows`), le fichier produit est en revanche rendu en entier:
+st.download_button garde le contenu du téléchargement en mémoire.
+
+Usage (stock d'offres du crawler):
+    python -m utils.export --format parquet --output offres.parquet
+"""
+import argparse
+import csv
+import io
+import json
+import sys
+import tempfile
+import zipfile
 from io import BytesIO
+from itertools import islice
+from typing import IO, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+import pandas as pd
+from openpyxl import Workbook
+
+try:
+    import docx
+except ImportError:
+    docx = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+try:
+    from fpdf import FPDF
+except ImportError:
+    FPDF = None
+
+# Formats de lettres disponibles (docx et pdf selon les bibliothèques installées)
+LETTER_FORMATS = ['txt'] + (['docx'] if docx else []) + (['pdf'] if FPDF else [])
+
+# Formats d'export en flux (parquet si pyarrow est installé): format -> (extension, type MIME)
+EXPORT_FORMATS = {
+    'csv': ('csv', 'text/csv'),
+    'xlsx': ('xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+    'jsonl': ('jsonl', 'application/x-ndjson'),
+    **({'parquet': ('parquet', 'application/vnd.apache.parquet')} if pq else {})
+}
+
+CHUNK_SIZE = 1000  # Lignes écrites par lot
+SPOOL_MAX_SIZE = 8 * 1024 * 1024  # Au-delà, le fichier d'export passe sur disque
 
 def export_to_csv(df: pd.DataFrame) -> str:
     """Exporte un DataFrame en CSV"""
     return df.to_csv(index=False, encoding='utf-8')
 
 def export_to_excel(df: pd.DataFrame) -> bytes:
-    """Exporte un DataFrame en Excel"""
+    """Exporte un DataFrame en Excel (classeur en écriture seule, lignes écrites une à une)"""
+    columns = [str(column) for column in df.columns]
+    rows = (dict(zip(columns, values)) for values in df.itertuples(index=False, name=None))
+    return export_rows(rows, columns, 'xlsx', sheet_name='Contacts')
+
+def export_letters_zip(letters: Iterable[Dict], formats: Sequence[str] = ('txt',)) -> bytes:
+    """
+    Archive ZIP des lettres (dicts de LetterGenerator.generate_letters), écrite au fur
+    et à mesure de la génération. Un fichier par lettre et par format disponible.
+    """
+    formats = [fmt for fmt in formats if fmt in LETTER_FORMATS]
     output = BytesIO()
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        df.to_excel(writer, index=False, sheet_name='Contacts')
-    output.seek(0)
-    return output.getvalue()
\ No newline at end of file
+    used = set()
+    with zipfile.ZipFile(output, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for letter in letters:
+            stem = _unique_stem(letter['filename'].rsplit('.', 1)[0], used)
+            for fmt in formats:
+                archive.writestr(f"{stem}.{fmt}", _letter_bytes(letter['content'], fmt))
+    return output.getvalue()
+
+def _unique_stem(stem: str, used: set) -> str:
+    """Plusieurs offres d'une même entreprise: Lettre_..., Lettre_..._2, ..."""
+    candidate, n = stem, 1
+    while candidate in used:
+        n += 1
+        candidate = f"{stem}_{n}"
+    used.add(candidate)
+    return candidate
+
+def _letter_bytes(content: str, fmt: str) -> bytes:
+    if fmt == 'docx':
+        document = docx.Document()
+        for paragraph in content.strip().split('\n\n'):
+            document.add_paragraph(paragraph.strip('\n'))
+        output = BytesIO()
+        document.save(output)
+        return output.getvalue()
+    if fmt == 'pdf':
+        pdf = FPDF()
+        pdf.add_page()
+        pdf.set_font('Helvetica', size=11)
+        # Polices PDF standard: latin-1 uniquement
+        pdf.multi_cell(0, 6, content.strip().encode('latin-1', 'replace').decode('latin-1'))
+        return bytes(pdf.output())
+    return content.encode('utf-8')
+
+# ----------------------------------------------------------------------
+# Exports en flux
+# ----------------------------------------------------------------------
+
+def chunked(rows: Iterable, size: int = CHUNK_SIZE) -> Iterator[List]:
+    """Lots successifs de `size` éléments"""
+    iterator = iter(rows)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+def iter_csv(rows: Iterable[Dict], columns: Sequence[str], chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """CSV par morceaux: l'en-tête, puis un morceau de texte par lot de lignes"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction='ignore')
+    writer.writeheader()
+    for chunk in chunked(rows, chunk_size):
+        writer.writerows(chunk)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def write_csv(rows: Iterable[Dict], columns: Sequence[str], out: IO[bytes]):
+    for text in iter_csv(rows, columns):
+        out.write(text.encode('utf-8'))
+
+def write_xlsx(rows: Iterable[Dict], columns: Sequence[str], out: IO[bytes], sheet_name: str = 'Export'):
+    """Classeur en mode écriture seule: les lignes ne sont pas gardées en mémoire"""
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(sheet_name)
+    sheet.append(list(columns))
+    for row in rows:
+        sheet.append([row.get(column) for column in columns])
+    workbook.save(out)
+
+def write_jsonl(rows: Iterable[Dict], columns: Sequence[str], out: IO[bytes]):
+    for chunk in chunked(rows):
+        out.write(''.join(
+            json.dumps({column: row.get(column) for column in columns}, ensure_ascii=False, default=str) + '\n'
+            for row in chunk
+        ).encode('utf-8'))
+
+def write_parquet(rows: Iterable[Dict], columns: Sequence[str], out: IO[bytes],
+                  types: Optional[Dict[str, type]] = None):
+    """
+    Un groupe de lignes Parquet par lot. Schéma fixé d'avance: `types` donne le type
+    Python (bool, int, float) des colonnes non textuelles, les valeurs sont converties.
+    """
+    arrow_types = {str: pa.string(), bool: pa.bool_(), int: pa.int64(), float: pa.float64()}
+    types = {column: (types or {}).get(column, str) for column in columns}
+    schema = pa.schema([(column, arrow_types[types[column]]) for column in columns])
+    with pq.ParquetWriter(out, schema) as writer:
+        for chunk in chunked(rows):
+            table = pa.Table.from_pylist([
+                {column: _convert(row.get(column), types[column]) for column in columns}
+                for row in chunk
+            ], schema=schema)
+            writer.write_table(table)
+
+def _convert(value, py_type: type):
+    return None if value is None else py_type(value)
+
+_WRITERS: Dict[str, Callable] = {
+    'csv': write_csv,
+    'xlsx': write_xlsx,
+    'jsonl': write_jsonl,
+    'parquet': write_parquet
+}
+
+def write_rows(rows: Iterable[Dict], columns: Sequence[str], fmt: str, out: IO[bytes],
+               types: Optional[Dict[str, type]] = None, **options):
+    """
+    Écrit les lignes dans `out` au format `fmt` (voir EXPORT_FORMATS).
+    `types`: types des colonnes non textuelles (schéma Parquet); `options`: propres au format
+    (sheet_name pour xlsx).
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Format d'export non disponible: {fmt}")
+    if fmt == 'parquet':
+        options['types'] = types
+    _WRITERS[fmt](rows, columns, out, **options)
+
+def export_rows(rows: Iterable[Dict], columns: Sequence[str], fmt: str,
+                types: Optional[Dict[str, type]] = None, **options) -> bytes:
+    """
+    Contenu complet de l'export, pour st.download_button (qui le garde en mémoire de
+    toute façon). Les lignes sont lues et écrites par lots dans un fichier temporaire
+    (en mémoire jusqu'à SPOOL_MAX_SIZE, sur disque au-delà): seul le résultat final,
+    pas les lignes, occupe la mémoire. Pour un export sans limite de taille, utiliser
+    la ligne de commande (main), qui écrit directement dans le fichier de sortie.
+    """
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE) as out:
+        write_rows(rows, columns, fmt, out, types, **options)
+        out.seek(0)
+        return out.read()
+
+def main(argv: Optional[List[str]] = None):
+    from core.offer_store import OFFER_FIELDS, OFFER_TYPES, OfferStore
+
+    parser = argparse.ArgumentParser(description="Export du stock d'offres collectées")
+    parser.add_argument('--format', choices=list(EXPORT_FORMATS), default='csv')
+    parser.add_argument('--output', help="Fichier de sortie (sortie standard par défaut)")
+    args = parser.parse_args(argv)
+
+    rows = (record.to_dict() for record in OfferStore().iter_records())
+    if args.output:
+        with open(args.output, 'wb') as out:
+            write_rows(rows, OFFER_FIELDS, args.format, out, OFFER_TYPES)
+    else:
+        write_rows(rows, OFFER_FIELDS, args.format, sys.stdout.buffer, OFFER_TYPES)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,34 @@
+import re
+import unicodedata
+from typing import List, Set
+
+_NON_ALNUM = re.compile(r'[^a-z0-9]+')
+
+
+def fold(text: str) -> str:
+    """Minuscules sans accents (é→e, â→a), espaces conservés"""
+    text = text or ''
+    if text.isascii():
+        return text.lower().strip()
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).lower().strip()
+
+
+def tokens(text: str) -> List[str]:
+    """Mots alphanumériques du texte normalisé"""
+    return [t for t in _NON_ALNUM.split(fold(text)) if t]
+
+
+def trigrams(text: str, padded: bool = False) -> Set[str]:
+    """
+    Trigrammes de caractères du texte normalisé (mots séparés par un espace).
+    Avec `padded`, le texte est encadré d'espaces pour pondérer début et fin de mot.
+    """
+    return char_trigrams(' '.join(tokens(text)), padded)
+
+
+def char_trigrams(normalized: str, padded: bool = False) -> Set[str]:
+    """Trigrammes d'un texte déjà normalisé (voir `trigrams`)"""
+    if padded and normalized:
+        normalized = f" {normalized} "
+    return {normalized[i:i + 3] for i in range(len(normalized) - 2)}